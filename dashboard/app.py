@@ -1,13 +1,23 @@
+import time
+_inicio_arranque = time.perf_counter()
+
 import dash
 from dash import Dash, html, dcc
 import dash_bootstrap_components as dbc
 import sys
 import os
+import threading
 # Obtiene la ruta absoluta de la carpeta raíz del proyecto
 ruta_raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if ruta_raiz not in sys.path:
     sys.path.insert(0, ruta_raiz)
 
+from src.utils import importacion_diferida
+
+# Coste del arranque por fase; las páginas no importan spaCy, NLTK, TextBlob ni scipy
+_fases_arranque = {"Importar Dash": time.perf_counter() - _inicio_arranque}
+_inicio_fase = time.perf_counter()
+
 aplicacion = Dash(
     __name__,
     use_pages=True,
@@ -87,11 +97,26 @@ barra_lateral = html.Div(
 aplicacion.layout = html.Div(
     [
         dcc.Store(id='store-datos-pipeline', storage_type='memory'),
+        # Sesión de la pestaña: separa los trabajos y resultados de cada usuario
+        dcc.Store(id='id-sesion', storage_type='session'),
         barra_lateral,
         html.Div(dash.page_container, className="main-content"),
     ],
     className="app-wrapper",
 )
 
+_fases_arranque["Cargar páginas y diseño"] = time.perf_counter() - _inicio_fase
+for linea in importacion_diferida.reporte_arranque(_fases_arranque):
+    print(linea)
+
+# Precalentamiento opcional de los modelos de spaCy en segundo plano (PRECALENTAR_MODELOS=1);
+# la importación de spaCy también ocurre en el hilo para no retrasar el arranque
+if os.environ.get("PRECALENTAR_MODELOS") == "1":
+    threading.Thread(
+        target=lambda: importacion_diferida.importar("src.pos_tagging.registro_modelos").precalentar(
+            en_segundo_plano=False),
+        name="precalentar-modelos", daemon=True,
+    ).start()
+
 if __name__ == "__main__":
     aplicacion.run(debug=True)
\ No newline at end of file
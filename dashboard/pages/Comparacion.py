@@ -1,12 +1,16 @@
 import dash
 from dash import html, dcc, callback, Input, Output
 import plotly.graph_objects as go
-import pandas as pd
 # Importamos la clase que creamos basada en el notebook 05
 from src.analysis.comparacion_generos import comparacion_generos
+from src.data import registro_datasets
+from src.analysis import cache_resultados
 
 dash.register_page(__name__, path="/viz1", name="Comparación de Géneros")
 
+# Columnas del corpus que usa esta página (store-datos-pipeline solo lleva el ID)
+COLUMNAS_COMPARACION = ['nombre_cancion', 'Genero', 'Lematizado']
+
 # ── Diseño de la página ───────────────────────────────────────────────────────
 layout = html.Div(
     [
@@ -67,8 +71,20 @@ def actualizar_graficas(data):
         fig_vacia = go.Figure().update_layout(**diseno_oscuro())
         return fig_vacia, fig_vacia, fig_vacia
 
-    # 1. Instanciamos la clase con los datos del pipeline
-    df = pd.DataFrame(data)
+    # Mismo dataset y misma versión del análisis: figuras ya calculadas
+    figuras = cache_resultados.obtener_registrado(data, "comparacion")
+    if figuras is None:
+        fig_vacia = go.Figure().update_layout(**diseno_oscuro())
+        return fig_vacia, fig_vacia, fig_vacia
+    return figuras
+
+
+def generar_figuras(id_dataset):
+    """Calcula las métricas por género y las figuras de la página, o None si no hay datos."""
+    # 1. Instanciamos la clase con las columnas que usa, pedidas al registro del servidor
+    df = registro_datasets.obtener(id_dataset, COLUMNAS_COMPARACION)
+    if df is None:
+        return None
     analizador = comparacion_generos(df)
 
     # 2. Ejecutamos el procesamiento (filtrado > 50 y métricas)
@@ -105,4 +121,8 @@ def diseno_oscuro():
             xanchor="center",
             x=0.5
         )
-    )
\ No newline at end of file
+    )
+
+
+# Registro del cálculo para el precálculo en segundo plano tras el pipeline (inicio.py)
+cache_resultados.registrar_analisis("comparacion", comparacion_generos.VERSION_ANALISIS, generar_figuras)
@@ -1,11 +1,15 @@
 import dash
 from dash import html, dcc, callback, Input, Output
 import plotly.graph_objects as go
-import pandas as pd
-from src.visualization.visualizador_emocional import visualizador_emocional
+from src.data import registro_datasets
+from src.analysis import cache_resultados
+from src.utils import importacion_diferida
 
 dash.register_page(__name__, path="/viz3", name="Emociones")
 
+# Columnas del corpus que usa esta página (store-datos-pipeline solo lleva el ID)
+COLUMNAS_EMOCIONES = ['letra_cancion', 'Genero', 'Lematizado', 'Etiquetado_POS']
+
 # ── Diseño de la página ───────────────────────────────────────────────────────
 layout = html.Div(
     [
@@ -53,18 +57,12 @@ def actualizar_graficas_emocion(data):
         return fig_vacio, fig_vacio
 
     try:
-        df = pd.DataFrame(data)
-        print(f"✅ DataFrame cargado: {df.shape}, columnas: {df.columns.tolist()}")
-
-        analizador = visualizador_emocional(df)
-        fig_barras = analizador.grafico_barras_emocion_genero()
-        fig_scatter = analizador.grafico_dispersion_sentimiento()
-
-        estilo = diseno_oscuro()
-        for fig in [fig_barras, fig_scatter]:
-            fig.update_layout(**estilo)
-
-        return fig_barras, fig_scatter
+        # Mismo dataset y misma versión del análisis: figuras ya calculadas
+        figuras = cache_resultados.obtener_registrado(data, "emociones")
+        if figuras is None:
+            print(f"⚠️  El dataset {data} ya no está en el registro")
+            return fig_vacio, fig_vacio
+        return figuras
 
     except Exception as e:
         print(f"❌ Error en callback emocion: {e}")
@@ -72,10 +70,39 @@ def actualizar_graficas_emocion(data):
         traceback.print_exc()
         return fig_vacio, fig_vacio
 
+
+def generar_figuras(id_dataset):
+    """Calcula el análisis emocional y las figuras de la página, o None si no hay datos."""
+    df = registro_datasets.obtener(id_dataset, COLUMNAS_EMOCIONES)
+    if df is None:
+        return None
+    print(f"✅ DataFrame cargado: {df.shape}, columnas: {df.columns.tolist()}")
+
+    # analisis_emocional (spaCy, TextBlob, scipy) se importa en el primer cálculo, no al arrancar
+    modulo = importacion_diferida.importar("src.visualization.visualizador_emocional")
+    analizador = modulo.visualizador_emocional(df)
+    fig_barras = analizador.grafico_barras_emocion_genero()
+    fig_scatter = analizador.grafico_dispersion_sentimiento()
+
+    estilo = diseno_oscuro()
+    for fig in [fig_barras, fig_scatter]:
+        fig.update_layout(**estilo)
+
+    return fig_barras, fig_scatter
+
+
+def _version_analisis():
+    return importacion_diferida.importar("src.analysis.analisis_emocional").analisis_emocional.VERSION_ANALISIS
+
+
 def diseno_oscuro():
     return dict(
         template="plotly_dark",
         paper_bgcolor="rgba(0,0,0,0)",
         plot_bgcolor="rgba(0,0,0,0)",
         margin=dict(l=40, r=20, t=60, b=100)
-    )
\ No newline at end of file
+    )
+
+
+# Registro del cálculo para el precálculo en segundo plano tras el pipeline (inicio.py)
+cache_resultados.registrar_analisis("emociones", _version_analisis, generar_figuras)
@@ -1,12 +1,16 @@
 import dash
 from dash import html, dcc, callback, Input, Output, State
 import plotly.graph_objects as go
-import pandas as pd
 # Asegúrate de que la ruta de importación sea la correcta según tu estructura
 from src.analysis.evolucion_temporal import evolucion_temporal
+from src.data import registro_datasets
+from src.analysis import cache_resultados
 
 dash.register_page(__name__, path="/viz2", name="Evolucion")
 
+# Columnas del corpus que usa esta página (store-datos-pipeline solo lleva el ID)
+COLUMNAS_EVOLUCION = ['Periodo', 'tokens', 'Lematizado']
+
 # ── Diseño de la página ───────────────────────────────────────────────────────
 layout = html.Div(
     [
@@ -72,15 +76,26 @@ def actualizar_graficas_evolucion(data):
         )
         return fig_vacia, fig_vacia, fig_vacia
 
-    # 1. Cargar datos en la clase
-    df = pd.DataFrame(data)
+    # Mismo dataset y misma versión del análisis: figuras ya calculadas
+    figuras = cache_resultados.obtener_registrado(data, "evolucion")
+    if figuras is None:
+        return go.Figure(), go.Figure(), go.Figure()
+    return figuras
+
+
+def generar_figuras(id_dataset):
+    """Calcula las métricas temporales y las figuras de la página, o None si no hay datos."""
+    # 1. Cargar en la clase las columnas que usa, pedidas al registro del servidor
+    df = registro_datasets.obtener(id_dataset, COLUMNAS_EVOLUCION)
+    if df is None:
+        return None
     analizador = evolucion_temporal(df)
 
     # 2. Preparar métricas (décadas, densidad, etc.)
     df_procesado = analizador.preparar_datos()
 
     if df_procesado is None:
-        return go.Figure(), go.Figure(), go.Figure()
+        return None
 
     # 3. Generar Figuras desde la clase
     fig_lineas = analizador.grafico_evolucion_complejidad()
@@ -117,4 +132,8 @@ def diseno_oscuro():
             xanchor="right",
             x=1
         )
-    )
\ No newline at end of file
+    )
+
+
+# Registro del cálculo para el precálculo en segundo plano tras el pipeline (inicio.py)
+cache_resultados.registrar_analisis("evolucion", evolucion_temporal.VERSION_ANALISIS, generar_figuras)
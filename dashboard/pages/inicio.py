@@ -2,220 +2,194 @@ import dash
 from dash import html, dcc, callback, Input, Output, State
 import dash_bootstrap_components as dbc
 
-import threading
-import io
-import re
-import sys
-
-try:
-    from src.pos_tagging.pipeline_spacy import pipeline_spacy
-    _spacy_disponible = True
-    _error_importacion_spacy = None
-except Exception as excepcion_spacy:
-    _spacy_disponible = False
-    _error_importacion_spacy = str(excepcion_spacy)
-
-try:
-    from src.pos_tagging.pipeline_nltk import pipeline_nltk
-    _nltk_disponible = True
-    _error_importacion_nltk = None
-except Exception as excepcion_nltk:
-    _nltk_disponible = False
-    _error_importacion_nltk = str(excepcion_nltk)
+import os
+import time
+import uuid
+
+from src.pos_tagging.puntos_control import listar_ejecuciones
+from src.data import registro_datasets
+from src.analysis import cache_resultados
+from src.utils import importacion_diferida
+from src.utils.eventos_progreso import formatear_duracion
+from src.utils.gestor_trabajos import gestor_trabajos
+
+# Al arrancar solo se comprueba que spaCy y NLTK estén instalados (sin importarlos); cada
+# pipeline se importa en el primer trabajo que lo usa (ver _cargar_pipeline)
+_spacy_disponible, _error_importacion_spacy = importacion_diferida.disponible("spacy")
+_nltk_disponible, _error_importacion_nltk = importacion_diferida.disponible("nltk")
 
 dash.register_page(__name__, path="/", name="Inicio")
 
-# ── Estado compartido entre el hilo del pipeline y los callbacks ──────────────
-# Guardamos los mensajes fijos (logs) y los progresos actuales por separado
-# Mensajes de sistema (Cargando modelo, listo, etc.)
-logs_sistema = []
-# Diccionario para mantener SOLO la última versión de cada paso
-# Ejemplo: {"Paso 1": "Barra al 20%", "Paso 2": "Barra al 5%"}
-pasos_activos = {}
-pipeline_en_ejecucion: bool = False
-df_resultado_global = None
-
-
-# ── Capturador de salida estándar (stdout/stderr) para tqdm ──────────────────
-
-class CapturadorSalidaConsola(io.TextIOBase):
-    def write(self, texto: str) -> int:
-        global logs_sistema, pasos_activos
-        if not texto or not texto.strip():
-            return len(texto)
-
-        # 1. Limpiar el desorden de tqdm (\r y múltiples líneas en un envío)
-        lineas = re.split(r'[\r\n]+', texto)
-        for linea in lineas:
-            linea = linea.strip()
-            if not linea: continue
-
-            # 2. ¿Es una barra de progreso?
-            # Buscamos "Paso X" al inicio de la línea
-            match_paso = re.search(r'^(Paso \d+)', linea)
-
-            if match_paso and ("%" in linea or "|" in linea):
-                id_paso = match_paso.group(1)
-                # Formateamos y GUARDAMOS/REEMPLAZAMOS en el diccionario
-                pasos_activos[id_paso] = self._formatear_linea_tqdm(linea)
-            else:
-                # 3. Si es un mensaje normal, va a la lista de logs permanentes
-                # Evitamos duplicar mensajes de "Cargando..." si llegan repetidos
-                linea_fmt = self._formatear_linea_tqdm(linea)
-                if not logs_sistema or logs_sistema[-1] != linea_fmt:
-                    logs_sistema.append(linea_fmt)
-
-        return len(texto)
-
-    def flush(self):
-        pass
-
-    @staticmethod
-    def _formatear_linea_tqdm(linea: str) -> str:
-        """
-        Detecta si la línea es una barra tqdm y aplica el HTML formateado.
-        Ejemplo de línea tqdm:
-          Paso 1 Tokenización: 100%|██████████| 500/500 [00:03<00:00, 142.it/s]
-        """
-        # Patrón: "<descripción>: <porcentaje>%|<barra>| <n>/<total> [tiempo]"
-        patron_tqdm = re.compile(
-            r'^(?P<desc>.+?):\s*(?P<pct>\d+)%\|(?P<barra>[█░▌ #]*)\|\s*'
-            r'(?P<n>\d+)/(?P<total>\d+)'
-            r'(?P<resto>.*)$'
-        )
-        coincidencia = patron_tqdm.match(linea)
-
-        if coincidencia:
-            descripcion = coincidencia.group("desc").strip()
-            porcentaje  = coincidencia.group("pct")
-            barra       = coincidencia.group("barra")
-            conteo      = f'{coincidencia.group("n")}/{coincidencia.group("total")}'
-            resto       = coincidencia.group("resto").strip()
-
-            return (
-                f'<span class="tqdm-etiqueta">{descripcion}:</span> '
-                f'<span class="tqdm-porcentaje">{porcentaje:>3}%</span> '
-                f'<span class="tqdm-barra">|{barra}|</span> '
-                f'<span class="tqdm-conteo">{conteo}</span> '
-                f'<span class="tqdm-resto">{resto}</span>'
-            )
-
-        # Líneas de print normales (mensajes de inicio, errores, etc.)
-        if any(sym in linea for sym in ["✔", "✓", "Listo", "correctamente", "="]):
-            return f'<span class="tqdm-completado">{linea}</span>'
+# ── Gestor de trabajos: cada ejecución del pipeline es un trabajo con ID propio ─
+# TRABAJOS_SIMULTANEOS: ejecuciones a la vez (el resto espera en cola)
+# TIEMPO_MAX_CANCION: segundos sin avance por canción tras los que se detiene un trabajo
+_gestor = gestor_trabajos(
+    max_simultaneos=int(os.environ.get("TRABAJOS_SIMULTANEOS", "1")),
+    tiempo_max_cancion=float(os.environ.get("TIEMPO_MAX_CANCION", "120")) or None,
+)
 
-        if any(sym in linea for sym in ["🎉", "finalizado", "Finalizado"]):
-            return f'<span class="tqdm-finalizado">{linea}</span>'
 
-        if any(sym in linea for sym in ["⚠", "Error", "error", "Traceback"]):
-            return f'<span class="tqdm-error">{linea}</span>'
+# ── Consola del dashboard alimentada por el bus de eventos de progreso ───────
 
-        return f'<span class="tqdm-info">{linea}</span>'
+class ConsolaDashboard:
+    """
+    Suscriptor del bus_progreso de un trabajo: guarda los mensajes en logs_sistema y la
+    última versión de cada etapa en pasos_activos, ya formateados en HTML. Trabaja con los
+    campos del evento (etapa, hechos, total, tasa, ETA), sin redirigir stdout ni usar regex.
+    """
+    ANCHO_BARRA = 20
+
+    def __init__(self, mensajes_iniciales=()):
+        # Mensajes de sistema (Cargando modelo, listo, etc.)
+        self.logs_sistema = list(mensajes_iniciales)
+        # Solo la última versión de cada paso, en el orden en que empezaron
+        self.pasos_activos = {}
+
+    def contenido(self):
+        """Líneas HTML de la consola: mensajes seguidos de las barras de cada etapa."""
+        return list(self.logs_sistema) + list(self.pasos_activos.values())
+
+    def __call__(self, evento):
+        if evento.tipo == "mensaje":
+            for linea in str(evento.mensaje).splitlines():
+                linea = linea.strip()
+                if not linea:
+                    continue
+                # Evitamos duplicar mensajes de "Cargando..." si llegan repetidos
+                linea_fmt = f'<span class="tqdm-{evento.nivel}">{linea}</span>'
+                if not self.logs_sistema or self.logs_sistema[-1] != linea_fmt:
+                    self.logs_sistema.append(linea_fmt)
+        else:
+            # Reemplaza la versión anterior de la misma etapa
+            self.pasos_activos[evento.etapa] = self._formatear_etapa(evento)
+
+    def _formatear_etapa(self, evento):
+        if evento.total:
+            fraccion = min(evento.hechos / evento.total, 1.0)
+            porcentaje = f"{fraccion:.0%}"
+            llenos = int(fraccion * self.ANCHO_BARRA)
+            barra = "█" * llenos + " " * (self.ANCHO_BARRA - llenos)
+            conteo = f"{evento.hechos}/{evento.total}"
+        else:
+            porcentaje, barra, conteo = "?", " " * self.ANCHO_BARRA, str(evento.hechos)
+        tasa = f"{evento.tasa:.1f} it/s" if evento.tasa else "? it/s"
+        eta = "listo" if evento.tipo == "fin" else f"ETA {formatear_duracion(evento.eta)}"
+        return (
+            f'<span class="tqdm-etiqueta">{evento.etapa}:</span> '
+            f'<span class="tqdm-porcentaje">{porcentaje:>4}</span> '
+            f'<span class="tqdm-barra">|{barra}|</span> '
+            f'<span class="tqdm-conteo">{conteo}</span> '
+            f'<span class="tqdm-resto">[{eta}, {tasa}]</span>'
+        )
 
 
 # ── Funciones que envuelven la ejecución real de cada pipeline ────────────────
 
-def ejecutar_pipeline_spacy():
+def _precalcular_analisis(id_dataset, progreso):
     """
-    Lanza pipeline_spacy().ejecutar() redirigiendo stdout y stderr
-    al capturador para mostrar el progreso de tqdm en la consola del dashboard.
+    Etapa posterior al pipeline: calcula en paralelo los análisis de Comparacion, Evolucion y
+    Emociones del nuevo dataset y deja sus figuras en cache_resultados. Se ejecuta dentro del
+    hilo del pipeline, de modo que los enlaces del menú se habilitan cuando ya están listos.
     """
-    global logs_sistema, pasos_activos, pipeline_en_ejecucion,df_resultado_global
-    logs_sistema = []
-    pasos_activos = {}
-    pipeline_en_ejecucion = True
-
-    # Guardar los flujos originales
-    stdout_original = sys.stdout
-    stderr_original = sys.stderr
-
-    capturador = CapturadorSalidaConsola()
+    progreso.mensaje("Precalculando análisis del dashboard...")
+    inicio = time.perf_counter()
 
-    try:
-        # Redirigir ambos flujos (tqdm escribe en stderr)
-        sys.stdout = capturador
-        sys.stderr = capturador
-
-        if not _spacy_disponible:
-            registros_pipeline.append(
-                f'<span class="tqdm-error">No se pudo importar pipeline_spacy: '
-                f'{_error_importacion_spacy}</span>'
-            )
+    def al_avanzar(analisis, completados, total, error):
+        if error is None:
+            progreso.mensaje(f"✓ Análisis {analisis} listo ({completados}/{total}, "
+                             f"{time.perf_counter() - inicio:.1f} s)", nivel="completado")
         else:
-            instancia_spacy = pipeline_spacy()
-            df_resultado_global = instancia_spacy.ejecutar()
-            print(f"DEBUG HILO: DataFrame creado con {len(df_resultado_global)} filas")
+            progreso.mensaje(f"⚠ Error al precalcular {analisis} ({completados}/{total}): {error}",
+                             nivel="error")
 
-            registros_pipeline.append(
-                '<span class="tqdm-finalizado">Pipeline spaCy finalizado correctamente</span>'
-            )
+    cache_resultados.precalcular(id_dataset, al_avanzar=al_avanzar, progreso=progreso)
 
-    except Exception as error:
-        registros_pipeline.append(
-            f'<span class="tqdm-error">Error durante la ejecución de spaCy: {error}</span>'
-        )
-    finally:
-        # Restaurar los flujos originales siempre
-        sys.stdout = stdout_original
-        sys.stderr = stderr_original
-        pipeline_en_ejecucion = False
 
-
-def ejecutar_pipeline_nltk():
+def _registrar_resultado(trabajo, df_resultado):
     """
-    Lanza pipeline_nltk().ejecutar() redirigiendo stdout y stderr
-    al capturador para mostrar el progreso de tqdm en la consola del dashboard.
+    Registra el DataFrame del trabajo, descarta las figuras del dataset anterior de la misma
+    sesión (las de otras sesiones se conservan) y precalcula los análisis del nuevo.
     """
-    global logs_sistema, pasos_activos, pipeline_en_ejecucion, df_resultado_global
-    logs_sistema = []
-    pasos_activos = {}
-    pipeline_en_ejecucion = True
-
-    stdout_original = sys.stdout
-    stderr_original = sys.stderr
-
-    capturador = CapturadorSalidaConsola()
-
+    progreso = trabajo.progreso
+    trabajo.filas = len(df_resultado)
+    progreso.mensaje(f"DataFrame creado con {trabajo.filas} filas")
+    anterior = _gestor.ultimo_completado(trabajo.sesion)
+    id_dataset = registro_datasets.registrar(df_resultado, progreso=progreso)
+    if anterior is not None and anterior.resultado:
+        cache_resultados.invalidar(huellas=[anterior.resultado])
+    _precalcular_analisis(id_dataset, progreso)
+    return id_dataset
+
+
+def _cargar_pipeline(nombre, progreso):
+    """
+    Importa src.pos_tagging.<nombre> en el primer trabajo que lo usa (junto con spaCy o NLTK) y
+    retorna su clase; informa en la consola del trabajo cuánto tardó esa primera importación
+    """
+    modulo = f"src.pos_tagging.{nombre}"
+    primera_vez = importacion_diferida.tiempo_importacion(modulo) is None
+    if primera_vez:
+        progreso.mensaje(f"Importando {nombre}...")
     try:
-        sys.stdout = capturador
-        sys.stderr = capturador
+        clase = getattr(importacion_diferida.importar(modulo), nombre)
+    except Exception as error:
+        raise RuntimeError(f"No se pudo importar {nombre}: {error}") from error
+    if primera_vez:
+        progreso.mensaje(f"{nombre} importado en {importacion_diferida.tiempo_importacion(modulo):.1f} s",
+                         nivel="completado")
+    return clase
 
-        if not _nltk_disponible:
-            registros_pipeline.append(
-                f'<span class="tqdm-error">No se pudo importar pipeline_nltk: '
-                f'{_error_importacion_nltk}</span>'
-            )
-        else:
-            instancia_nltk = pipeline_nltk()
-            df_resultado_global = instancia_nltk.ejecutar()
-            print(f"DEBUG HILO: DataFrame creado con {len(df_resultado_global)} filas")
-            registros_pipeline.append(
-                '<span class="tqdm-finalizado">Pipeline NLTK finalizado correctamente</span>'
-            )
 
-    except Exception as error:
-        registros_pipeline.append(
-            f'<span class="tqdm-error">Error durante la ejecución de NLTK: {error}</span>'
-        )
-    finally:
-        sys.stdout = stdout_original
-        sys.stderr = stderr_original
-        pipeline_en_ejecucion = False
+def ejecutar_pipeline_spacy(trabajo, perfil="etiquetado", id_ejecucion=None):
+    """
+    Trabajo del gestor: lanza pipeline_spacy().ejecutar() con el bus de progreso del trabajo.
+    `perfil` indica qué componentes del modelo de spaCy se cargan.
+    `id_ejecucion` reanuda una ejecución interrumpida desde sus puntos de control.
+    Retorna el ID del dataset resultante en registro_datasets.
+    """
+    if not _spacy_disponible:
+        raise RuntimeError(f"No se pudo importar pipeline_spacy: {_error_importacion_spacy}")
+    pipeline_spacy = _cargar_pipeline("pipeline_spacy", trabajo.progreso)
+    instancia_spacy = pipeline_spacy(perfil=perfil, incremental=True, con_puntos_control=True,
+                                     id_ejecucion=id_ejecucion, progreso=trabajo.progreso)
+    df_resultado = instancia_spacy.ejecutar()
+    trabajo.metricas = instancia_spacy.obtener_metricas()
+    id_dataset = _registrar_resultado(trabajo, df_resultado)
+    trabajo.progreso.mensaje("Pipeline spaCy finalizado correctamente", nivel="finalizado")
+    return id_dataset
+
+
+def ejecutar_pipeline_nltk(trabajo, id_ejecucion=None):
+    """
+    Trabajo del gestor: lanza pipeline_nltk().ejecutar() con el bus de progreso del trabajo.
+    `id_ejecucion` reanuda una ejecución interrumpida desde sus puntos de control.
+    Retorna el ID del dataset resultante en registro_datasets.
+    """
+    if not _nltk_disponible:
+        raise RuntimeError(f"No se pudo importar pipeline_nltk: {_error_importacion_nltk}")
+    pipeline_nltk = _cargar_pipeline("pipeline_nltk", trabajo.progreso)
+    instancia_nltk = pipeline_nltk(incremental=True, con_puntos_control=True,
+                                   id_ejecucion=id_ejecucion, progreso=trabajo.progreso)
+    df_resultado = instancia_nltk.ejecutar(modo="paralelo")
+    trabajo.metricas = instancia_nltk.obtener_metricas()
+    id_dataset = _registrar_resultado(trabajo, df_resultado)
+    trabajo.progreso.mensaje("Pipeline NLTK finalizado correctamente", nivel="finalizado")
+    return id_dataset
 
 
 # ── Mensajes de estado de importación para mostrar en la consola al inicio ───
 
 def _generar_mensajes_estado_importacion() -> list[str]:
-    """Retorna mensajes HTML sobre si los pipelines se importaron correctamente."""
+    """Retorna mensajes HTML sobre si las dependencias de cada pipeline están instaladas."""
     mensajes = []
     if _spacy_disponible:
-        mensajes.append('<span class="tqdm-completado">pipeline_spacy importado correctamente</span>')
+        mensajes.append('<span class="tqdm-completado">pipeline_spacy disponible (se importa al ejecutarlo)</span>')
     else:
         mensajes.append(
             f'<span class="tqdm-error">pipeline_spacy no disponible: {_error_importacion_spacy}</span>'
         )
     if _nltk_disponible:
-        mensajes.append('<span class="tqdm-completado">pipeline_nltk importado correctamente</span>')
+        mensajes.append('<span class="tqdm-completado">pipeline_nltk disponible (se importa al ejecutarlo)</span>')
     else:
         mensajes.append(
             f'<span class="tqdm-error">pipeline_nltk no disponible: {_error_importacion_nltk}</span>'
@@ -223,6 +197,86 @@ def _generar_mensajes_estado_importacion() -> list[str]:
     return mensajes
 
 
+def _filas_completadas(ejecucion):
+    """Número de filas cubiertas por los lotes completados de una ejecución."""
+    return sum(lote['fila_fin'] - lote['fila_inicio'] for lote in ejecucion['lotes'].values())
+
+
+def _tabla_ejecuciones(ejecuciones):
+    """Tabla HTML con el estado de las ejecuciones con puntos de control."""
+    if not ejecuciones:
+        return html.P("No hay ejecuciones con puntos de control.", className="consola-placeholder")
+    encabezado = html.Thead(html.Tr([
+        html.Th(columna) for columna in ("ID", "Motor", "Estado", "Lotes", "Filas", "Actualizado")
+    ]))
+    cuerpo = html.Tbody([
+        html.Tr([
+            html.Td(ejecucion['id_ejecucion']),
+            html.Td(ejecucion['motor']),
+            html.Td(ejecucion['estado'], className=f"estado-{ejecucion['estado']}"),
+            html.Td(len(ejecucion['lotes'])),
+            html.Td(_filas_completadas(ejecucion)),
+            html.Td(ejecucion['actualizado'].replace('T', ' ')),
+        ])
+        for ejecucion in ejecuciones
+    ])
+    return html.Table([encabezado, cuerpo], className="tabla-ejecuciones")
+
+
+def _tabla_historial(trabajos):
+    """Tabla HTML con los trabajos de la sesión: estado, duración y rendimiento."""
+    if not trabajos:
+        return html.P("Esta sesión todavía no ha lanzado trabajos.", className="consola-placeholder")
+    encabezado = html.Thead(html.Tr([
+        html.Th(columna) for columna in ("Trabajo", "Motor", "Estado", "Canciones", "Duración",
+                                         "Canciones/s", "Creado")
+    ]))
+    filas = []
+    for resumen in (trabajo.resumen() for trabajo in trabajos):
+        rendimiento = resumen['rendimiento']
+        filas.append(html.Tr([
+            html.Td(resumen['id_trabajo']),
+            html.Td(resumen['descripcion']),
+            html.Td(resumen['estado'], className=f"estado-{resumen['estado']}", title=resumen['error'] or ""),
+            html.Td(resumen['filas'] if resumen['filas'] is not None else "—"),
+            html.Td(formatear_duracion(resumen['duracion'])),
+            html.Td(f"{rendimiento:.1f}" if rendimiento else "—"),
+            html.Td(resumen['creado'].replace('T', ' ')),
+        ]))
+    return html.Table([encabezado, html.Tbody(filas)], className="tabla-ejecuciones")
+
+
+def _tabla_metricas(metricas):
+    """Tabla HTML con la instrumentación por etapa (tiempo, CPU, rendimiento y memoria) de un trabajo."""
+    if not metricas:
+        return html.P("Sin métricas: todavía no termina ningún trabajo de esta sesión.",
+                      className="consola-placeholder")
+
+    def valor(numero, formato):
+        return "—" if numero is None else format(numero, formato)
+
+    encabezado = html.Thead(html.Tr([
+        html.Th(columna) for columna in ("Etapa", "Tiempo (s)", "CPU (s)", "Canciones/s", "Tokens/s",
+                                         "Δ RSS (MB)", "Pico RSS (MB)", "Retenida (MB)")
+    ]))
+    cuerpo = html.Tbody([
+        html.Tr([
+            html.Td(("↳ " if etapa['padre'] else "") + etapa['etapa']),
+            html.Td(valor(etapa['segundos'], ".2f")),
+            html.Td(valor(etapa['cpu_segundos'], ".2f")),
+            html.Td(valor(etapa['canciones_s'], ".1f")),
+            html.Td(valor(etapa['tokens_s'], ".0f")),
+            html.Td(valor(etapa['rss_delta_mb'], "+.1f")),
+            html.Td(valor(etapa['rss_pico_mb'], ".0f")),
+            html.Td(valor(etapa['memoria_retenida_mb'], ".1f")),
+        ])
+        for etapa in metricas['etapas']
+    ])
+    pie = html.P(f"{metricas['motor']} · {metricas.get('modo', '')} · {metricas['segundos_total']:.1f} s "
+                 f"en total · {metricas['inicio'].replace('T', ' ')}", className="consola-placeholder")
+    return html.Div([html.Table([encabezado, cuerpo], className="tabla-ejecuciones"), pie])
+
+
 # ── Diseño de la página ───────────────────────────────────────────────────────
 
 layout = html.Div(
@@ -292,6 +346,37 @@ layout = html.Div(
                     className="pipeline-fila-tarjetas",
                 ),
 
+                # Perfil de carga del modelo de spaCy
+                html.Div(
+                    [
+                        html.Label("Perfil del modelo spaCy", htmlFor="perfil-spacy"),
+                        dcc.Dropdown(
+                            id="perfil-spacy",
+                            options=[
+                                {"label": "Etiquetado (tagger + lematizador, sin parser ni NER)",
+                                 "value": "etiquetado"},
+                                {"label": "Completo (todos los componentes)", "value": "completo"},
+                            ],
+                            value="etiquetado",
+                            clearable=False,
+                        ),
+                    ],
+                    className="selector-perfil",
+                ),
+
+                # Reanudar una ejecución interrumpida desde sus puntos de control
+                html.Div(
+                    [
+                        html.Label("Reanudar ejecución", htmlFor="id-reanudar"),
+                        dcc.Dropdown(
+                            id="id-reanudar",
+                            options=[],
+                            placeholder="Nueva ejecución",
+                        ),
+                    ],
+                    className="selector-perfil",
+                ),
+
                 # Detalle de pasos del pipeline seleccionado
                 html.Div(id="detalle-pasos-pipeline", className="detalle-pasos"),
 
@@ -304,6 +389,12 @@ layout = html.Div(
                             className="btn-ejecutar",
                             n_clicks=0,
                         ),
+                        dbc.Button(
+                            [html.I(className="bi bi-stop-circle me-2"), "Cancelar"],
+                            id="boton-cancelar",
+                            className="btn-limpiar",
+                            n_clicks=0,
+                        ),
                         dbc.Button(
                             [html.I(className="bi bi-x-circle me-2"), "Limpiar Consola"],
                             id="boton-limpiar",
@@ -329,7 +420,7 @@ layout = html.Div(
                                 html.Span("●", className="punto punto-amarillo"),
                                 html.Span("●", className="punto punto-verde"),
                                 html.Span(
-                                    "Progreso del Pipeline — tqdm",
+                                    "Progreso del Pipeline",
                                     className="consola-titulo",
                                 ),
                             ],
@@ -346,11 +437,26 @@ layout = html.Div(
                 ),
 
                 # Almacenes de estado ocultos
-                dcc.Store(id="estado-pipeline",       data="inactivo"),
+                # Trabajo cuya consola se muestra (se conserva al cambiar de página)
+                dcc.Store(id="trabajo-actual",        storage_type="session"),
                 dcc.Store(id="pipeline-seleccionado", data="spacy"),
 
-                # Intervalo de sondeo: activo solo mientras corre el pipeline
-                dcc.Interval(id="intervalo-progreso", interval=300, disabled=True),
+                # Intervalo de sondeo: activo solo mientras el trabajo está en cola o ejecutándose
+                dcc.Interval(id="intervalo-progreso", interval=300, disabled=False),
+            ],
+            className="card-section",
+        ),
+
+        # ── Ejecuciones con puntos de control ─────────────────────────────────
+        html.Div(
+            [
+                html.H5("Trabajos de esta sesión", className="section-title"),
+                html.Div(id="tabla-historial"),
+                html.H5("Métricas por etapa", className="section-title"),
+                html.Div(id="tabla-metricas"),
+                html.H5("Ejecuciones", className="section-title"),
+                html.Div(id="tabla-ejecuciones"),
+                dcc.Interval(id="intervalo-ejecuciones", interval=3000),
             ],
             className="card-section",
         ),
@@ -424,63 +530,96 @@ def resaltar_tarjeta_seleccionada(clics_spacy, clics_nltk):
     return clase_spacy, clase_nltk, seleccionado, detalle
 
 
+@callback(
+    Output("id-sesion", "data"),
+    Input("id-sesion", "modified_timestamp"),
+    State("id-sesion", "data"),
+)
+def iniciar_sesion(_, id_sesion):
+    """Asigna a cada pestaña del navegador un ID de sesión con el que se separan sus trabajos."""
+    if id_sesion:
+        return dash.no_update
+    return uuid.uuid4().hex
+
+
 @callback(
     Output("intervalo-progreso", "disabled"),
-    Output("estado-pipeline",    "data"),
-    Input("boton-ejecutar", "n_clicks"),
-    Input("boton-limpiar",  "n_clicks"),
+    Output("trabajo-actual",     "data"),
+    Input("boton-ejecutar",  "n_clicks"),
+    Input("boton-cancelar",  "n_clicks"),
+    Input("boton-limpiar",   "n_clicks"),
     State("pipeline-seleccionado", "data"),
+    State("perfil-spacy", "value"),
+    State("id-reanudar", "value"),
+    State("id-sesion", "data"),
+    State("trabajo-actual", "data"),
     prevent_initial_call=True,
 )
-def lanzar_pipeline(clics_ejecutar, clics_limpiar, pipeline_elegido):
-    """Lanza el pipeline real en un hilo aparte y activa el sondeo de la consola."""
-    global registros_pipeline, pipeline_en_ejecucion, df_resultado_global
-
+def lanzar_pipeline(clics_ejecutar, clics_cancelar, clics_limpiar, pipeline_elegido, perfil_spacy,
+                    id_reanudar, id_sesion, id_trabajo):
+    """Envía el pipeline al gestor de trabajos (o cancela el actual) y activa el sondeo de la consola."""
     contexto = dash.callback_context
     if not contexto.triggered:
-        return True, "inactivo"
+        return True, dash.no_update
 
     disparador = contexto.triggered[0]["prop_id"].split(".")[0]
+    actual = _gestor.obtener(id_trabajo) if id_trabajo else None
 
-    if disparador == "boton-limpiar":
-        registros_pipeline = []
-        pipeline_en_ejecucion = False
-        return True, "inactivo"
+    if disparador == "boton-cancelar":
+        if actual is not None:
+            _gestor.cancelar(actual.id_trabajo)
+        return False, dash.no_update
 
-    if disparador == "boton-ejecutar" and not pipeline_en_ejecucion:
+    if disparador == "boton-limpiar":
+        # Un trabajo activo sigue corriendo: solo se deja de mostrar el terminado
+        if actual is not None and actual.activo:
+            return False, dash.no_update
+        return False, None
+
+    if disparador == "boton-ejecutar":
+        # Un trabajo activo por sesión; los de otras sesiones esperan en la cola del gestor
+        if actual is not None and actual.activo:
+            return False, dash.no_update
+        if pipeline_elegido == "spacy":
+            funcion_pipeline = ejecutar_pipeline_spacy
+            parametros = {"perfil": perfil_spacy or "etiquetado", "id_ejecucion": id_reanudar}
+        else:
+            funcion_pipeline, parametros = ejecutar_pipeline_nltk, {"id_ejecucion": id_reanudar}
         # Mostrar estado de importación antes de lanzar
-        registros_pipeline = _generar_mensajes_estado_importacion()
+        consola = ConsolaDashboard(_generar_mensajes_estado_importacion())
+        nuevo = _gestor.enviar(funcion_pipeline, pipeline_elegido, sesion=id_sesion,
+                               parametros=parametros, suscriptores=[consola])
+        return False, nuevo.id_trabajo
 
-        funcion_pipeline = (
-            ejecutar_pipeline_spacy if pipeline_elegido == "spacy"
-            else ejecutar_pipeline_nltk
-        )
-        hilo = threading.Thread(target=funcion_pipeline, daemon=True)
-        hilo.start()
-        return False, "ejecutando"
+    return True, dash.no_update
 
-    return True, "inactivo"
+
+def _encabezado_trabajo(trabajo):
+    """Primera línea de la consola: ID y estado del trabajo (con su posición si está en cola)."""
+    estado = trabajo.estado
+    if estado == "en_cola":
+        estado = f"en cola ({_gestor.posicion_en_cola(trabajo.id_trabajo) + 1}º)"
+    elif estado == "deteniendo":
+        estado = f"deteniendo ({trabajo.progreso.motivo_cancelacion}, espera a que termine la canción en curso)"
+    nivel = {"completado": "finalizado", "ejecutando": "info", "en_cola": "info",
+             "deteniendo": "info"}.get(trabajo.estado, "error")
+    return f'<span class="tqdm-{nivel}">Trabajo {trabajo.id_trabajo} [{trabajo.descripcion}]: {estado}</span>'
 
 
 @callback(
     Output("salida-consola", "children"),
     Output("intervalo-progreso", "disabled", allow_duplicate=True),
     Input("intervalo-progreso", "n_intervals"),
-    State("estado-pipeline", "data"),
+    State("trabajo-actual", "data"),
     prevent_initial_call=True,
 )
-def actualizar_consola(_, estado_actual):
-    global logs_sistema, pasos_activos, pipeline_en_ejecucion,df_resultado_global
-
-    # Ordenamos los pasos para que el Paso 1 siempre esté arriba del Paso 2
-    claves_ordenadas = sorted(pasos_activos.keys())
-    barras_progresivas = [pasos_activos[k] for k in claves_ordenadas]
+def actualizar_consola(_, id_trabajo):
+    trabajo = _gestor.obtener(id_trabajo) if id_trabajo else None
+    if trabajo is None:
+        return html.P("Esperando ejecución...", className="consola-placeholder"), True
 
-    # Unimos todo
-    todo_el_contenido = logs_sistema + barras_progresivas
-
-    if not todo_el_contenido:
-        return html.P("Esperando...", className="consola-placeholder"), False
+    # Unimos todo: estado del trabajo, mensajes y etapas en el orden en que empezaron
+    todo_el_contenido = [_encabezado_trabajo(trabajo)] + trabajo.suscriptores[0].contenido()
 
     # Renderizado final
     contenido_final = "\n".join(todo_el_contenido)
@@ -489,7 +628,37 @@ def actualizar_consola(_, estado_actual):
         contenido_final,
         dangerously_allow_html=True,
         className="linea-consola"
-    ), not pipeline_en_ejecucion
+    ), not trabajo.activo
+
+
+@callback(
+    Output("tabla-ejecuciones", "children"),
+    Output("id-reanudar", "options"),
+    Output("tabla-historial", "children"),
+    Output("tabla-metricas", "children"),
+    Input("intervalo-ejecuciones", "n_intervals"),
+    Input("pipeline-seleccionado", "data"),
+    State("id-sesion", "data"),
+    State("trabajo-actual", "data"),
+)
+def actualizar_ejecuciones(_, pipeline_elegido, id_sesion, id_trabajo):
+    """
+    Refresca las ejecuciones reanudables del pipeline elegido, el historial de la sesión y las
+    métricas por etapa del trabajo actual (o del último completado).
+    """
+    ejecuciones = listar_ejecuciones()
+    reanudables = [
+        {"label": f"{ejecucion['id_ejecucion']} ({len(ejecucion['lotes'])} lotes)",
+         "value": ejecucion['id_ejecucion']}
+        for ejecucion in ejecuciones
+        if ejecucion['estado'] != 'completado' and ejecucion['motor'] == pipeline_elegido
+    ]
+    historial = _tabla_historial(_gestor.trabajos(id_sesion)) if id_sesion else _tabla_historial([])
+    trabajo = _gestor.obtener(id_trabajo) if id_trabajo else None
+    if trabajo is None or trabajo.metricas is None:
+        trabajo = _gestor.ultimo_completado(id_sesion) if id_sesion else None
+    metricas = _tabla_metricas(trabajo.metricas if trabajo is not None else None)
+    return _tabla_ejecuciones(ejecuciones), reanudables, historial, metricas
 
 
 # inicio.py
@@ -500,15 +669,18 @@ def actualizar_consola(_, estado_actual):
     Output("nav-pos", "disabled"),                        # ← 4to output
     Output("store-datos-pipeline", "data"),               # ← 5to output
     Input("intervalo-progreso", "disabled"),
+    State("trabajo-actual", "data"),
+    State("id-sesion", "data"),
     prevent_initial_call=True
 )
-def habilitar_menu_y_datos(intervalo_deshabilitado):
-    global df_resultado_global
-
-    if intervalo_deshabilitado and df_resultado_global is not None:
+def habilitar_menu_y_datos(intervalo_deshabilitado, id_trabajo, id_sesion):
+    # Solo el ID del dataset del último trabajo completado de esta sesión: cada página pide sus
+    # columnas al registro del servidor
+    completado = _gestor.ultimo_completado(id_sesion) if id_sesion else None
+    if intervalo_deshabilitado and completado is not None and completado.resultado:
         print("Habilitando interfaz ahora...")
-        return False, False, False, False, df_resultado_global.to_dict('records')
+        return False, False, False, False, completado.resultado
         #
 
     return dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update
-    #
\ No newline at end of file
+    #
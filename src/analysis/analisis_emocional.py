@@ -1,23 +1,23 @@
 import pandas as pd
 import numpy as np
-import re
 from collections import Counter, defaultdict
-from scipy.stats import pearsonr, spearmanr, f_oneway
-from scipy.stats import chi2_contingency
-import spacy
-from textblob import TextBlob
+from scipy.stats import pearsonr
 import plotly.graph_objects as go
-import plotly.express as px
 from plotly.subplots import make_subplots
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import r2_score, mean_squared_error
-from sklearn.preprocessing import MinMaxScaler
 import warnings
+from itertools import chain
+
+from src.analysis import etiquetas_pos, matriz_tags
+from src.analysis.puntuacion_sentimiento import puntuacion_sentimiento
+from src.pos_tagging.registro_modelos import obtener_modelo
 
 
 class analisis_emocional:
     """Encapsula toda la lógica de cálculo y generación de gráficos Plotly."""
 
+    # Subir cuando cambien las métricas o las figuras (invalida cache_resultados)
+    VERSION_ANALISIS = 3
+
     # Verbos de estado comunes en inglés
     _VERBOS_ESTADO = {
         "be", "am", "is", "are", "was", "were", "been", "being",
@@ -38,58 +38,88 @@ class analisis_emocional:
         "never", "die", "goodbye", "end", "tear",
     }
 
-    def __init__(self, df: pd.DataFrame):
-        self._nlp = spacy.load("en_core_web_sm")
+    # Lema de las stopwords de spaCy o de NLTK que importan para los conteos (Lematizado no
+    # las incluye); las demás se cuentan con su forma en minúsculas ("never", "alone", ...)
+    _LEMAS_STOPWORDS = {
+        **dict.fromkeys(["am", "is", "are", "was", "were", "be", "been", "being", "re",
+                         "'m", "‘m", "’m", "'re", "‘re", "’re", "'s", "‘s", "’s"], "be"),
+        **dict.fromkeys(["have", "has", "had", "having", "'ve", "‘ve", "’ve"], "have"),
+        **dict.fromkeys(["seem", "seems", "seemed", "seeming"], "seem"),
+        **dict.fromkeys(["become", "becomes", "became", "becoming"], "become"),
+        # "'d" es "would" o "have" según el tag fino, que Etiquetado_POS no guarda
+        **dict.fromkeys(["'d", "‘d", "’d"], "would"),
+    }
+    _STOPWORDS_AMBIGUAS = {"'d", "‘d", "’d"}
+
+    # Tags universales de spaCy; un corpus etiquetado sin ninguno viene del pipeline de NLTK
+    # (Penn Treebank: NN, VBZ, JJ, ...)
+    _TAGS_UPOS = {
+        "ADJ", "ADP", "ADV", "AUX", "CCONJ", "DET", "INTJ", "NOUN", "NUM", "PART",
+        "PRON", "PROPN", "PUNCT", "SCONJ", "SPACE", "VERB", "X",
+    }
+
+    # Modos de cálculo de los verbos de acción/estado y de las palabras emocionales
+    MODOS = ("auto", "lemas", "spacy")
+
+    def __init__(self, df: pd.DataFrame, modo: str = "auto", batch_size: int = 256,
+                 puntuador: puntuacion_sentimiento = None):
+        """
+        Args:
+            df: Corpus etiquetado (letra_cancion, Genero, Lematizado y Etiquetado_POS)
+            modo: "lemas" cuenta sobre Etiquetado_POS y Lematizado ya calculados por el pipeline
+                de spaCy o el de NLTK (un "'d" verbal se toma como "would"), "spacy" vuelve a analizar las
+                letras con nlp.pipe y "auto" usa los lemas si el corpus los trae y analiza con
+                spaCy solo las canciones que no se pueden contar así
+            batch_size: Letras por lote de nlp.pipe en el modo "spacy"
+            puntuador: Etapa de polaridad/subjetividad (por defecto, en paralelo y con caché
+                persistente por huella de letra)
+        """
+        if modo not in self.MODOS:
+            raise ValueError(f"Modo no soportado: {modo}. Opciones: {', '.join(self.MODOS)}")
         self._df = df.copy()
+        self._respaldo_spacy = modo == "auto"
+        self._modo = self._resolver_modo(modo)
+        self._batch_size = batch_size
+        self._puntuador = puntuador or puntuacion_sentimiento()
+        # Solo se pide al registro en el modo "spacy" (lemma_ y pos_: sin parser ni NER)
+        self._nlp = None
         self._calcular_metricas()
 
+    def _resolver_modo(self, modo):
+        con_lemas = {"Lematizado", "Etiquetado_POS"} <= set(self._df.columns)
+        if modo == "lemas" and not con_lemas:
+            raise ValueError("El modo 'lemas' necesita las columnas Lematizado y Etiquetado_POS")
+        if modo != "auto":
+            return modo
+        if con_lemas and any(etiquetas_pos.extraer_pares(valor) for valor in self._df["Lematizado"]):
+            return "lemas"
+        return "spacy"
+
     # ------------------------------------------------------------------
     # Helpers de cálculo (idénticos al notebook)
     # ------------------------------------------------------------------
 
     def _extraer_pos_tags(self, pos_string):
-        """Extrae las etiquetas POS de una cadena de texto."""
-        if pd.isna(pos_string):
-            return []
-        return re.findall(r",\s*'([^']+)'\)", str(pos_string))
-
-    def _calcular_densidad_adjetivos(self, pos_list):
-        """Calcula la densidad de adjetivos (Adjetivos / total tokens)."""
-        if not pos_list:
-            return 0
-        adjetivos = sum(1 for tag in pos_list if tag == "ADJ")
-        return (adjetivos / len(pos_list) * 100) if pos_list else 0
-
-    def _calcular_ratio_verbos_accion_estado(self, texto):
-        """Calcula el ratio entre verbos de acción y verbos de estado."""
-        if pd.isna(texto):
-            return 0
-        doc = self._nlp(str(texto))
-        accion, estado = 0, 0
-        for token in doc:
-            if token.pos_ in ["VERB", "AUX"]:
-                if token.lemma_.lower() in self._VERBOS_ESTADO:
-                    estado += 1
-                else:
-                    accion += 1
-        return accion / estado if estado > 0 else accion
-
-    def _calcular_complejidad_sintactica(self, pos_list):
-        """Calcula un índice de complejidad sintáctica (ADJ + ADV + SCONJ)."""
-        if not pos_list:
-            return 0
-        complejos = sum(1 for tag in pos_list if tag in ["ADJ", "ADV", "SCONJ"])
-        return (complejos / len(pos_list) * 100) if pos_list else 0
-
-    def _analizar_polaridad_emocional(self, texto):
-        """Retorna (polaridad, subjetividad) usando TextBlob."""
-        if pd.isna(texto):
-            return 0, 0
-        try:
-            blob = TextBlob(str(texto))
-            return blob.sentiment.polarity, blob.sentiment.subjectivity
-        except Exception:
-            return 0, 0
+        """Extrae las etiquetas POS de una celda etiquetada (repr de CSV o listas nativas)."""
+        return etiquetas_pos.extraer_pos_tags(pos_string)
+
+    def _calcular_densidad_adjetivos(self, conteos):
+        """Calcula la densidad de adjetivos (Adjetivos / total tokens, en %)."""
+        return matriz_tags.proporcion_tags(conteos, ["ADJ"]) * 100
+
+    def _es_verbo(self, tags):
+        """Verbos y auxiliares: UPOS de spaCy (VERB, AUX) o Penn Treebank de NLTK (VB*)."""
+        tags = pd.Series(tags, dtype=object)
+        return (tags.isin(["VERB", "AUX"]) | tags.str.startswith("VB")).to_numpy()
+
+    def _calcular_ratio_verbos_accion_estado(self, accion, estado):
+        """Calcula el ratio entre verbos de acción y verbos de estado (acción si no hay de estado)."""
+        accion = accion.astype(float)
+        return np.divide(accion, estado, out=accion.copy(), where=estado > 0)
+
+    def _calcular_complejidad_sintactica(self, conteos):
+        """Calcula un índice de complejidad sintáctica (ADJ + ADV + SCONJ, en %)."""
+        return matriz_tags.proporcion_tags(conteos, ["ADJ", "ADV", "SCONJ"]) * 100
 
     def _categorizar_emocion(self, polaridad):
         """Categoriza la emoción en Positiva / Neutral / Negativa."""
@@ -103,15 +133,94 @@ class analisis_emocional:
         """Índice de intensidad emocional: subjetividad × 0.6 + densidad_adj × 0.4."""
         return subjetividad * 0.6 + (densidad_adj / 100) * 0.4
 
-    def _contar_palabras_emocionales(self, texto, pos_list):
-        """Cuenta palabras emocionales positivas y negativas (%)."""
-        if pd.isna(texto):
-            return 0, 0
-        doc = self._nlp(str(texto).lower())
-        positivas = sum(1 for t in doc if t.lemma_ in self._PALABRAS_POSITIVAS)
-        negativas = sum(1 for t in doc if t.lemma_ in self._PALABRAS_NEGATIVAS)
-        total = len(pos_list) if pos_list else 1
-        return (positivas / total * 100), (negativas / total * 100)
+    def _contar_palabras_emocionales(self, positivas, negativas, n_tokens):
+        """Porcentaje de palabras emocionales positivas y negativas sobre los tokens etiquetados."""
+        total = np.where(n_tokens > 0, n_tokens, 1)
+        return positivas / total * 100, negativas / total * 100
+
+    def _contar_desde_lemas(self, etiquetado, lematizado):
+        """
+        Conteos por canción de verbos de acción y de estado y de palabras emocionales a partir
+        de las columnas ya calculadas por el pipeline de spaCy o el de NLTK, sin volver a
+        analizar el texto. Etiquetado_POS trae todos los tokens con su tag y Lematizado, en el
+        mismo orden, el lema de los que no son stopwords; las stopwords ("is", "have", "never",
+        ...) toman su lema de _LEMAS_STOPWORDS.
+
+        Returns:
+            tuple: (conteos, desalineadas, ambiguas); las máscaras marcan las canciones cuyas
+            columnas no se corresponden y las que tienen un "'d" verbal
+        """
+        tokens_por_cancion = [etiquetas_pos.extraer_pares(valor) for valor in etiquetado]
+        lemas_por_cancion = [etiquetas_pos.extraer_pares(valor) for valor in lematizado]
+        longitudes = np.array([len(pares) for pares in tokens_por_cancion], dtype=np.int64)
+        cancion = np.repeat(np.arange(len(longitudes)), longitudes)
+
+        pares = list(chain.from_iterable(tokens_por_cancion))
+        tokens = pd.Series([token for token, _ in pares], dtype=object)
+        formas = tokens.str.lower()
+        tags = np.array([tag for _, tag in pares], dtype=object)
+        es_verbo = self._es_verbo(tags)
+        es_stopword = self._es_stopword(tokens, tags)
+
+        # Cada canción debe tener un lema por token que no es stopword, con el mismo tag
+        n_lemas = np.array([len(pares) for pares in lemas_por_cancion], dtype=np.int64)
+        desalineadas = np.bincount(cancion[~es_stopword], minlength=len(longitudes)) != n_lemas
+        lemas = formas.map(self._LEMAS_STOPWORDS).fillna(formas).to_numpy()
+        con_lema = ~es_stopword & ~desalineadas[cancion]
+        lemas_guardados = [(lema.lower(), tag) for indice in np.flatnonzero(~desalineadas)
+                           for lema, tag in lemas_por_cancion[indice]]
+        if lemas_guardados:
+            lemas[con_lema] = [lema for lema, _ in lemas_guardados]
+            otro_tag = tags[con_lema] != np.array([tag for _, tag in lemas_guardados], dtype=object)
+            desalineadas[cancion[con_lema][otro_tag]] = True
+
+        ambiguas = np.zeros(len(longitudes), dtype=bool)
+        ambiguas[cancion[formas.isin(self._STOPWORDS_AMBIGUAS).to_numpy() & es_verbo & es_stopword]] = True
+        conteos = self._contar_por_cancion(pd.Series(lemas, dtype=object), es_verbo, longitudes)
+        return conteos, desalineadas, ambiguas
+
+    def _es_stopword(self, tokens, tags):
+        """
+        Máscara de los tokens que el pipeline quitó de Lematizado: spaCy compara el token en
+        minúsculas con sus STOP_WORDS y NLTK la palabra original con stopwords.words('english')
+        """
+        if not len(tags):
+            return np.zeros(0, dtype=bool)
+        if pd.Series(tags, dtype=object).isin(self._TAGS_UPOS).any():
+            from spacy.lang.en.stop_words import STOP_WORDS
+            return tokens.str.lower().isin(STOP_WORDS).to_numpy()
+        from nltk.corpus import stopwords
+        return tokens.isin(set(stopwords.words('english'))).to_numpy()
+
+    def _contar_con_spacy(self, textos):
+        """
+        Respaldo para corpus sin lemas: analiza cada letra una sola vez con nlp.pipe y cuenta
+        sobre sus lemas en minúsculas (las letras vacías o nulas cuentan 0).
+        """
+        if self._nlp is None:
+            self._nlp = obtener_modelo("etiquetado")
+        letras = textos.fillna("").astype(str)
+        lemas, tags, longitudes = [], [], []
+        for doc in self._nlp.pipe(letras, batch_size=self._batch_size):
+            lemas.extend(token.lemma_.lower() for token in doc)
+            tags.extend(token.pos_ for token in doc)
+            longitudes.append(len(doc))
+        return self._contar_por_cancion(pd.Series(lemas, dtype=object), self._es_verbo(tags),
+                                        np.array(longitudes, dtype=np.int64))
+
+    def _contar_por_cancion(self, lemas, es_verbo, longitudes):
+        cancion = np.repeat(np.arange(len(longitudes)), longitudes)
+
+        def por_cancion(mascara):
+            return np.bincount(cancion[mascara], minlength=len(longitudes))
+
+        de_estado = lemas.isin(self._VERBOS_ESTADO).to_numpy()
+        return pd.DataFrame({
+            "accion": por_cancion(es_verbo & ~de_estado),
+            "estado": por_cancion(es_verbo & de_estado),
+            "positivas": por_cancion(lemas.isin(self._PALABRAS_POSITIVAS).to_numpy()),
+            "negativas": por_cancion(lemas.isin(self._PALABRAS_NEGATIVAS).to_numpy()),
+        })
 
     # ------------------------------------------------------------------
     # Pipeline principal de cálculo
@@ -120,22 +229,39 @@ class analisis_emocional:
     def _calcular_metricas(self):
         df = self._df
 
-        # POS tags
-        df["pos_list"] = df["Lematizado"].apply(self._extraer_pos_tags)
+        # Conteos de tags POS por canción (matriz compartida con los demás análisis)
+        conteos = matriz_tags.matriz_tags(df["Lematizado"])
+        n_tokens = matriz_tags.total_tokens(conteos)
+
+        # Verbos de acción/estado y palabras emocionales: de los tokens y lemas guardados por
+        # el pipeline o, si el corpus no los trae, de una pasada de nlp.pipe por las letras
+        if self._modo == "lemas":
+            lexicos, desalineadas, ambiguas = self._contar_desde_lemas(
+                df["Etiquetado_POS"], df["Lematizado"]
+            )
+            if desalineadas.any() and not self._respaldo_spacy:
+                raise ValueError(f"Etiquetado_POS y Lematizado no se corresponden en "
+                                 f"{desalineadas.sum()} canciones; usa el modo 'auto' o 'spacy'")
+            # En "auto", las canciones que los lemas no resuelven se analizan con spaCy
+            pendientes = desalineadas | ambiguas
+            if self._respaldo_spacy and pendientes.any():
+                lexicos.loc[pendientes] = self._contar_con_spacy(
+                    df["letra_cancion"][pendientes]
+                ).to_numpy()
+        else:
+            lexicos = self._contar_con_spacy(df["letra_cancion"])
 
         # Morfosintácticas
-        df["densidad_adjetivos"] = df["pos_list"].apply(self._calcular_densidad_adjetivos)
-        df["ratio_verbos_accion_estado"] = df["letra_cancion"].apply(
-            self._calcular_ratio_verbos_accion_estado
-        )
-        df["complejidad_sintactica"] = df["pos_list"].apply(
-            self._calcular_complejidad_sintactica
+        df["densidad_adjetivos"] = self._calcular_densidad_adjetivos(conteos)
+        df["ratio_verbos_accion_estado"] = self._calcular_ratio_verbos_accion_estado(
+            lexicos["accion"].to_numpy(), lexicos["estado"].to_numpy()
         )
+        df["complejidad_sintactica"] = self._calcular_complejidad_sintactica(conteos)
 
         # Emocionales
-        df[["polaridad", "subjetividad"]] = df["letra_cancion"].apply(
-            lambda x: pd.Series(self._analizar_polaridad_emocional(x))
-        )
+        sentimiento = self._puntuador.puntuar(df["letra_cancion"])
+        df["polaridad"] = sentimiento["polaridad"]
+        df["subjetividad"] = sentimiento["subjetividad"]
         df["categoria_emocional"] = df["polaridad"].apply(self._categorizar_emocion)
         df["intensidad_emocional"] = df.apply(
             lambda r: self._calcular_intensidad_emocional(
@@ -145,12 +271,11 @@ class analisis_emocional:
         )
 
         # Palabras emocionales
-        df[["pct_palabras_positivas", "pct_palabras_negativas"]] = df.apply(
-            lambda r: pd.Series(
-                self._contar_palabras_emocionales(r["letra_cancion"], r["pos_list"])
-            ),
-            axis=1,
+        positivas, negativas = self._contar_palabras_emocionales(
+            lexicos["positivas"].to_numpy(), lexicos["negativas"].to_numpy(), n_tokens
         )
+        df["pct_palabras_positivas"] = positivas
+        df["pct_palabras_negativas"] = negativas
 
         self._df = df
         self._variables_morfosintacticas = [
@@ -0,0 +1,141 @@
+"""
+Clase: cache_resultados
+
+Objetivo: Py con la caché de resultados de análisis (métricas y figuras ya renderizadas) de
+las páginas Comparacion, Evolucion y Emociones. La clave es la huella del dataset (su ID en
+registro_datasets, que siempre nombra el mismo contenido), el nombre del análisis y su versión;
+la caché tiene un número máximo de entradas (LRU) y se invalida cuando termina una nueva
+ejecución del pipeline. Las páginas registran aquí su cálculo para que el dashboard pueda
+precalcular todos los análisis en un pool de hilos apenas termina el pipeline
+
+Cambios:
+
+"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from src.utils.eventos_progreso import bus_progreso
+
+_CAPACIDAD = 12
+
+_resultados = OrderedDict()
+_candados_calculo = {}
+_candado = threading.Lock()
+_estadisticas = {'aciertos': 0, 'fallos': 0}
+# Análisis registrados por las páginas: nombre -> (versión, calcular(huella_dataset))
+_analisis_registrados = {}
+
+
+def obtener_o_calcular(huella_dataset, analisis, version, calcular, progreso=None):
+    """
+    Resultado guardado para (huella_dataset, analisis, version) o, si no existe, el de
+    `calcular()`. Si otro hilo ya está calculando la misma clave, espera su resultado en lugar
+    de repetir el cálculo
+
+    Args:
+        huella_dataset (str): ID o huella del dataset
+        analisis (str): Nombre del análisis ("comparacion", "evolucion", "emociones")
+        version (int): Versión del análisis; subirla invalida sus resultados anteriores
+        calcular (callable): Sin argumentos; un resultado None no se guarda
+        progreso (bus_progreso): Destino del mensaje con el tiempo de cálculo (por defecto, consola)
+
+    Returns:
+        El resultado de `calcular()` (guardado o recién calculado)
+    """
+    clave = (huella_dataset, analisis, version)
+    with _candado:
+        if clave in _resultados:
+            _resultados.move_to_end(clave)
+            _estadisticas['aciertos'] += 1
+            return _resultados[clave]
+        candado_calculo = _candados_calculo.setdefault(clave, threading.Lock())
+
+    with candado_calculo:
+        with _candado:
+            if clave in _resultados:
+                _estadisticas['aciertos'] += 1
+                return _resultados[clave]
+        inicio = time.perf_counter()
+        resultado = calcular()
+        segundos = time.perf_counter() - inicio
+        with _candado:
+            _estadisticas['fallos'] += 1
+            _candados_calculo.pop(clave, None)
+            if resultado is not None:
+                _resultados[clave] = resultado
+                while len(_resultados) > _CAPACIDAD:
+                    _resultados.popitem(last=False)
+    (progreso or bus_progreso.consola()).mensaje(
+        f"Análisis {analisis} calculado en {segundos:.2f} s para el dataset {huella_dataset}")
+    return resultado
+
+
+def invalidar(excepto=None, huellas=None):
+    """
+    Descarta los resultados de los datasets de `huellas` o, si no se indican, los de todos los
+    datasets salvo el de huella `excepto`.
+    """
+    with _candado:
+        for clave in list(_resultados):
+            if (clave[0] in huellas) if huellas is not None else (clave[0] != excepto):
+                del _resultados[clave]
+
+
+def estadisticas():
+    """Aciertos, fallos y entradas actuales de la caché."""
+    with _candado:
+        return dict(_estadisticas, entradas=len(_resultados))
+
+
+def registrar_analisis(analisis, version, calcular):
+    """
+    Registra el cálculo de un análisis para precalcular() y obtener_registrado()
+
+    Args:
+        analisis (str): Nombre del análisis
+        version (int | callable): Versión del análisis, o función sin argumentos que la retorna
+            en el primer uso (para no importar el módulo del análisis al registrarlo)
+        calcular (callable): Recibe la huella del dataset y retorna el resultado (o None)
+    """
+    with _candado:
+        _analisis_registrados[analisis] = (version, calcular)
+
+
+def obtener_registrado(huella_dataset, analisis, progreso=None):
+    """obtener_o_calcular() con la versión y el cálculo registrados para `analisis`."""
+    version, calcular = _analisis_registrados[analisis]
+    if callable(version):
+        version = version()
+    return obtener_o_calcular(huella_dataset, analisis, version, lambda: calcular(huella_dataset),
+                              progreso)
+
+
+def precalcular(huella_dataset, al_avanzar=None, progreso=None):
+    """
+    Calcula en paralelo (un hilo por análisis) todos los análisis registrados del dataset. Los
+    hilos comparten la matriz de tags y la caché de este proceso
+
+    Args:
+        huella_dataset (str): ID o huella del dataset
+        al_avanzar (callable): Recibe (analisis, completados, total, error) al terminar cada uno
+        progreso (bus_progreso): Destino de los mensajes de cada cálculo (por defecto, consola)
+
+    Returns:
+        dict: analisis -> excepción, o None si se calculó correctamente
+    """
+    with _candado:
+        nombres = list(_analisis_registrados)
+    errores = {}
+    if not nombres:
+        return errores
+    with ThreadPoolExecutor(max_workers=len(nombres), thread_name_prefix="precalculo") as ejecutor:
+        futuros = {ejecutor.submit(obtener_registrado, huella_dataset, nombre, progreso): nombre
+                   for nombre in nombres}
+        for completados, futuro in enumerate(as_completed(futuros), start=1):
+            nombre = futuros[futuro]
+            errores[nombre] = futuro.exception()
+            if al_avanzar is not None:
+                al_avanzar(nombre, completados, len(nombres), errores[nombre])
+    return errores
@@ -1,44 +1,57 @@
 import pandas as pd
 import numpy as np
-import re
 import plotly.graph_objects as go
 import plotly.express as px
 
+from src.analysis import etiquetas_pos, matriz_tags
+
 
 class comparacion_generos:
+    # Subir cuando cambien las métricas o las figuras (invalida cache_resultados)
+    VERSION_ANALISIS = 1
+
     def __init__(self, df):
         self.df = df.copy()
         self.resumen_generos = None
 
     def extraer_pos_tags(self, pos_string):
-        if pd.isna(pos_string): return []
-        return re.findall(r",\s*'([^']+)'\)", str(pos_string))
+        return etiquetas_pos.extraer_pos_tags(pos_string)
+
+    @staticmethod
+    def calcular_metricas(conteos):
+        """
+        Métricas por canción del notebook 05 como operaciones de columnas sobre la matriz de
+        conteos de tags (canciones × tags). Mismos valores (float64) que el cálculo fila a fila.
+        """
+        n_tokens = matriz_tags.total_tokens(conteos).astype(np.float64)
+        n_subs = matriz_tags.sumar_tags(conteos, ['NOUN']).astype(np.float64)
+        n_verbs = matriz_tags.sumar_tags(conteos, ['VERB']).astype(np.float64)
+        n_pron = matriz_tags.sumar_tags(conteos, ['PRON']).astype(np.float64)
+        n_adj_adv = matriz_tags.sumar_tags(conteos, ['ADJ', 'ADV']).astype(np.float64)
+        con_tokens = n_tokens > 0
+
+        # Sin verbos, el ratio es el número de sustantivos (regla original)
+        ratio_sv = np.divide(n_subs, n_verbs, out=n_subs.copy(), where=n_verbs > 0)
+        densidad = np.divide(n_subs + n_verbs + n_adj_adv, n_tokens,
+                             out=np.zeros(len(conteos)), where=con_tokens)
+        pct_pron = np.divide(n_pron, n_tokens, out=np.zeros(len(conteos)), where=con_tokens) * 100
+
+        return pd.DataFrame({
+            'n_tokens': n_tokens,
+            'ratio_sv': ratio_sv,
+            'densidad_lexica': densidad,
+            'pct_pronombres': pct_pron,
+        }, index=conteos.index)
 
     def preparar_datos(self):
         """Replica la lógica de filtrado y cálculo del notebook 05."""
         if self.df.empty: return None
 
-        # 1. Extraer POS tags
-        self.df['pos_list'] = self.df['Lematizado'].apply(self.extraer_pos_tags)
-
-        # 2. Cálculos de métricas por canción (Lógica original)
-        def calcular_metricas_row(pos_list):
-            if not pos_list: return pd.Series([0, 0, 0, 0])
-
-            n_tokens = len(pos_list)
-            n_subs = sum(1 for tag in pos_list if tag == 'NOUN')
-            n_verbs = sum(1 for tag in pos_list if tag == 'VERB')
-            n_pron = sum(1 for tag in pos_list if tag == 'PRON')
-            n_adj_adv = sum(1 for tag in pos_list if tag in ['ADJ', 'ADV'])
-
-            ratio_sv = n_subs / n_verbs if n_verbs > 0 else n_subs
-            densidad = (n_subs + n_verbs + n_adj_adv) / n_tokens if n_tokens > 0 else 0
-            pct_pron = (n_pron / n_tokens) * 100 if n_tokens > 0 else 0
-
-            return pd.Series([n_tokens, ratio_sv, densidad, pct_pron])
-
-        self.df[['n_tokens', 'ratio_sv', 'densidad_lexica', 'pct_pronombres']] = \
-            self.df['pos_list'].apply(calcular_metricas_row)
+        # 1 y 2. Conteos de tags por canción y métricas vectorizadas sobre ellos
+        conteos = matriz_tags.matriz_tags(self.df['Lematizado'])
+        metricas = self.calcular_metricas(conteos)
+        for columna in metricas.columns:
+            self.df[columna] = metricas[columna]
 
         # 3. Filtrar géneros con más de 50 canciones (Tu criterio original)
         conteo_generos = self.df['Genero'].value_counts()
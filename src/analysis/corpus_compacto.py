@@ -0,0 +1,125 @@
+"""
+Clase: corpus_compacto
+
+Objetivo: Py con una representación compacta de una columna etiquetada: vocabulario global de
+tokens/lemas, tabla de tags POS y, para todo el corpus, arreglos contiguos de ids de token
+(int32) y de tag (uint8) con offsets por canción (estilo CSR). Ocupa una fracción de las listas
+de tuplas (str, str) y permite calcular métricas con operaciones de NumPy en lugar de bucles.
+matriz_tags guarda en su caché el corpus compacto de cada columna etiquetada (en lugar de
+volver a recorrer las tuplas) y construye a partir de él la matriz de conteos de los análisis
+
+Cambios:
+
+"""
+import numpy as np
+import pandas as pd
+
+from src.analysis import etiquetas_pos
+
+_MAXIMO_TAGS = np.iinfo(np.uint8).max + 1
+
+
+def _codificar(valores, tabla, maximo=None):
+    """
+    Convierte `valores` en ids de `tabla`. Los valores nuevos se agregan al final de `tabla`
+    (en el lugar), de modo que los ids ya asignados no cambian y la tabla se puede compartir
+    entre corpus. Si la tabla superaría `maximo` entradas se lanza ValueError sin modificarla.
+    """
+    valores = np.asarray(valores, dtype=object)
+    if tabla:
+        ids = pd.Index(tabla).get_indexer(valores)
+    else:
+        ids = np.full(len(valores), -1, dtype=np.int64)
+    desconocidos = ids == -1
+    if desconocidos.any():
+        ids_nuevos, nuevos = pd.factorize(valores[desconocidos])
+        if maximo is not None and len(tabla) + len(nuevos) > maximo:
+            raise ValueError(f"Demasiados valores distintos: {len(tabla) + len(nuevos)} (máximo {maximo})")
+        ids[desconocidos] = ids_nuevos + len(tabla)
+        tabla.extend(nuevos.tolist())
+    return ids
+
+
+class corpus_compacto:
+    def __init__(self, vocabulario, tags, ids_token, ids_tag, offsets):
+        """
+        Args:
+            vocabulario (list): Token/lema de cada id de token
+            tags (list): Tag POS de cada id de tag (a lo sumo 256)
+            ids_token (ndarray): int32, ids de token de todo el corpus, canción tras canción
+            ids_tag (ndarray): uint8, id de tag de cada token
+            offsets (ndarray): int64, los tokens de la canción i son [offsets[i], offsets[i+1])
+        """
+        self.vocabulario = vocabulario
+        self.tags = tags
+        self.ids_token = ids_token
+        self.ids_tag = ids_tag
+        self.offsets = offsets
+
+    @classmethod
+    def desde_tuplas(cls, filas, vocabulario=None, tags=None):
+        """
+        Codifica una columna etiquetada (listas de tuplas, listas de oraciones de NLTK, structs de
+        Parquet o el repr de los CSV). Pasar el `vocabulario` y los `tags` de otro corpus los
+        comparte y los amplía con los valores nuevos.
+        """
+        vocabulario = [] if vocabulario is None else vocabulario
+        tags = [] if tags is None else tags
+
+        pares_por_cancion = [etiquetas_pos.extraer_pares(fila) for fila in filas]
+        offsets = np.zeros(len(pares_por_cancion) + 1, dtype=np.int64)
+        np.cumsum([len(pares) for pares in pares_por_cancion], out=offsets[1:])
+
+        pares = [par for pares in pares_por_cancion for par in pares]
+        tokens = [token for token, _ in pares]
+        etiquetas = [tag for _, tag in pares]
+
+        ids_tag = _codificar(etiquetas, tags, maximo=_MAXIMO_TAGS)
+        ids_token = _codificar(tokens, vocabulario)
+        return cls(vocabulario, tags, ids_token.astype(np.int32), ids_tag.astype(np.uint8), offsets)
+
+    @classmethod
+    def desde_df(cls, df, columna='Lematizado', vocabulario=None, tags=None):
+        return cls.desde_tuplas(df[columna].tolist(), vocabulario, tags)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def n_tokens(self):
+        return len(self.ids_token)
+
+    def longitudes(self):
+        """Número de tokens de cada canción."""
+        return np.diff(self.offsets)
+
+    def cancion_por_token(self):
+        """Índice de la canción a la que pertenece cada token (para agrupar con bincount)."""
+        return np.repeat(np.arange(len(self), dtype=np.int32), self.longitudes())
+
+    def cancion(self, indice):
+        """Lista de tuplas (token, tag) de una canción."""
+        inicio, fin = self.offsets[indice], self.offsets[indice + 1]
+        return [(self.vocabulario[id_token], self.tags[id_tag])
+                for id_token, id_tag in zip(self.ids_token[inicio:fin].tolist(),
+                                            self.ids_tag[inicio:fin].tolist())]
+
+    def a_tuplas(self):
+        """
+        Decodifica a una lista de tuplas (token, tag) por canción. Las oraciones de NLTK quedan
+        aplanadas en una sola lista por canción.
+        """
+        tokens = np.asarray(self.vocabulario, dtype=object)[self.ids_token]
+        etiquetas = np.asarray(self.tags, dtype=object)[self.ids_tag]
+        pares = list(zip(tokens.tolist(), etiquetas.tolist()))
+        offsets = self.offsets.tolist()
+        return [pares[inicio:fin] for inicio, fin in zip(offsets[:-1], offsets[1:])]
+
+    def ids_de_tags(self, etiquetas):
+        """Ids de los tags de `etiquetas` presentes en la tabla (para máscaras con np.isin)."""
+        posiciones = {tag: indice for indice, tag in enumerate(self.tags)}
+        return np.array([posiciones[tag] for tag in etiquetas if tag in posiciones], dtype=np.uint8)
+
+    def memoria_bytes(self):
+        """Bytes ocupados por los arreglos (sin contar el vocabulario compartido)."""
+        return self.ids_token.nbytes + self.ids_tag.nbytes + self.offsets.nbytes
@@ -0,0 +1,90 @@
+"""
+Clase: etiquetas_pos
+
+Objetivo: Py con funciones compartidas por los módulos de análisis para leer las columnas
+etiquetadas, tanto en formato nativo (listas de tuplas, Parquet o dcc.Store) como en el repr
+de Python que dejan los CSV antiguos
+
+Cambios:
+
+"""
+import ast
+import re
+
+import numpy as np
+
+# Una tupla (token, tag) dentro del repr: el token puede ir entre comillas simples o dobles
+# (por ejemplo "wishin'"), el tag nunca lleva comillas
+_PATRON_PAR = re.compile(
+    r"""\(\s*('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")\s*,\s*'([^']*)'\s*\)"""
+)
+# Un string de Python entre comillas simples o dobles
+_PATRON_CADENA = re.compile(r"""'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*\"""")
+
+
+def _literal(cadena):
+    """Quita las comillas de un literal de string; solo usa ast si hay escapes."""
+    if '\\' in cadena:
+        return ast.literal_eval(cadena)
+    return cadena[1:-1]
+
+
+def _es_secuencia(valor):
+    return isinstance(valor, (list, tuple, np.ndarray))
+
+
+def _es_par(valor):
+    return (isinstance(valor, (tuple, list)) and len(valor) == 2
+            and isinstance(valor[0], str) and isinstance(valor[1], str))
+
+
+def _aplanar_pares(valor, resultado):
+    for elemento in valor:
+        if isinstance(elemento, dict):
+            campos = list(elemento.values())
+            resultado.append((campos[0], campos[-1]))
+        elif _es_par(elemento):
+            resultado.append((elemento[0], elemento[1]))
+        elif _es_secuencia(elemento):
+            _aplanar_pares(elemento, resultado)
+    return resultado
+
+
+def extraer_pares(valor):
+    """
+    Retorna la lista plana de (token, tag) de una celda etiquetada (una o dos listas anidadas).
+    Una lista plana de tuplas se devuelve tal cual, sin copiarla: no se debe modificar.
+    """
+    if isinstance(valor, str):
+        return [(_literal(token), tag) for token, tag in _PATRON_PAR.findall(valor)]
+    # Caso más frecuente (pipeline, Parquet): una lista plana de tuplas (token, tag)
+    if isinstance(valor, list) and valor and isinstance(valor[0], tuple) and _es_par(valor[0]):
+        return valor
+    if _es_secuencia(valor):
+        return _aplanar_pares(valor, [])
+    return []
+
+
+def extraer_pos_tags(valor):
+    """Retorna la lista plana de tags de una celda etiquetada."""
+    if isinstance(valor, str):
+        return [tag for _, tag in _PATRON_PAR.findall(valor)]
+    # Caso más frecuente (pipeline, Parquet, dcc.Store): una lista plana de pares
+    if isinstance(valor, list) and valor and _es_par(valor[0]):
+        return [par[1] for par in valor]
+    return [tag for _, tag in extraer_pares(valor)]
+
+
+def extraer_palabras(valor):
+    """Retorna la lista plana de tokens de una celda de tokens (lista o lista de oraciones)."""
+    if isinstance(valor, str):
+        return [_literal(cadena) for cadena in _PATRON_CADENA.findall(valor)]
+    if not _es_secuencia(valor):
+        return []
+    palabras = []
+    for elemento in valor:
+        if isinstance(elemento, str):
+            palabras.append(elemento)
+        elif _es_secuencia(elemento):
+            palabras.extend(extraer_palabras(elemento))
+    return palabras
@@ -1,65 +1,75 @@
 import pandas as pd
 import numpy as np
-import re
 import plotly.graph_objects as go
 import plotly.express as px
-from scipy.stats import pearsonr
+
+from src.analysis import etiquetas_pos, matriz_tags
 
 
 class evolucion_temporal:
-    def __init__(self, df):
+    # Subir cuando cambien las métricas o las figuras (invalida cache_resultados)
+    VERSION_ANALISIS = 1
+
+    # Límites de los periodos (año inicial de cada uno desde el segundo) y sus etiquetas
+    LIMITES_PERIODO = (1990, 2000, 2010, 2020)
+    ETIQUETAS_PERIODO = ('Pre-90s', '90s', '2000s', '2010s', '2020s')
+
+    def __init__(self, df, limites_periodo=None, etiquetas_periodo=None):
         # Mantenemos el filtrado original del notebook
         self.df = df[df['Periodo'] >= 1980.0].copy()
         self.tendencias_anuales = None
+        self.limites_periodo = tuple(limites_periodo or self.LIMITES_PERIODO)
+        self.etiquetas_periodo = tuple(etiquetas_periodo or self.ETIQUETAS_PERIODO)
+        if len(self.etiquetas_periodo) != len(self.limites_periodo) + 1:
+            raise ValueError("Se necesita una etiqueta más que límites de periodo")
+        if list(self.limites_periodo) != sorted(self.limites_periodo):
+            raise ValueError("Los límites de periodo deben estar en orden creciente")
 
     def extraer_pos_tags(self, pos_string):
-        if pd.isna(pos_string): return []
-        return re.findall(r",\s*'([^']+)'\)", str(pos_string))
+        return etiquetas_pos.extraer_pos_tags(pos_string)
 
     def extraer_palabras(self, tokens_string):
-        if pd.isna(tokens_string): return []
-        return re.findall(r"'([^']+)'", str(tokens_string))
+        return etiquetas_pos.extraer_palabras(tokens_string)
 
-    def calcular_complejidad_gramatical(self, pos_list):
-        if not pos_list: return 0
-        # Lógica original: (ADJ + ADV + SCONJ + CCONJ) / total
-        complejas = sum(1 for tag in pos_list if tag in ['ADJ', 'ADV', 'SCONJ', 'CCONJ'])
-        return complejas / len(pos_list)
+    def calcular_complejidad_gramatical(self, conteos):
+        # Lógica original: (ADJ + ADV + SCONJ + CCONJ) / total, 0 si no hay tokens
+        return matriz_tags.proporcion_tags(conteos, ['ADJ', 'ADV', 'SCONJ', 'CCONJ'])
 
     def calcular_diversidad_lexica(self, palabras):
-        if not palabras: return 0
-        return len(set(palabras)) / len(palabras)
-
-    def calcular_longitud_promedio_oracion(self, pos_list):
-        if not pos_list: return 0
-        puntuaciones = sum(1 for tag in pos_list if tag == 'PUNCT')
-        return len(pos_list) / puntuaciones if puntuaciones > 0 else len(pos_list)
-
-    def categorizar_periodo(self, year):
-        if pd.isna(year): return 'Desconocido'
-        year = int(year)
-        if year < 1990:
-            return 'Pre-90s'
-        elif 1990 <= year < 2000:
-            return '90s'
-        elif 2000 <= year < 2010:
-            return '2000s'
-        elif 2010 <= year < 2020:
-            return '2010s'
-        return '2020s'
+        # Palabras distintas / palabras totales, 0 si la canción no tiene palabras
+        total = palabras['total'].to_numpy()
+        return np.divide(palabras['unicas'].to_numpy(), total, out=np.zeros(len(palabras)),
+                         where=total > 0)
+
+    def calcular_longitud_promedio_oracion(self, conteos):
+        # Tokens por signo de puntuación; sin puntuación, el total de tokens
+        total = matriz_tags.total_tokens(conteos)
+        puntuaciones = matriz_tags.sumar_tags(conteos, ['PUNCT'])
+        return np.divide(total, puntuaciones, out=total.astype(float), where=puntuaciones > 0)
+
+    def categorizar_periodo(self, years):
+        # Un solo searchsorted sobre los límites; el año se trunca como en la versión por fila
+        years = pd.to_numeric(years, errors='coerce').to_numpy(dtype=np.float64)
+        desconocido = np.isnan(years)
+        posiciones = np.searchsorted(np.asarray(self.limites_periodo, dtype=np.float64),
+                                     np.trunc(np.where(desconocido, 0, years)), side='right')
+        etiquetas = np.array(self.etiquetas_periodo, dtype=object)[posiciones]
+        etiquetas[desconocido] = 'Desconocido'
+        return etiquetas
 
     def preparar_datos(self):
         """Aplica las métricas al dataframe."""
         if self.df.empty: return None
 
-        # Procesamiento idéntico al notebook
-        self.df['pos_list'] = self.df['Lematizado'].apply(self.extraer_pos_tags)
-        self.df['palabras_list'] = self.df['tokens'].apply(self.extraer_palabras)
+        # Mismas métricas que el notebook, sobre los conteos compartidos (y cacheados) de tags
+        # y de palabras por canción
+        conteos = matriz_tags.matriz_tags(self.df['Lematizado'])
+        palabras = matriz_tags.conteo_palabras(self.df['tokens'])
 
-        self.df['complejidad_gramatical'] = self.df['pos_list'].apply(self.calcular_complejidad_gramatical)
-        self.df['diversidad_lexica'] = self.df['palabras_list'].apply(self.calcular_diversidad_lexica)
-        self.df['longitud_oracion'] = self.df['pos_list'].apply(self.calcular_longitud_promedio_oracion)
-        self.df['Periodo_Categoria'] = self.df['Periodo'].apply(self.categorizar_periodo)
+        self.df['complejidad_gramatical'] = self.calcular_complejidad_gramatical(conteos)
+        self.df['diversidad_lexica'] = self.calcular_diversidad_lexica(palabras)
+        self.df['longitud_oracion'] = self.calcular_longitud_promedio_oracion(conteos)
+        self.df['Periodo_Categoria'] = self.categorizar_periodo(self.df['Periodo'])
 
         # Agrupación anual para tendencias
         self.tendencias_anuales = self.df.groupby('Periodo').agg({
@@ -72,6 +82,9 @@ class evolucion_temporal:
 
     def grafico_evolucion_complejidad(self):
         """Replica el gráfico de líneas con tendencia de Pearson."""
+        # scipy se importa aquí para que la página Evolucion no lo cargue al arrancar el dashboard
+        from scipy.stats import pearsonr
+
         df_plot = self.tendencias_anuales
         x, y = df_plot['Periodo'], df_plot['complejidad_gramatical']
         corr, _ = pearsonr(x, y)
@@ -88,7 +101,7 @@ class evolucion_temporal:
 
     def grafico_distribucion_longitud(self):
         """Genera un Boxplot por década."""
-        orden = ['Pre-90s', '90s', '2000s', '2010s', '2020s']
+        orden = list(self.etiquetas_periodo)
         # Filtrar solo periodos presentes para evitar errores de eje
         periodos_presentes = [p for p in orden if p in self.df['Periodo_Categoria'].unique()]
 
@@ -0,0 +1,187 @@
+"""
+Clase: matriz_tags
+
+Objetivo: Py con la matriz de conteos canciones × tags POS compartida por los módulos de
+análisis. Se construye una sola vez por corpus etiquetado (queda en una caché por ID del dataset
+de registro_datasets y filas seleccionadas) y las métricas por canción se calculan como
+aritmética de columnas sobre ella, en lugar de recorrer la lista de tags de cada canción una vez
+por métrica. Los conteos de palabras totales y distintas por canción (diversidad léxica) se
+guardan en la misma caché
+
+Cambios:
+
+"""
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+from src.analysis import etiquetas_pos
+from src.analysis.corpus_compacto import corpus_compacto
+
+# Tres entradas por dataset: corpus compacto, matriz de tags y conteo de palabras
+_CAPACIDAD_CACHE = 12
+_cache = OrderedDict()
+_estadisticas = {'aciertos': 0, 'fallos': 0}
+_candado = threading.Lock()
+# Celdas que se muestrean para la huella de una columna
+_MUESTRAS_HUELLA = 16
+
+
+def construir_matriz_tags(valores):
+    """
+    Cuenta los tags de cada celda etiquetada.
+
+    Args:
+        valores (list): Celdas de una columna etiquetada (listas de tuplas o repr de CSV)
+
+    Returns:
+        DataFrame: Una fila por celda y una columna int32 por tag (ordenadas alfabéticamente)
+    """
+    tags_por_cancion = [etiquetas_pos.extraer_pos_tags(valor) for valor in valores]
+    longitudes = np.array([len(tags) for tags in tags_por_cancion], dtype=np.int64)
+    ids, tags = pd.factorize(np.array(list(chain.from_iterable(tags_por_cancion)), dtype=object),
+                             sort=True)
+    return _contar(ids, longitudes, list(tags))
+
+
+def matriz_desde_corpus_compacto(corpus):
+    """
+    Matriz de conteos a partir de un corpus_compacto, sin decodificar los tags. Las columnas
+    quedan en orden alfabético, igual que en construir_matriz_tags()
+    """
+    matriz = _contar(corpus.ids_tag.astype(np.int64), corpus.longitudes(), list(corpus.tags))
+    return matriz[sorted(matriz.columns)]
+
+
+def _contar(ids, longitudes, tags):
+    n_canciones, n_tags = len(longitudes), len(tags)
+    filas = np.repeat(np.arange(n_canciones, dtype=np.int64), longitudes)
+    conteos = np.bincount(filas * n_tags + ids, minlength=n_canciones * n_tags)
+    return pd.DataFrame(conteos.reshape(n_canciones, n_tags).astype(np.int32), columns=tags)
+
+
+def _huella_indice(indice):
+    if isinstance(indice, pd.RangeIndex):
+        return ('rango', indice.start, indice.stop, indice.step)
+    return hashlib.sha1(pd.util.hash_pandas_object(indice).to_numpy().tobytes()).hexdigest()
+
+
+def _huella(serie):
+    """
+    Clave barata de una columna para la caché, sin recorrer todas sus celdas. Si la columna viene
+    de registro_datasets (su ID queda en attrs y se propaga a proyecciones, copias y filtros) la
+    clave es ese ID, el nombre de la columna, las filas seleccionadas y una muestra de celdas; si
+    no, la identidad del objeto, su longitud y la misma muestra
+
+    Returns:
+        tuple: (clave, referencia débil a la serie para verificar la identidad, o None)
+    """
+    posiciones = np.unique(np.linspace(0, len(serie) - 1, min(len(serie), _MUESTRAS_HUELLA)).astype(np.int64))
+    muestra = hashlib.sha1(repr(serie.iloc[posiciones].tolist()).encode('utf-8')).hexdigest()
+    id_dataset = serie.attrs.get('id_dataset')
+    if id_dataset is not None:
+        return (id_dataset, serie.name, _huella_indice(serie.index), muestra), None
+    return ('objeto', id(serie), len(serie), muestra), weakref.ref(serie)
+
+
+def construir_conteo_palabras(valores):
+    """
+    Cuenta las palabras totales y distintas de cada celda de tokens.
+
+    Args:
+        valores (list): Celdas de una columna de tokens (listas, listas de oraciones o repr de CSV)
+
+    Returns:
+        DataFrame: Una fila por celda con las columnas int64 'total' y 'unicas'
+    """
+    palabras_por_cancion = [etiquetas_pos.extraer_palabras(valor) for valor in valores]
+    n_canciones = len(palabras_por_cancion)
+    longitudes = np.array([len(palabras) for palabras in palabras_por_cancion], dtype=np.int64)
+    ids, vocabulario = pd.factorize(
+        np.array(list(chain.from_iterable(palabras_por_cancion)), dtype=object)
+    )
+    # Un par (canción, palabra) por entrada distinta: basta contar los pares únicos por canción
+    filas = np.repeat(np.arange(n_canciones, dtype=np.int64), longitudes)
+    pares = np.unique(filas * max(len(vocabulario), 1) + ids)
+    unicas = np.bincount(pares // max(len(vocabulario), 1), minlength=n_canciones)
+    return pd.DataFrame({'total': longitudes, 'unicas': unicas.astype(np.int64)})
+
+
+def _desde_cache(tipo, serie, construir):
+    huella, referencia = _huella(serie)
+    clave = (tipo, huella)
+    with _candado:
+        entrada = _cache.get(clave)
+        # Una clave por identidad solo vale mientras el objeto guardado sea el mismo
+        if entrada is not None and (entrada[1] is None or entrada[1]() is serie):
+            _cache.move_to_end(clave)
+            _estadisticas['aciertos'] += 1
+            return entrada[0]
+        _estadisticas['fallos'] += 1
+    resultado = construir()
+    with _candado:
+        _cache[clave] = (resultado, referencia)
+        if len(_cache) > _CAPACIDAD_CACHE:
+            _cache.popitem(last=False)
+    return resultado
+
+
+def corpus_compacto_de(serie):
+    """
+    Corpus compacto (ids de token y de tag por canción) de una columna etiquetada, con la misma
+    caché que la matriz: la columna se recorre una sola vez y los análisis trabajan sobre arreglos
+    """
+    return _desde_cache('compacto', serie, lambda: corpus_compacto.desde_tuplas(serie.tolist()))
+
+
+def matriz_tags(serie):
+    """
+    Matriz de conteos de una columna etiquetada, indexada como `serie`. Se construye a partir de
+    su corpus compacto y ambos se guardan en una caché LRU por ID del dataset (ver _huella), de modo que
+    cada página del dashboard (y cada callback) reutiliza la misma en lugar de volver a recorrer
+    todos los tokens.
+    """
+    matriz = _desde_cache('tags', serie, lambda: matriz_desde_corpus_compacto(corpus_compacto_de(serie)))
+    return pd.DataFrame(matriz.to_numpy(), index=serie.index, columns=matriz.columns, copy=False)
+
+
+def conteo_palabras(serie):
+    """Palabras totales y distintas por canción de una columna de tokens, con la misma caché."""
+    conteo = _desde_cache('palabras', serie, lambda: construir_conteo_palabras(serie.tolist()))
+    return pd.DataFrame(conteo.to_numpy(), index=serie.index, columns=conteo.columns, copy=False)
+
+
+def limpiar_cache():
+    with _candado:
+        _cache.clear()
+        _estadisticas.update(aciertos=0, fallos=0)
+
+
+def estadisticas_cache():
+    """Aciertos y fallos de la caché desde la última limpieza, y entradas guardadas."""
+    with _candado:
+        return {**_estadisticas, 'entradas': len(_cache)}
+
+
+def total_tokens(conteos):
+    """Número de tokens etiquetados de cada canción."""
+    return conteos.to_numpy().sum(axis=1)
+
+
+def sumar_tags(conteos, tags):
+    """Suma por canción de las columnas de `tags` (los tags ausentes del corpus cuentan 0)."""
+    presentes = [tag for tag in tags if tag in conteos.columns]
+    if not presentes:
+        return np.zeros(len(conteos), dtype=np.int64)
+    return conteos[presentes].to_numpy().sum(axis=1)
+
+
+def proporcion_tags(conteos, tags):
+    """Fracción de tokens de cada canción con un tag de `tags` (0 en canciones sin tokens)."""
+    total = total_tokens(conteos)
+    return np.divide(sumar_tags(conteos, tags), total, out=np.zeros(len(conteos)), where=total > 0)
@@ -0,0 +1,145 @@
+"""
+Clase: puntuacion_sentimiento
+
+Objetivo: Py con la etapa de puntuación de sentimiento (polaridad y subjetividad de TextBlob)
+de analisis_emocional. Reparte las letras en fragmentos sobre un ProcessPoolExecutor y guarda
+los resultados en el almacén incremental por huella de letra + versión del puntuador, de modo
+que las cargas repetidas del dashboard y de los notebooks solo puntúan letras nuevas
+
+Cambios:
+
+"""
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+import textblob
+from textblob import TextBlob
+
+from src.pos_tagging.almacen_incremental import almacen_incremental
+from src.utils.eventos_progreso import bus_progreso
+
+# Subir cuando cambie la forma de puntuar (invalida el almacén de sentimiento)
+VERSION_PUNTUADOR = 1
+COLUMNAS_SENTIMIENTO = ['polaridad', 'subjetividad']
+
+# Pool compartido por todas las instancias del proceso (el dashboard crea una por carga de
+# página): los trabajadores arrancan e importan TextBlob una sola vez
+_pool = None
+_pool_procesos = 0
+_pool_candado = threading.Lock()
+
+
+def puntuar_letra(texto):
+    """Retorna (polaridad, subjetividad) de una letra usando TextBlob; (0, 0) si es nula o falla."""
+    if pd.isna(texto):
+        return 0, 0
+    try:
+        sentimiento = TextBlob(str(texto)).sentiment
+        return sentimiento.polarity, sentimiento.subjectivity
+    except Exception:
+        return 0, 0
+
+
+def _puntuar_fragmento(letras):
+    """Trabajo de cada proceso: puntúa un fragmento de letras en orden."""
+    return [puntuar_letra(letra) for letra in letras]
+
+
+def _obtener_pool(n_procesos):
+    """
+    Pool de `n_procesos` trabajadores del proceso, creado en la primera llamada. Se arranca con
+    "spawn": el servidor del dashboard tiene hilos (gestor de trabajos, Flask) y un fork los
+    copiaría con sus candados tomados
+    """
+    global _pool, _pool_procesos
+    with _pool_candado:
+        if _pool is not None and _pool_procesos != n_procesos:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=n_procesos, mp_context=multiprocessing.get_context("spawn"))
+            _pool_procesos = n_procesos
+        return _pool
+
+
+def _descartar_pool(ejecutor):
+    """Quita del proceso un pool roto (un trabajador terminó de forma abrupta)."""
+    global _pool
+    with _pool_candado:
+        if _pool is ejecutor:
+            _pool = None
+    ejecutor.shutdown(wait=False, cancel_futures=True)
+
+
+@atexit.register
+def _cerrar_pool():
+    global _pool
+    with _pool_candado:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+class puntuacion_sentimiento:
+    def __init__(self, n_procesos=None, tamano_fragmento=500, persistente=True, progreso=None):
+        """
+        Args:
+            n_procesos (int): Procesos del pool compartido (por defecto, los núcleos disponibles).
+                Con 1, o si las letras pendientes caben en un fragmento, se puntúa en el proceso actual
+            tamano_fragmento (int): Letras por tarea enviada al pool
+            persistente (bool): Reutiliza y guarda los resultados en data/cache/sentimiento.parquet
+            progreso (bus_progreso): Destino de los mensajes (por defecto, consola)
+        """
+        self._n_procesos = n_procesos or os.cpu_count() or 1
+        self._tamano_fragmento = tamano_fragmento
+        self._persistente = persistente
+        self._progreso = progreso or bus_progreso.consola()
+
+    def version(self):
+        """Identifica TextBlob y la lógica de puntuación; forma parte de la huella del almacén."""
+        return f"textblob|{textblob.__version__}|v{VERSION_PUNTUADOR}"
+
+    def puntuar(self, letras):
+        """
+        Args:
+            letras (Series): Letras de las canciones
+
+        Returns:
+            DataFrame: Columnas polaridad y subjetividad, con el mismo índice que `letras`
+        """
+        df = pd.DataFrame({'letra_cancion': letras.to_numpy()})
+        if self._persistente:
+            almacen = almacen_incremental('sentimiento', self.version(), nombre='sentimiento',
+                                          progreso=self._progreso)
+            df = almacen.procesar(df, self._puntuar_pendientes, COLUMNAS_SENTIMIENTO)
+        else:
+            df = self._puntuar_pendientes(df)
+        return pd.DataFrame(df[COLUMNAS_SENTIMIENTO].to_numpy(dtype=float),
+                            index=letras.index, columns=COLUMNAS_SENTIMIENTO)
+
+    def _puntuar_pendientes(self, df):
+        letras = df['letra_cancion'].tolist()
+        fragmentos = [letras[i:i + self._tamano_fragmento]
+                      for i in range(0, len(letras), self._tamano_fragmento)]
+        if self._n_procesos > 1 and len(fragmentos) > 1:
+            self._progreso.mensaje(f"Sentimiento: {len(letras)} letras en {len(fragmentos)} fragmentos, "
+                                   f"{self._n_procesos} procesos")
+            ejecutor = _obtener_pool(self._n_procesos)
+            try:
+                resultados = [par for fragmento in ejecutor.map(_puntuar_fragmento, fragmentos)
+                              for par in fragmento]
+            except BrokenProcessPool:
+                _descartar_pool(ejecutor)
+                raise
+        else:
+            resultados = _puntuar_fragmento(letras)
+
+        df = df.copy()
+        df['polaridad'] = [polaridad for polaridad, _ in resultados]
+        df['subjetividad'] = [subjetividad for _, subjetividad in resultados]
+        return df
@@ -0,0 +1,110 @@
+"""
+Clase: benchmark_comparacion_generos
+
+Objetivo: Py con el micro-benchmark de comparacion_generos.preparar_datos: compara el cálculo
+original fila a fila (Series.apply que devuelve un pd.Series por canción) con el vectorizado
+sobre la matriz de conteos de tags, verifica que den los mismos valores y mide la aceleración
+con corpus sintéticos de 10k, 100k y 1M canciones
+
+Uso: python -m src.benchmark.benchmark_comparacion_generos [--tamanos 10000 100000] [--perfil perfil.json]
+
+Cambios:
+
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.analysis import etiquetas_pos, matriz_tags
+from src.analysis.comparacion_generos import comparacion_generos
+from src.benchmark.corpus_sintetico import corpus_sintetico, cargar_perfil
+
+TAMANOS_POR_DEFECTO = (10_000, 100_000, 1_000_000)
+_METRICAS = ['n_tokens', 'ratio_sv', 'densidad_lexica', 'pct_pronombres']
+
+
+def metricas_fila_a_fila(df):
+    """Cálculo original de preparar_datos (antes de la matriz de conteos), como referencia."""
+    pos_list = df['Lematizado'].apply(etiquetas_pos.extraer_pos_tags)
+
+    def calcular_metricas_row(pos_list):
+        if not pos_list: return pd.Series([0, 0, 0, 0])
+
+        n_tokens = len(pos_list)
+        n_subs = sum(1 for tag in pos_list if tag == 'NOUN')
+        n_verbs = sum(1 for tag in pos_list if tag == 'VERB')
+        n_pron = sum(1 for tag in pos_list if tag == 'PRON')
+        n_adj_adv = sum(1 for tag in pos_list if tag in ['ADJ', 'ADV'])
+
+        ratio_sv = n_subs / n_verbs if n_verbs > 0 else n_subs
+        densidad = (n_subs + n_verbs + n_adj_adv) / n_tokens if n_tokens > 0 else 0
+        pct_pron = (n_pron / n_tokens) * 100 if n_tokens > 0 else 0
+
+        return pd.Series([n_tokens, ratio_sv, densidad, pct_pron])
+
+    resultado = pos_list.apply(calcular_metricas_row)
+    resultado.columns = _METRICAS
+    return resultado
+
+
+def metricas_vectorizadas(df):
+    """Cálculo actual: matriz de conteos (sin caché) + operaciones de columnas."""
+    matriz_tags.limpiar_cache()
+    return comparacion_generos.calcular_metricas(matriz_tags.matriz_tags(df['Lematizado']))
+
+
+def _cronometrar(funcion, *args):
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def ejecutar(tamanos=TAMANOS_POR_DEFECTO, con_referencia=True, semilla=0, perfil=None):
+    """
+    Args:
+        tamanos (iterable): Canciones de cada corpus sintético
+        con_referencia (bool): Mide también el cálculo fila a fila y compara los valores
+        semilla (int): Semilla de corpus_sintetico
+        perfil (dict): Perfil del corpus (por defecto, de data/raw)
+    """
+    corpus = corpus_sintetico(perfil, semilla)
+    filas = []
+    for n_canciones in tamanos:
+        df = corpus.generar(n_canciones, etiquetado=True)
+        vectorizado, segundos_vectorizado = _cronometrar(metricas_vectorizadas, df)
+        # Segunda llamada con la matriz ya en caché (caso de los callbacks del dashboard)
+        _, segundos_cache = _cronometrar(
+            lambda: comparacion_generos.calcular_metricas(matriz_tags.matriz_tags(df['Lematizado']))
+        )
+        fila = {'canciones': n_canciones, 'vectorizado_s': segundos_vectorizado,
+                'con_cache_s': segundos_cache}
+
+        if con_referencia:
+            referencia, segundos_referencia = _cronometrar(metricas_fila_a_fila, df)
+            identicos = all(np.array_equal(referencia[columna].to_numpy(np.float64),
+                                           vectorizado[columna].to_numpy())
+                            for columna in _METRICAS)
+            if not identicos:
+                raise AssertionError(f"Las métricas vectorizadas difieren con {n_canciones} canciones")
+            fila.update({'fila_a_fila_s': segundos_referencia,
+                         'aceleracion': segundos_referencia / segundos_vectorizado})
+        filas.append(fila)
+        print(f"✓ {n_canciones:>9,} canciones: " +
+              ", ".join(f"{clave}={valor:.3f}" for clave, valor in fila.items() if clave != 'canciones'))
+    return pd.DataFrame(filas)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-benchmark de comparacion_generos.preparar_datos")
+    parser.add_argument('--tamanos', type=int, nargs='+', default=list(TAMANOS_POR_DEFECTO))
+    parser.add_argument('--sin-referencia', action='store_true',
+                        help="No ejecuta el cálculo fila a fila (lento con 1M de canciones)")
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--perfil', help="Perfil JSON del corpus (por defecto, se extrae de data/raw)")
+    argumentos = parser.parse_args()
+    perfil = cargar_perfil(argumentos.perfil) if argumentos.perfil and os.path.exists(argumentos.perfil) else None
+    print(ejecutar(argumentos.tamanos, not argumentos.sin_referencia, argumentos.semilla,
+                   perfil).to_string(index=False))
@@ -0,0 +1,317 @@
+"""
+Clase: benchmark_suite
+
+Objetivo: Py con la suite de benchmarks sobre corpus sintéticos (corpus_sintetico) de 10k, 100k
+y 1M canciones: mide cada etapa de pipeline_spacy y pipeline_nltk (con su instrumentación por
+etapa), los tres análisis (comparacion_generos, evolucion_temporal, analisis_emocional) y la
+carga/guardado del corpus en CSV y Parquet con carga_corpus. Los resultados se guardan en JSON
+(entorno, commit, semilla, huella del perfil y una fila por medición) para comparar commits y
+dimensionar el hardware; no necesita red si el modelo de spaCy y los datos de NLTK ya están
+instalados
+
+Uso:
+    python -m src.benchmark.benchmark_suite [--tamanos 10000 100000] [--tamanos-pipeline 10000]
+        [--componentes pipeline_spacy analisis] [--comparar data/benchmarks/anterior.json]
+
+Cambios:
+
+"""
+import argparse
+import importlib.metadata
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime
+
+from src.benchmark.corpus_sintetico import corpus_sintetico, perfil_desde_raw, cargar_perfil, guardar_perfil
+from src.utils import path
+from src.utils.eventos_progreso import bus_progreso
+from src.utils.instrumentacion import contar_tokens, memoria_residente
+
+TAMANOS_POR_DEFECTO = (10_000, 100_000, 1_000_000)
+# Los pipelines etiquetan a cientos de canciones/s: por defecto solo el corpus de 10k
+TAMANOS_PIPELINE_POR_DEFECTO = (10_000,)
+COMPONENTES = ("pipeline_spacy", "pipeline_nltk", "analisis", "carga_corpus")
+_PAQUETES = ("numpy", "pandas", "pyarrow", "spacy", "en_core_web_sm", "nltk", "textblob")
+
+
+def _ruta_benchmarks(*partes):
+    """Ruta relativa al proyecto (como RUTA_ENTRADA de los pipelines) dentro de data/benchmarks."""
+    return os.sep + os.path.join('data', 'benchmarks', *partes)
+
+
+def _directorio_proyecto():
+    return path.obtener_ruta_local() or os.getcwd()
+
+
+def entorno():
+    """Commit, versión de Python, plataforma, núcleos y versiones de las dependencias."""
+    def git(*argumentos):
+        try:
+            return subprocess.run(['git', *argumentos], cwd=_directorio_proyecto(), capture_output=True,
+                                  text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    versiones = {}
+    for paquete in _PAQUETES:
+        try:
+            versiones[paquete] = importlib.metadata.version(paquete)
+        except importlib.metadata.PackageNotFoundError:
+            versiones[paquete] = None
+    return {
+        'commit': git('rev-parse', 'HEAD'),
+        'cambios_sin_commit': bool(git('status', '--porcelain', '--untracked-files=no')),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'procesador': platform.processor() or platform.machine(),
+        'nucleos': os.cpu_count(),
+        'paquetes': versiones,
+    }
+
+
+def _registro(componente, etapa, canciones, segundos, tokens=None, **extra):
+    return {
+        'componente': componente,
+        'etapa': etapa,
+        'canciones': canciones,
+        'segundos': round(segundos, 4),
+        'canciones_s': round(canciones / segundos, 1) if segundos > 0 else None,
+        'tokens': tokens,
+        'tokens_s': round(tokens / segundos, 1) if tokens and segundos > 0 else None,
+        **extra,
+    }
+
+
+def _cronometrar(funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return resultado, time.perf_counter() - inicio
+
+
+def _preparar_corpus_csv(corpus, n_canciones):
+    """Escribe (una vez por tamaño y semilla) el corpus sintético como entrada de los pipelines."""
+    ruta = _ruta_benchmarks(f"corpus_sintetico_{corpus.perfil['huella']}_{corpus.semilla}_{n_canciones}.csv")
+    ruta_completa = _directorio_proyecto() + ruta
+    if not os.path.exists(ruta_completa):
+        corpus.escribir_csv(ruta_completa, n_canciones)
+    return ruta
+
+
+def medir_pipeline(motor, corpus, n_canciones, modo=None):
+    """
+    Ejecuta el pipeline completo sobre el corpus sintético (sin modo incremental ni puntos de
+    control, con los resultados en data/benchmarks) y convierte su instrumentación por etapa
+    en registros. La carga del corpus y de los recursos se mide aparte.
+    """
+    ruta_entrada = _preparar_corpus_csv(corpus, n_canciones)
+    ruta_salida = _ruta_benchmarks(f"resultados_{motor}_{n_canciones}.parquet")
+    progreso = bus_progreso()
+    if motor == "spacy":
+        from src.pos_tagging.pipeline_spacy import pipeline_spacy
+
+        modo = modo or "lotes"
+        instancia, segundos_carga = _cronometrar(lambda: pipeline_spacy(
+            ruta_entrada=ruta_entrada, ruta_salida=ruta_salida, progreso=progreso))
+    else:
+        from src.pos_tagging import pipeline_nltk as modulo_nltk
+
+        modo = modo or "paralelo"
+        # Caché de lemas en frío en cada medición (los trabajadores del modo paralelo ya lo están)
+        modulo_nltk._cache_lemas_proceso = None
+        instancia, segundos_carga = _cronometrar(lambda: modulo_nltk.pipeline_nltk(
+            ruta_entrada=ruta_entrada, ruta_salida=ruta_salida, persistir_cache_lemas=False,
+            progreso=progreso))
+
+    componente = f"pipeline_{motor}"
+    registros = [_registro(componente, "Carga del corpus y recursos", n_canciones, segundos_carga, modo=modo)]
+    instancia.ejecutar(modo=modo)
+    metricas = instancia.obtener_metricas()
+    for etapa in metricas['etapas']:
+        registros.append(_registro(
+            componente, etapa['etapa'], etapa['canciones'], etapa['segundos'], etapa['tokens'], modo=modo,
+            padre=etapa['padre'], cpu_segundos=etapa['cpu_segundos'], rss_delta_mb=etapa['rss_delta_mb'],
+            rss_pico_mb=etapa['rss_pico_mb'],
+        ))
+    registros.append(_registro(componente, "Total", n_canciones, metricas['segundos_total'], modo=modo))
+    return registros
+
+
+def medir_analisis(df):
+    """Los tres análisis sobre el corpus etiquetado, cada uno con la matriz de tags en frío."""
+    from src.analysis import matriz_tags
+    from src.analysis.analisis_emocional import analisis_emocional
+    from src.analysis.comparacion_generos import comparacion_generos
+    from src.analysis.evolucion_temporal import evolucion_temporal
+    from src.analysis.puntuacion_sentimiento import puntuacion_sentimiento
+
+    n_canciones = len(df)
+    tokens = contar_tokens(df['Lematizado'])
+    analisis = [
+        ("comparacion_generos.preparar_datos", lambda: comparacion_generos(df).preparar_datos()),
+        ("evolucion_temporal.preparar_datos", lambda: evolucion_temporal(df).preparar_datos()),
+        # Sin la caché persistente de sentimiento: se mide el cálculo, no la lectura de disco
+        ("analisis_emocional", lambda: analisis_emocional(
+            df, modo="lemas", puntuador=puntuacion_sentimiento(persistente=False))),
+    ]
+    registros = []
+    for etapa, funcion in analisis:
+        matriz_tags.limpiar_cache()
+        rss_antes = memoria_residente()
+        _, segundos = _cronometrar(funcion)
+        rss_despues = memoria_residente()
+        rss_delta = None if rss_antes is None or rss_despues is None else round((rss_despues - rss_antes) / 2 ** 20, 2)
+        registros.append(_registro("analisis", etapa, n_canciones, segundos, tokens, rss_delta_mb=rss_delta))
+    matriz_tags.limpiar_cache()
+    return registros
+
+
+def medir_carga_corpus(df, conservar=False):
+    """Guardado y carga del corpus etiquetado en CSV y Parquet con carga_corpus."""
+    from src.data.carga_corpus import carga_corpus
+
+    cargador = carga_corpus()
+    n_canciones = len(df)
+    registros = []
+    for formato, guardar_formato, cargar_formato in (
+        ("csv", cargador.guardar_corpus, cargador.cargar_corpus),
+        ("parquet", cargador.guardar_corpus_parquet, cargador.cargar_corpus_parquet),
+    ):
+        ruta = _ruta_benchmarks(f"carga_corpus_{n_canciones}.{formato}")
+        ruta_completa = cargador.ruta_completa(ruta)
+        os.makedirs(os.path.dirname(ruta_completa), exist_ok=True)
+        _, segundos_guardar = _cronometrar(lambda: guardar_formato(ruta, df))
+        megabytes = round(os.path.getsize(ruta_completa) / 2 ** 20, 2)
+        _, segundos_cargar = _cronometrar(lambda: cargar_formato(ruta))
+        for etapa, segundos in ((f"guardar_{formato}", segundos_guardar), (f"cargar_{formato}", segundos_cargar)):
+            registros.append(_registro("carga_corpus", etapa, n_canciones, segundos, megabytes=megabytes,
+                                       mb_s=round(megabytes / segundos, 1) if segundos > 0 else None))
+        if not conservar:
+            os.remove(ruta_completa)
+    return registros
+
+
+def ejecutar(tamanos=TAMANOS_POR_DEFECTO, tamanos_pipeline=TAMANOS_PIPELINE_POR_DEFECTO,
+             componentes=COMPONENTES, semilla=0, perfil=None, modo_spacy=None, modo_nltk=None,
+             conservar=False):
+    """
+    Ejecuta la suite y retorna el documento de resultados (ver guardar())
+
+    Args:
+        tamanos (iterable): Canciones de los corpus para los análisis y carga_corpus
+        tamanos_pipeline (iterable): Canciones de los corpus para los pipelines
+        componentes (iterable): Subconjunto de COMPONENTES a medir
+        semilla (int): Semilla del corpus sintético
+        perfil (dict): Perfil del corpus (por defecto, de data/raw)
+        modo_spacy (str): Modo de pipeline_spacy.ejecutar (por defecto "lotes")
+        modo_nltk (str): Modo de pipeline_nltk.ejecutar (por defecto "paralelo")
+        conservar (bool): Conserva los archivos de carga_corpus generados
+    """
+    no_validos = set(componentes) - set(COMPONENTES)
+    if no_validos:
+        raise ValueError(f"Componentes no soportados: {', '.join(sorted(no_validos))}")
+    corpus = corpus_sintetico(perfil, semilla)
+    resultados = []
+
+    for n_canciones in tamanos_pipeline:
+        for motor, modo in (("spacy", modo_spacy), ("nltk", modo_nltk)):
+            if f"pipeline_{motor}" in componentes:
+                resultados.extend(medir_pipeline(motor, corpus, n_canciones, modo))
+                print(f"✓ pipeline_{motor}: {n_canciones:,} canciones")
+
+    if {"analisis", "carga_corpus"} & set(componentes):
+        for n_canciones in tamanos:
+            df, segundos = _cronometrar(lambda: corpus.generar(n_canciones, etiquetado=True))
+            resultados.append(_registro("corpus_sintetico", "generar", n_canciones, segundos))
+            if "analisis" in componentes:
+                resultados.extend(medir_analisis(df))
+            if "carga_corpus" in componentes:
+                resultados.extend(medir_carga_corpus(df, conservar))
+            print(f"✓ análisis y carga_corpus: {n_canciones:,} canciones")
+            del df
+
+    return {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'entorno': entorno(),
+        'semilla': semilla,
+        'perfil': {'huella': corpus.perfil['huella'], 'canciones': corpus.perfil['canciones']},
+        'resultados': resultados,
+    }
+
+
+def guardar(documento, ruta_completa=None):
+    """Guarda los resultados en JSON (por defecto data/benchmarks/benchmark_<fecha>_<commit>.json)."""
+    if ruta_completa is None:
+        commit = (documento['entorno']['commit'] or 'sin-commit')[:8]
+        fecha = documento['fecha'].replace(':', '').replace('-', '')
+        ruta_completa = _directorio_proyecto() + _ruta_benchmarks(f"benchmark_{fecha}_{commit}.json")
+    os.makedirs(os.path.dirname(ruta_completa) or '.', exist_ok=True)
+    with open(ruta_completa, 'w', encoding='utf-8') as archivo:
+        json.dump(documento, archivo, ensure_ascii=False, indent=2)
+    return ruta_completa
+
+
+def comparar(actual, base):
+    """
+    Filas (componente, etapa, canciones, segundos base, segundos actuales, razón actual/base) de
+    las mediciones presentes en ambos documentos; una razón > 1 es una regresión
+    """
+    def clave(registro):
+        return registro['componente'], registro['etapa'], registro['canciones'], registro.get('modo')
+
+    anteriores = {clave(registro): registro for registro in base['resultados']}
+    filas = []
+    for registro in actual['resultados']:
+        anterior = anteriores.get(clave(registro))
+        if anterior is None or not anterior['segundos']:
+            continue
+        filas.append((registro['componente'], registro['etapa'], registro['canciones'], anterior['segundos'],
+                      registro['segundos'], round(registro['segundos'] / anterior['segundos'], 3)))
+    return filas
+
+
+def _imprimir(documento):
+    for registro in documento['resultados']:
+        tasa = f"{registro['canciones_s']:>12,.1f} canciones/s" if registro['canciones_s'] else ""
+        print(f"{registro['componente']:<18} {registro['etapa']:<40} {registro['canciones']:>9,} "
+              f"{registro['segundos']:>10.3f} s {tasa}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Suite de benchmarks sobre corpus sintéticos")
+    parser.add_argument('--tamanos', type=int, nargs='+', default=list(TAMANOS_POR_DEFECTO))
+    parser.add_argument('--tamanos-pipeline', type=int, nargs='+', default=list(TAMANOS_PIPELINE_POR_DEFECTO))
+    parser.add_argument('--componentes', nargs='+', choices=COMPONENTES, default=list(COMPONENTES))
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--perfil', help="Perfil JSON del corpus (si no existe, se crea desde data/raw)")
+    parser.add_argument('--modo-spacy', choices=("lotes", "secuencial"))
+    parser.add_argument('--modo-nltk', choices=("secuencial", "fusionado", "paralelo"))
+    parser.add_argument('--salida', help="Archivo JSON de resultados")
+    parser.add_argument('--comparar', help="Resultados JSON de otro commit con los que comparar")
+    parser.add_argument('--conservar', action='store_true', help="Conserva los archivos de carga_corpus")
+    argumentos = parser.parse_args()
+
+    perfil = None
+    if argumentos.perfil:
+        if os.path.exists(argumentos.perfil):
+            perfil = cargar_perfil(argumentos.perfil)
+        else:
+            perfil = perfil_desde_raw()
+            guardar_perfil(perfil, argumentos.perfil)
+
+    documento = ejecutar(argumentos.tamanos, argumentos.tamanos_pipeline, argumentos.componentes,
+                         argumentos.semilla, perfil, argumentos.modo_spacy, argumentos.modo_nltk,
+                         argumentos.conservar)
+    _imprimir(documento)
+    print(f"✓ Resultados guardados en {guardar(documento, argumentos.salida)}")
+
+    if argumentos.comparar:
+        with open(argumentos.comparar, encoding='utf-8') as archivo:
+            base = json.load(archivo)
+        print(f"\nComparación con {base['entorno']['commit'] or argumentos.comparar} (actual / base):")
+        for componente, etapa, canciones, anterior, actual, razon in comparar(documento, base):
+            marca = "▲" if razon > 1.1 else ("▼" if razon < 0.9 else " ")
+            print(f"{marca} {componente:<18} {etapa:<40} {canciones:>9,} {anterior:>10.3f} s → {actual:>10.3f} s "
+                  f"({razon:.2f}x)")
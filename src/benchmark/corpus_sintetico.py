@@ -0,0 +1,210 @@
+"""
+Clase: corpus_sintetico
+
+Objetivo: Py con el generador determinista de corpus sintéticos para los benchmarks. Primero se
+extrae de data/raw un perfil (distribución de la longitud de las letras en palabras,
+vocabulario con sus frecuencias, años y artistas con su género); después se generan canciones
+con el esquema del corpus procesado (Artist, nombre_cancion, Periodo, letra_cancion, Genero)
+muestreando de ese perfil. Cada bloque de canciones usa su propia semilla, de modo que el
+corpus de 10k es el prefijo del de 100k y este el del de 1M, y el resultado no depende del
+tamaño de lote con que se recorra. Opcionalmente se agregan tokens, Etiquetado_POS y Lematizado
+sintéticos (etiqueta fija por palabra) para medir los análisis sin ejecutar antes un pipeline
+
+Cambios:
+
+"""
+import csv
+import glob
+import hashlib
+import json
+import os
+import sys
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from src.data.ingesta_corpus import GENEROS_POR_ARTISTA
+from src.utils import path
+
+# Canciones por bloque de generación (cada bloque tiene su propia semilla)
+_TAMANO_BLOQUE = 10_000
+
+# Longitudes que se conservan en el perfil (cuantiles de la distribución real)
+_PUNTOS_LONGITUD = 1_000
+
+# Frecuencias aproximadas de tags UPOS en letras de canciones (sin stopwords)
+_TAGS = ['NOUN', 'VERB', 'ADJ', 'ADV', 'PRON', 'INTJ', 'PROPN', 'AUX', 'NUM', 'ADP', 'SCONJ', 'CCONJ']
+_PESOS_TAGS = [30, 28, 12, 9, 6, 5, 4, 2, 1, 1, 1, 1]
+
+
+
+def perfil_desde_raw(directorio_crudo=None):
+    """
+    Perfil estadístico de los CSV por artista de data/raw (con la misma limpieza que
+    ingesta_corpus: sin letras ni años nulos y sin el año 1.0)
+
+    Returns:
+        dict: longitudes (cuantiles de palabras por letra), vocabulario y frecuencias (de mayor
+        a menor), años y frecuencias, artistas y frecuencias, géneros por artista y huella
+    """
+    directorio_crudo = directorio_crudo or os.path.join(path.obtener_ruta_local() or os.getcwd(), 'data', 'raw')
+    archivos = sorted(glob.glob(os.path.join(directorio_crudo, '*.csv')))
+    if not archivos:
+        raise FileNotFoundError(f"No se encontraron CSV en {directorio_crudo}")
+    csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+
+    longitudes, palabras, anios, artistas = [], Counter(), Counter(), Counter()
+    for archivo in archivos:
+        with open(archivo, encoding='utf-8', newline='') as entrada:
+            for fila in csv.DictReader(entrada):
+                letra, anio = fila.get('Lyric'), fila.get('Year')
+                try:
+                    anio = float(anio)
+                except (TypeError, ValueError):
+                    continue
+                if not letra or np.isnan(anio) or anio == 1.0:
+                    continue
+                tokens = letra.split()
+                longitudes.append(len(tokens))
+                palabras.update(tokens)
+                anios[int(anio)] += 1
+                artistas[fila['Artist']] += 1
+
+    cuantiles = np.quantile(np.array(longitudes), np.linspace(0, 1, _PUNTOS_LONGITUD))
+    vocabulario = palabras.most_common()
+    perfil = {
+        'canciones': len(longitudes),
+        'longitudes': [int(round(valor)) for valor in cuantiles],
+        'vocabulario': [palabra for palabra, _ in vocabulario],
+        'frecuencias': [frecuencia for _, frecuencia in vocabulario],
+        'anios': sorted(anios),
+        'frecuencias_anios': [anios[anio] for anio in sorted(anios)],
+        'artistas': sorted(artistas),
+        'frecuencias_artistas': [artistas[artista] for artista in sorted(artistas)],
+        'generos': {artista: GENEROS_POR_ARTISTA.get(artista) for artista in sorted(artistas)},
+    }
+    perfil['huella'] = huella_perfil(perfil)
+    return perfil
+
+
+def huella_perfil(perfil):
+    """SHA-256 (16 caracteres) del perfil: identifica el corpus sintético junto con la semilla."""
+    contenido = json.dumps({clave: valor for clave, valor in perfil.items() if clave != 'huella'},
+                           sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()[:16]
+
+
+def guardar_perfil(perfil, ruta):
+    """Guarda el perfil en JSON para generar el mismo corpus sin data/raw."""
+    os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump(perfil, archivo, ensure_ascii=False)
+
+
+def cargar_perfil(ruta):
+    with open(ruta, encoding='utf-8') as archivo:
+        perfil = json.load(archivo)
+    if perfil.get('huella') != huella_perfil(perfil):
+        raise ValueError(f"La huella del perfil {ruta} no coincide con su contenido")
+    return perfil
+
+
+class corpus_sintetico:
+    def __init__(self, perfil=None, semilla=0):
+        """
+        Args:
+            perfil (dict): Perfil de perfil_desde_raw() o cargar_perfil() (por defecto, de data/raw)
+            semilla (int): Semilla base; con el mismo perfil y semilla el corpus es idéntico
+        """
+        self.perfil = perfil or perfil_desde_raw()
+        self.semilla = semilla
+        self._longitudes = np.asarray(self.perfil['longitudes'], dtype=np.int64)
+        self._vocabulario = np.asarray(self.perfil['vocabulario'], dtype=object)
+        self._probabilidades = self._normalizar(self.perfil['frecuencias'])
+        self._anios = np.asarray(self.perfil['anios'], dtype=np.float64)
+        self._probabilidades_anios = self._normalizar(self.perfil['frecuencias_anios'])
+        self._artistas = np.asarray(self.perfil['artistas'], dtype=object)
+        self._probabilidades_artistas = self._normalizar(self.perfil['frecuencias_artistas'])
+        self._generos = np.asarray([self.perfil['generos'][artista] for artista in self.perfil['artistas']],
+                                   dtype=object)
+        self._pares = None
+        self._es_stopword = None
+
+    @staticmethod
+    def _normalizar(frecuencias):
+        frecuencias = np.asarray(frecuencias, dtype=np.float64)
+        return frecuencias / frecuencias.sum()
+
+    def _preparar_etiquetado(self):
+        """Tag fijo por palabra del vocabulario (misma palabra, mismo tag) y tuplas compartidas."""
+        if self._pares is None:
+            aleatorio = np.random.default_rng([self.semilla, 0xE71])
+            tags = aleatorio.choice(np.asarray(_TAGS, dtype=object), size=len(self._vocabulario),
+                                    p=self._normalizar(_PESOS_TAGS))
+            self._pares = [(palabra, tag) for palabra, tag in zip(self._vocabulario, tags)]
+            # Lematizado sin las stopwords de spaCy, como en el pipeline
+            from spacy.lang.en.stop_words import STOP_WORDS
+
+            self._es_stopword = pd.Series(self._vocabulario, dtype=object).str.lower().isin(STOP_WORDS).to_numpy()
+        return self._pares
+
+    def _bloque(self, numero, n_canciones, etiquetado):
+        """Genera el bloque `numero` (a lo sumo _TAMANO_BLOQUE canciones) con su propia semilla."""
+        aleatorio = np.random.default_rng([self.semilla, numero])
+        inicio = numero * _TAMANO_BLOQUE
+        longitudes = aleatorio.choice(self._longitudes, size=n_canciones)
+        ids = aleatorio.choice(len(self._vocabulario), size=int(longitudes.sum()), p=self._probabilidades)
+        artistas = aleatorio.choice(len(self._artistas), size=n_canciones, p=self._probabilidades_artistas)
+        anios = aleatorio.choice(self._anios, size=n_canciones, p=self._probabilidades_anios)
+
+        limites = np.concatenate(([0], np.cumsum(longitudes)))
+        palabras = self._vocabulario[ids]
+        bloque = pd.DataFrame({
+            'Artist': self._artistas[artistas],
+            'nombre_cancion': [f"sintetica {indice}" for indice in range(inicio, inicio + n_canciones)],
+            'Periodo': anios,
+            'letra_cancion': [" ".join(palabras[limites[i]:limites[i + 1]]) for i in range(n_canciones)],
+            'Genero': self._generos[artistas],
+        })
+        if etiquetado:
+            pares = self._preparar_etiquetado()
+            bloque['tokens'] = [palabras[limites[i]:limites[i + 1]].tolist() for i in range(n_canciones)]
+            bloque['Etiquetado_POS'] = [[pares[indice] for indice in ids[limites[i]:limites[i + 1]]]
+                                        for i in range(n_canciones)]
+            bloque['Lematizado'] = [
+                [pares[indice] for indice in ids[limites[i]:limites[i + 1]] if not self._es_stopword[indice]]
+                for i in range(n_canciones)
+            ]
+        return bloque
+
+    def iterar(self, n_canciones, tamano_lote=_TAMANO_BLOQUE, etiquetado=False):
+        """
+        Generador de DataFrames de a lo sumo `tamano_lote` canciones; la memoria queda acotada por
+        el lote (más un bloque de generación)
+
+        Args:
+            n_canciones (int): Canciones del corpus
+            tamano_lote (int): Canciones por DataFrame generado
+            etiquetado (bool): Agrega las columnas sintéticas tokens, Etiquetado_POS y Lematizado
+        """
+        pendiente = None
+        for numero in range((n_canciones + _TAMANO_BLOQUE - 1) // _TAMANO_BLOQUE):
+            bloque = self._bloque(numero, min(_TAMANO_BLOQUE, n_canciones - numero * _TAMANO_BLOQUE), etiquetado)
+            pendiente = bloque if pendiente is None else pd.concat([pendiente, bloque], ignore_index=True)
+            while len(pendiente) >= tamano_lote:
+                yield pendiente.iloc[:tamano_lote].reset_index(drop=True)
+                pendiente = pendiente.iloc[tamano_lote:].reset_index(drop=True)
+        if pendiente is not None and len(pendiente):
+            yield pendiente
+
+    def generar(self, n_canciones, etiquetado=False):
+        """DataFrame completo de `n_canciones` canciones (ver iterar())."""
+        return pd.concat(list(self.iterar(n_canciones, _TAMANO_BLOQUE, etiquetado)), ignore_index=True)
+
+    def escribir_csv(self, ruta_completa, n_canciones):
+        """Escribe el corpus (sin columnas etiquetadas) en CSV bloque a bloque, como el corpus procesado."""
+        os.makedirs(os.path.dirname(ruta_completa) or '.', exist_ok=True)
+        for numero, lote in enumerate(self.iterar(n_canciones)):
+            lote.to_csv(ruta_completa, mode='w' if numero == 0 else 'a', header=numero == 0, index=False)
+        return ruta_completa
@@ -4,12 +4,157 @@ Clase: carga_corpus
 Objetivo: Py con funciones para cargar corpus
 
 Cambios:
+    1. Formato columnar Parquet para los corpus etiquetados: las columnas de tuplas
+    (token, tag) se guardan como list<struct<token, tag>> nativas (list<list<...>> para las
+    oraciones de NLTK) y se leen con proyección de columnas
+    2. Lectura por lotes (iterar_corpus) y escritura incremental (abrir_escritor) para procesar
+    corpus más grandes que la memoria
+    3. El escritor por lotes amplía su esquema cuando un lote anterior no fijó el tipo de una
+    columna (todo vacío o nulo) y reescribe por lotes lo ya guardado
 
 """
+import os
+
+import numpy as np
 import pandas as pd
 
 from src.utils import path
 
+FORMATOS_SOPORTADOS = ("parquet", "csv")
+
+# Nombre de los campos del struct según la columna etiquetada
+_CAMPOS_POR_COLUMNA = {'Lematizado': ('lemma', 'tag')}
+_CAMPOS_POR_DEFECTO = ('token', 'tag')
+
+
+def validar_formato(formato):
+    """Lanza ValueError si el formato de salida no está soportado."""
+    if formato not in FORMATOS_SOPORTADOS:
+        raise ValueError(f"Formato no soportado: {formato}. Opciones: {', '.join(FORMATOS_SOPORTADOS)}")
+
+
+def _es_vacio(valor):
+    if valor is None:
+        return True
+    if isinstance(valor, float):
+        return np.isnan(valor)
+    return False
+
+
+def _es_columna_de_tuplas(valores):
+    """True si la columna contiene (listas anidadas de) tuplas (token, tag)."""
+    for valor in valores:
+        while isinstance(valor, (list, tuple, np.ndarray)) and len(valor):
+            if isinstance(valor, tuple):
+                return True
+            valor = valor[0]
+    return False
+
+
+def _tuplas_a_arrow(filas, campos):
+    """Construye un arreglo Arrow list<...list<struct>> a partir de listas (anidadas) de tuplas."""
+    import pyarrow as pa
+
+    filas = [[] if _es_vacio(fila) else fila for fila in filas]
+    hijos = [hijo for fila in filas for hijo in fila]
+    offsets = np.zeros(len(filas) + 1, dtype=np.int32)
+    np.cumsum([len(fila) for fila in filas], out=offsets[1:])
+
+    if not hijos or isinstance(hijos[0], tuple):
+        valores = pa.StructArray.from_arrays(
+            [pa.array([hijo[i] for hijo in hijos], type=pa.string()) for i in range(len(campos))],
+            names=list(campos),
+        )
+    else:
+        valores = _tuplas_a_arrow(hijos, campos)
+    return pa.ListArray.from_arrays(pa.array(offsets), valores)
+
+
+def _arrow_a_tuplas(arreglo):
+    """Inverso de _tuplas_a_arrow: convierte list<...list<struct>> en listas de tuplas."""
+    import pyarrow as pa
+
+    if isinstance(arreglo, pa.ChunkedArray):
+        arreglo = arreglo.combine_chunks()
+    if pa.types.is_struct(arreglo.type):
+        return list(zip(*(arreglo.field(i).to_pylist() for i in range(arreglo.type.num_fields))))
+    interiores = _arrow_a_tuplas(arreglo.flatten())
+    offsets = np.asarray(arreglo.offsets)
+    offsets = offsets - offsets[0]
+    return [interiores[inicio:fin] for inicio, fin in zip(offsets[:-1], offsets[1:])]
+
+
+def _contiene_struct(tipo):
+    import pyarrow as pa
+
+    while pa.types.is_list(tipo) or pa.types.is_large_list(tipo):
+        tipo = tipo.value_type
+    return pa.types.is_struct(tipo)
+
+
+def _df_a_tabla(df):
+    """DataFrame -> tabla Arrow, con las columnas de tuplas como list<struct>."""
+    import pyarrow as pa
+
+    arreglos = []
+    for columna in df.columns:
+        valores = df[columna].tolist()
+        if df[columna].dtype == object and _es_columna_de_tuplas(valores):
+            campos = _CAMPOS_POR_COLUMNA.get(columna, _CAMPOS_POR_DEFECTO)
+            arreglos.append(_tuplas_a_arrow(valores, campos))
+        else:
+            arreglos.append(pa.array(df[columna], from_pandas=True))
+    return pa.Table.from_arrays(arreglos, names=[str(columna) for columna in df.columns])
+
+
+def _tabla_a_df(tabla):
+    """Tabla Arrow -> DataFrame, con las columnas list<struct> como listas de tuplas."""
+    import pyarrow as pa
+
+    datos = {}
+    for nombre, arreglo in zip(tabla.column_names, tabla.columns):
+        if _contiene_struct(arreglo.type):
+            datos[nombre] = _arrow_a_tuplas(arreglo)
+        elif pa.types.is_list(arreglo.type) or pa.types.is_large_list(arreglo.type):
+            datos[nombre] = arreglo.to_pylist()
+        else:
+            datos[nombre] = arreglo.to_pandas()
+    return pd.DataFrame(datos, columns=tabla.column_names)
+
+
+def _nulos_sin_tipo(tabla):
+    """Deja como tipo null las columnas sin ningún valor (por ejemplo, todo NaN), que un lote
+    posterior puede completar con su tipo real."""
+    import pyarrow as pa
+
+    for i, arreglo in enumerate(tabla.columns):
+        if len(arreglo) and arreglo.null_count == len(arreglo) and not pa.types.is_null(arreglo.type):
+            tabla = tabla.set_column(i, tabla.field(i).name, pa.nulls(len(arreglo)))
+    return tabla
+
+
+def _unificar_esquemas(esquema, otro):
+    """Esquema que admite ambos: los tipos null (también dentro de listas) toman el del otro."""
+    import pyarrow as pa
+
+    return pa.unify_schemas([esquema, otro], promote_options="permissive")
+
+
+def guardar_parquet(ruta_completa, df):
+    """Guarda `df` en una ruta absoluta, con las columnas de tuplas como list<struct>."""
+    import pyarrow.parquet as pq
+
+    os.makedirs(os.path.dirname(ruta_completa) or '.', exist_ok=True)
+    pq.write_table(_df_a_tabla(df), ruta_completa)
+
+
+def cargar_parquet(ruta_completa, columnas=None):
+    """Carga un Parquet de una ruta absoluta, con las columnas list<struct> como listas de tuplas."""
+    import pyarrow.parquet as pq
+
+    return _tabla_a_df(pq.read_table(ruta_completa, columns=columnas))
+
+
 class carga_corpus:
     def __init__(self):
         self._directorio_proyecto = path.obtener_ruta_local()
@@ -17,4 +162,104 @@ class carga_corpus:
     def cargar_corpus(self, ruta):
         return pd.read_csv(self._directorio_proyecto+ruta,delimiter = ',',decimal = ".", encoding='utf-8')
     def guardar_corpus(self,ruta, df):
-        df.to_csv(self._directorio_proyecto + ruta, index=False)
\ No newline at end of file
+        df.to_csv(self._directorio_proyecto + ruta, index=False)
+
+    def existe_corpus(self, ruta):
+        return os.path.exists(self._directorio_proyecto + ruta)
+
+    def ruta_completa(self, ruta):
+        """Ruta de `ruta` dentro del directorio del proyecto."""
+        return self._directorio_proyecto + ruta
+
+    def guardar_corpus_parquet(self, ruta, df):
+        """
+        Guarda el corpus en Parquet. Las columnas con listas de tuplas (token, tag) se escriben
+        como list<struct> nativas en lugar de su repr de Python.
+        """
+        guardar_parquet(self._directorio_proyecto + ruta, df)
+
+    def cargar_corpus_parquet(self, ruta, columnas=None):
+        """
+        Carga un corpus Parquet leyendo solo `columnas` (todas si es None). Las columnas
+        list<struct> se devuelven como listas de tuplas, igual que en memoria tras el pipeline.
+        """
+        return cargar_parquet(self._directorio_proyecto + ruta, columnas)
+
+    def iterar_corpus(self, ruta, tamano_lote, columnas=None):
+        """
+        Generador de DataFrames de a lo sumo `tamano_lote` filas, para CSV o Parquet según la
+        extensión de `ruta`. La memoria usada queda acotada por el tamaño del lote.
+        """
+        ruta_completa = self._directorio_proyecto + ruta
+        if ruta.endswith('.parquet'):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            archivo = pq.ParquetFile(ruta_completa)
+            for lote in archivo.iter_batches(batch_size=tamano_lote, columns=columnas):
+                yield _tabla_a_df(pa.Table.from_batches([lote]))
+        else:
+            yield from pd.read_csv(ruta_completa, delimiter=',', decimal=".", encoding='utf-8',
+                                   usecols=columnas, chunksize=tamano_lote)
+
+    def abrir_escritor(self, ruta):
+        """Escritor que agrega lotes al archivo de `ruta` (Parquet o CSV según la extensión)."""
+        return escritor_corpus(self._directorio_proyecto + ruta)
+
+
+class escritor_corpus:
+    """Agrega DataFrames a un archivo de salida lote a lote, sin mantener el corpus en memoria."""
+
+    def __init__(self, ruta_completa):
+        self._ruta = ruta_completa
+        self._es_parquet = ruta_completa.endswith('.parquet')
+        self._escritor = None
+        self._esquema = None
+        self._primer_lote = True
+        self.filas = 0
+        os.makedirs(os.path.dirname(ruta_completa) or '.', exist_ok=True)
+
+    def escribir(self, df):
+        if self._es_parquet:
+            import pyarrow.parquet as pq
+
+            tabla = _nulos_sin_tipo(_df_a_tabla(df))
+            if self._escritor is None:
+                self._esquema = tabla.schema
+                self._escritor = pq.ParquetWriter(self._ruta, self._esquema)
+            elif not tabla.schema.equals(self._esquema):
+                # Un lote anterior pudo no fijar el tipo de una columna (todo vacío o nulo)
+                esquema = _unificar_esquemas(self._esquema, tabla.schema)
+                if not esquema.equals(self._esquema):
+                    self._reescribir(esquema)
+            self._escritor.write_table(tabla.cast(self._esquema))
+        else:
+            df.to_csv(self._ruta, index=False, mode='w' if self._primer_lote else 'a',
+                      header=self._primer_lote)
+        self._primer_lote = False
+        self.filas += len(df)
+
+    def _reescribir(self, esquema):
+        """Vuelve a escribir lo ya guardado con `esquema`, leyéndolo por lotes."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._escritor.close()
+        anterior = self._ruta + '.tmp'
+        os.replace(self._ruta, anterior)
+        self._esquema = esquema
+        self._escritor = pq.ParquetWriter(self._ruta, esquema)
+        for lote in pq.ParquetFile(anterior).iter_batches():
+            self._escritor.write_table(pa.Table.from_batches([lote]).cast(esquema))
+        os.remove(anterior)
+
+    def cerrar(self):
+        if self._escritor is not None:
+            self._escritor.close()
+            self._escritor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
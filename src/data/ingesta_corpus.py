@@ -0,0 +1,130 @@
+"""
+Clase: ingesta_corpus
+
+Objetivo: Py con la construcción del corpus procesado (data/processed/corpus_canciones.csv) a
+partir de los CSV por artista de data/raw, reemplazando los pasos manuales del notebook 01:
+lectura concurrente con tipos explícitos, limpieza, asignación de género, normalización al
+esquema nombre_cancion/letra_cancion/Genero/Periodo y escritura atómica
+
+Cambios:
+
+"""
+import glob
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from src.utils import path
+from src.utils.eventos_progreso import bus_progreso
+
+RUTA_SALIDA = '\\data\\processed\\corpus_canciones.csv'
+
+# Solo se leen las columnas que sobreviven a la limpieza del notebook 01
+# (se descartan 'Unnamed: 0', Album y Date)
+_COLUMNAS_CRUDAS = ['Artist', 'Title', 'Year', 'Lyric']
+_TIPOS_CRUDOS = {'Artist': 'string', 'Title': 'string', 'Year': 'float64', 'Lyric': 'string'}
+
+_RENOMBRAR = {'Title': 'nombre_cancion', 'Lyric': 'letra_cancion', 'Year': 'Periodo', 'Genre': 'Genero'}
+
+# Género por artista obtenido de MusicBrainz en el notebook 01 (BTS corregido a mano)
+GENEROS_POR_ARTISTA = {
+    'Ariana Grande': 'pop',
+    'BTS (방탄소년단)': 'K-pop',
+    'Beyoncé': 'pop',
+    'Billie Eilish': 'alternative pop',
+    'Cardi B': 'hip hop',
+    'Charlie Puth': 'pop',
+    'Coldplay': 'alternative rock',
+    'Drake': 'hip hop',
+    'Dua Lipa': 'dance-pop',
+    'Ed Sheeran': 'pop',
+    'Eminem': 'hip hop',
+    'Justin Bieber': 'pop',
+    'Katy Perry': 'pop',
+    'Khalid': 'r&b',
+    'Lady Gaga': 'pop',
+    'Maroon 5': 'pop',
+    'Nicki Minaj': 'hip hop',
+    'Post Malone': 'hip hop',
+    'Rihanna': 'pop',
+    'Selena Gomez': 'pop',
+    'Taylor Swift': 'pop',
+}
+
+
+def _leer_csv_crudo(archivo):
+    """Lee un CSV por artista con solo las columnas y tipos necesarios."""
+    return pd.read_csv(archivo, usecols=_COLUMNAS_CRUDAS, dtype=_TIPOS_CRUDOS, encoding='utf-8')
+
+
+class ingesta_corpus:
+    def __init__(self, directorio_crudo=None, ruta_salida=RUTA_SALIDA, n_hilos=8,
+                 generos=GENEROS_POR_ARTISTA, progreso=None):
+        """
+        Args:
+            directorio_crudo (str): Carpeta con los CSV por artista (por defecto data/raw)
+            ruta_salida (str): Ruta del corpus procesado relativa al proyecto
+            n_hilos (int): Hilos de lectura concurrente (la lectura de CSV libera el GIL)
+            generos (dict): Artista -> género
+            progreso (bus_progreso): Destino de los mensajes (por defecto, consola)
+        """
+        directorio_proyecto = path.obtener_ruta_local() or os.getcwd()
+        self._directorio_crudo = directorio_crudo or os.path.join(directorio_proyecto, 'data', 'raw')
+        self._ruta_salida = directorio_proyecto + ruta_salida
+        self._n_hilos = n_hilos
+        self._generos = generos
+        self._progreso = progreso or bus_progreso.consola()
+        self.df = None
+
+    def _leer_archivos(self):
+        archivos = sorted(glob.glob(os.path.join(self._directorio_crudo, '*.csv')))
+        if not archivos:
+            raise FileNotFoundError(f"No se encontraron CSV en {self._directorio_crudo}")
+        self._progreso.mensaje(f"Archivos CSV encontrados: {len(archivos)}")
+        # map conserva el orden de los archivos: el corpus resultante es determinista
+        with ThreadPoolExecutor(max_workers=min(self._n_hilos, len(archivos))) as ejecutor:
+            dataframes = list(ejecutor.map(_leer_csv_crudo, archivos))
+        return pd.concat(dataframes, ignore_index=True)
+
+    def _normalizar(self, df):
+        """Limpieza del notebook 01: nulos, años inválidos, género, nombres de columnas y duplicados."""
+        filas_leidas = len(df)
+        df = df.dropna()
+        df = df[df['Year'] != 1.0]
+        df = df.assign(Genre=df['Artist'].map(self._generos))
+
+        sin_genero = sorted(df.loc[df['Genre'].isna(), 'Artist'].unique())
+        if sin_genero:
+            self._progreso.mensaje(f"⚠ Artistas sin género asignado: {', '.join(sin_genero)}", nivel="error")
+
+        df = df.rename(columns=_RENOMBRAR).drop_duplicates().reset_index(drop=True)
+        # Los CSV procesados siempre han guardado texto plano (object), no el dtype string
+        df = df.astype({'Artist': object, 'nombre_cancion': object, 'letra_cancion': object})
+        self._progreso.mensaje(f"Filas: {filas_leidas} leídas, {len(df)} tras la limpieza")
+        return df
+
+    def _guardar(self, df):
+        """Escritura atómica: se escribe un temporal y se reemplaza el corpus anterior."""
+        os.makedirs(os.path.dirname(self._ruta_salida) or '.', exist_ok=True)
+        ruta_temporal = self._ruta_salida + '.tmp'
+        df.to_csv(ruta_temporal, index=False)
+        os.replace(ruta_temporal, self._ruta_salida)
+
+    def ejecutar(self):
+        """Construye y guarda el corpus procesado. Retorna el DataFrame resultante."""
+        inicio = time.perf_counter()
+        df = self._leer_archivos()
+        filas_leidas = len(df)
+        self.df = self._normalizar(df)
+        self._guardar(self.df)
+        segundos = time.perf_counter() - inicio
+        self._progreso.mensaje(f"✓ Corpus guardado en {self._ruta_salida}", nivel="completado")
+        self._progreso.mensaje(f"  {filas_leidas} filas en {segundos:.2f}s "
+                               f"({filas_leidas / segundos:,.0f} filas/s)")
+        return self.df
+
+
+if __name__ == "__main__":
+    ingesta_corpus().ejecutar()
@@ -0,0 +1,112 @@
+"""
+Clase: registro_datasets
+
+Objetivo: Py con el registro en el servidor de los corpus etiquetados que usa el dashboard.
+El dcc.Store del navegador solo guarda el ID del dataset; cada página pide al registro las
+columnas que necesita, en lugar de recibir el corpus completo como JSON en cada callback y
+reconstruirlo con pd.DataFrame(data). Los datasets se guardan en memoria (LRU) y en
+data/cache/datasets/<id>.parquet, de modo que otro proceso del servidor, o el mismo tras
+expulsarlo de la memoria, los puede recuperar
+
+Cambios:
+
+"""
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from src.data.carga_corpus import guardar_parquet, cargar_parquet
+from src.utils import path
+from src.utils.eventos_progreso import bus_progreso
+
+_CAPACIDAD = 4
+# Copias en disco que se conservan (las más recientes)
+_CAPACIDAD_DISCO = 8
+_datasets = OrderedDict()
+_candado = threading.Lock()
+
+
+def _ruta_dataset(id_dataset):
+    return os.path.join(path.obtener_ruta_local() or '.', 'data', 'cache', 'datasets',
+                        f"{id_dataset}.parquet")
+
+
+def registrar(df, persistir=True, progreso=None):
+    """
+    Registra un corpus etiquetado y retorna su ID. Un ID identifica siempre el mismo contenido:
+    un nuevo resultado del pipeline se registra con un ID nuevo
+
+    Args:
+        df (DataFrame): Corpus etiquetado resultado del pipeline
+        persistir (bool): Guarda además una copia en Parquet para otros procesos
+        progreso (bus_progreso): Destino del aviso si la copia falla (por defecto, consola)
+
+    Returns:
+        str: ID del dataset, lo único que viaja al navegador
+    """
+    id_dataset = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    df = df.reset_index(drop=True)
+    # El ID viaja en attrs (se conserva en proyecciones y copias): matriz_tags lo usa como clave
+    df.attrs['id_dataset'] = id_dataset
+    with _candado:
+        _datasets[id_dataset] = df
+        while len(_datasets) > _CAPACIDAD:
+            _datasets.popitem(last=False)
+    if persistir:
+        try:
+            guardar_parquet(_ruta_dataset(id_dataset), df)
+            _podar_persistidos()
+        except Exception as error:
+            (progreso or bus_progreso.consola()).mensaje(
+                f"⚠ No se pudo persistir el dataset {id_dataset}: {error}", nivel="error")
+    return id_dataset
+
+
+def _podar_persistidos():
+    """Borra las copias en disco más antiguas por encima de _CAPACIDAD_DISCO."""
+    directorio = os.path.dirname(_ruta_dataset('x'))
+    archivos = sorted((os.path.join(directorio, nombre) for nombre in os.listdir(directorio)
+                       if nombre.endswith('.parquet')), key=os.path.getmtime)
+    for archivo in archivos[:-_CAPACIDAD_DISCO]:
+        os.remove(archivo)
+
+
+def obtener(id_dataset, columnas=None):
+    """
+    Frame del dataset con solo `columnas` (todas si es None), o None si el ID no existe
+
+    Args:
+        id_dataset (str): ID devuelto por registrar
+        columnas (list): Columnas que necesita la página; las que no existan se omiten
+
+    Returns:
+        DataFrame: Proyección del dataset (las páginas no deben modificarla en el lugar)
+    """
+    if not id_dataset:
+        return None
+    with _candado:
+        df = _datasets.get(id_dataset)
+        if df is not None:
+            _datasets.move_to_end(id_dataset)
+    if df is None:
+        df = _cargar_persistido(id_dataset)
+        if df is None:
+            return None
+    if columnas is None:
+        return df
+    return df[[columna for columna in columnas if columna in df.columns]]
+
+
+def _cargar_persistido(id_dataset):
+    ruta = _ruta_dataset(os.path.basename(str(id_dataset)))
+    if not os.path.exists(ruta):
+        return None
+    df = cargar_parquet(ruta)
+    df.attrs['id_dataset'] = id_dataset
+    with _candado:
+        _datasets[id_dataset] = df
+        while len(_datasets) > _CAPACIDAD:
+            _datasets.popitem(last=False)
+    return df
@@ -0,0 +1,122 @@
+"""
+Clase: almacen_incremental
+
+Objetivo: Py con el almacén persistente de resultados de etiquetado por huella de contenido
+(hash de letra_cancion + versión del motor/modelo), para re-etiquetar solo canciones nuevas
+o modificadas
+
+Cambios:
+
+"""
+import hashlib
+import os
+import threading
+
+import pandas as pd
+
+from src.data.carga_corpus import carga_corpus, guardar_parquet
+from src.utils.eventos_progreso import bus_progreso
+
+# Un candado por archivo de almacén: varios hilos (por ejemplo, los análisis del dashboard)
+# pueden agregar canciones al mismo almacén a la vez
+_candados = {}
+_candados_guardia = threading.Lock()
+
+
+def _candado(ruta):
+    with _candados_guardia:
+        return _candados.setdefault(ruta, threading.Lock())
+
+
+class almacen_incremental:
+    def __init__(self, motor, version, nombre=None, progreso=None):
+        """
+        Args:
+            motor (str): "spacy" o "nltk"; define el archivo del almacén
+            version (str): Versión del motor, modelo y configuración; forma parte de la huella
+            nombre (str): Nombre del archivo del almacén (por defecto etiquetado_<motor>)
+            progreso (bus_progreso): Destino de los mensajes (por defecto, consola)
+        """
+        self._version = version
+        self._ruta = f'\\data\\cache\\{nombre or f"etiquetado_{motor}"}.parquet'
+        self._cargar_corpus = carga_corpus()
+        self._progreso = progreso or bus_progreso.consola()
+        self.reutilizadas = 0
+        self.procesadas = 0
+
+    def huella(self, letra):
+        """Hash SHA-1 de la versión del motor y la letra."""
+        contenido = f"{self._version}\x00{'' if pd.isna(letra) else letra}"
+        return hashlib.sha1(contenido.encode('utf-8')).hexdigest()
+
+    def _cargar(self, columnas):
+        """Filas guardadas de la versión actual, indexadas por huella, o None si no sirven."""
+        if not self._cargar_corpus.existe_corpus(self._ruta):
+            return None
+        guardado = self._cargar_corpus.cargar_corpus_parquet(self._ruta)
+        if not set(columnas) <= set(guardado.columns):
+            return None
+        guardado = guardado[guardado['version'] == self._version]
+        return guardado.drop_duplicates('huella', keep='last').set_index('huella')
+
+    def procesar(self, df, funcion, columnas, descartar=None):
+        """
+        Reutiliza los resultados guardados de las canciones sin cambios y aplica `funcion`
+        solo a las nuevas o modificadas.
+
+        Args:
+            df (DataFrame): Corpus con la columna letra_cancion
+            funcion (callable): Recibe el DataFrame pendiente y lo devuelve con `columnas`
+            columnas (list): Columnas de resultado que se guardan y se reutilizan
+            descartar (callable): Recibe las filas procesadas y devuelve la máscara de las que no
+                se guardan (resultados provisionales, por ejemplo una canción que venció su plazo)
+
+        Returns:
+            DataFrame: `df` con las columnas de resultado, en el orden original de las filas
+        """
+        huellas = df['letra_cancion'].map(self.huella)
+        guardado = self._cargar(columnas)
+        if guardado is None:
+            reutilizable = pd.Series(False, index=df.index)
+        else:
+            reutilizable = huellas.isin(guardado.index)
+
+        reutilizadas = df[reutilizable].copy()
+        for columna in columnas:
+            reutilizadas[columna] = guardado.loc[huellas[reutilizable], columna].tolist() \
+                if len(reutilizadas) else []
+
+        pendientes = df[~reutilizable].copy()
+        if len(pendientes):
+            pendientes = funcion(pendientes)
+
+        self.reutilizadas = len(reutilizadas)
+        self.procesadas = len(pendientes)
+        self._progreso.mensaje(f"Modo incremental: {self.reutilizadas} canciones reutilizadas, "
+                               f"{self.procesadas} procesadas")
+
+        if len(pendientes):
+            guardar = ~descartar(pendientes) if descartar else slice(None)
+            if len(pendientes[guardar]):
+                self._guardar(huellas[~reutilizable][guardar], pendientes[guardar], columnas)
+        return pd.concat([reutilizadas, pendientes]).loc[df.index]
+
+    def _guardar(self, huellas, procesadas, columnas):
+        """
+        Agrega las canciones recién procesadas al almacén de la versión actual. El almacén se
+        vuelve a leer con el candado tomado, para no perder lo que otro hilo guardó mientras
+        se procesaban estas canciones, y se escribe en un archivo temporal que reemplaza al
+        anterior: una lectura nunca ve un Parquet a medias.
+        """
+        nuevas = procesadas[columnas].copy()
+        nuevas.insert(0, 'huella', huellas.values)
+        nuevas.insert(1, 'version', self._version)
+        ruta = self._cargar_corpus.ruta_completa(self._ruta)
+        with _candado(ruta):
+            guardado = self._cargar(columnas)
+            if guardado is not None:
+                anteriores = guardado.drop(index=nuevas['huella'], errors='ignore').reset_index()
+                nuevas = pd.concat([anteriores[['huella', 'version'] + list(columnas)], nuevas],
+                                   ignore_index=True)
+            guardar_parquet(ruta + '.tmp', nuevas.reset_index(drop=True))
+            os.replace(ruta + '.tmp', ruta)
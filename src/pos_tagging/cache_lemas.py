@@ -0,0 +1,104 @@
+"""
+Clase: cache_lemas
+
+Objetivo: Py con una caché LRU acotada de lemas por (palabra, pos de WordNet), con contadores
+de aciertos/fallos y persistencia en disco (Parquet con palabra, pos y lema) para reutilizarla
+entre ejecuciones
+
+Cambios:
+
+"""
+import os
+from collections import OrderedDict
+
+import pandas as pd
+
+from src.data.carga_corpus import carga_corpus, cargar_parquet, guardar_parquet
+
+
+def ruta_cache_por_defecto(nombre_archivo="lemas_nltk.parquet"):
+    """Ruta del archivo de caché dentro de data/cache del proyecto."""
+    return carga_corpus().ruta_completa(f'\\data\\cache\\{nombre_archivo}')
+
+
+class cache_lemas:
+    def __init__(self, lematizar, capacidad=200_000):
+        """
+        Args:
+            lematizar (callable): Función (palabra, pos) -> lema que se memoriza
+            capacidad (int): Número máximo de entradas antes de expulsar la menos usada
+        """
+        self._lematizar = lematizar
+        self._capacidad = capacidad
+        self._entradas = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+        # Lemas calculados pendientes de extraer (solo si se activa con registrar_nuevas())
+        self._nuevas = None
+
+    def lematizar(self, palabra, pos):
+        clave = (palabra, pos)
+        try:
+            lema = self._entradas[clave]
+        except KeyError:
+            self.fallos += 1
+            lema = self._lematizar(palabra, pos)
+            self._entradas[clave] = lema
+            if self._nuevas is not None:
+                self._nuevas.append((clave, lema))
+            if len(self._entradas) > self._capacidad:
+                self._entradas.popitem(last=False)
+            return lema
+        self.aciertos += 1
+        self._entradas.move_to_end(clave)
+        return lema
+
+    def registrar_nuevas(self):
+        """Desde ahora guarda los lemas calculados en cada fallo para devolverlos con extraer_nuevas()."""
+        if self._nuevas is None:
+            self._nuevas = []
+
+    def extraer_nuevas(self):
+        """Lemas calculados desde la última extracción, como lista de ((palabra, pos), lema)."""
+        nuevas = self._nuevas or []
+        if self._nuevas is not None:
+            self._nuevas = []
+        return nuevas
+
+    def fusionar(self, aciertos, fallos, nuevas):
+        """Suma los contadores y agrega los lemas calculados por la caché de otro proceso."""
+        self.aciertos += aciertos
+        self.fallos += fallos
+        for clave, lema in nuevas:
+            self._entradas[clave] = lema
+            self._entradas.move_to_end(clave)
+        while len(self._entradas) > self._capacidad:
+            self._entradas.popitem(last=False)
+
+    def estadisticas(self):
+        """Retorna aciertos, fallos, tasa de aciertos y ocupación de la caché."""
+        consultas = self.aciertos + self.fallos
+        return {
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': self.aciertos / consultas if consultas else 0.0,
+            'entradas': len(self._entradas),
+            'capacidad': self._capacidad,
+        }
+
+    def guardar(self, ruta):
+        """Persiste las entradas en orden LRU (de menos a más reciente) como palabra, pos y lema."""
+        entradas = pd.DataFrame([(palabra, pos, lema) for (palabra, pos), lema in self._entradas.items()],
+                                columns=['palabra', 'pos', 'lema'], dtype=object)
+        # Se escribe aparte y se reemplaza: otra ejecución nunca lee un archivo a medias
+        guardar_parquet(ruta + '.tmp', entradas)
+        os.replace(ruta + '.tmp', ruta)
+
+    def cargar(self, ruta):
+        """Carga entradas persistidas si el archivo existe. Retorna cuántas se cargaron."""
+        if not os.path.exists(ruta):
+            return 0
+        entradas = cargar_parquet(ruta).tail(self._capacidad)
+        for palabra, pos, lema in zip(entradas['palabra'], entradas['pos'], entradas['lema']):
+            self._entradas[(palabra, pos)] = lema
+        return len(self._entradas)
@@ -0,0 +1,61 @@
+"""
+Clase: letras_atipicas
+
+Objetivo: Py con el límite de longitud por canción de los pipelines. Las letras de más de
+`max_caracteres` caracteres (por ejemplo, transcripciones pegadas varias veces) no se etiquetan:
+una sola de ellas puede retener nlp.pipe o pos_tag durante minutos sin publicar avances, y el
+gestor de trabajos solo puede detener la ejecución entre canciones. Esas filas quedan en el
+resultado con las columnas etiquetadas vacías y se registran para revisarlas
+
+Cambios:
+
+"""
+import pandas as pd
+
+# Muy por encima de cualquier letra real de data/raw (la más larga tiene unos 30.000 caracteres)
+MAX_CARACTERES_POR_DEFECTO = 50_000
+
+
+def separar(df, max_caracteres):
+    """
+    Divide `df` por la longitud de letra_cancion
+
+    Args:
+        df (DataFrame): Corpus o lote con la columna letra_cancion
+        max_caracteres (int): Longitud máxima que se etiqueta; None desactiva el límite
+
+    Returns:
+        tuple: (aptas, atipicas); si no hay letras atípicas, aptas es el mismo `df`
+    """
+    if not max_caracteres:
+        return df, df.iloc[:0]
+    atipicas = df['letra_cancion'].fillna('').astype(str).str.len().to_numpy() > max_caracteres
+    if not atipicas.any():
+        return df, df.iloc[:0]
+    return df[~atipicas].copy(), df[atipicas].copy()
+
+
+def describir(atipicas):
+    """Registro de cada letra atípica: índice, nombre de la canción y caracteres."""
+    nombres = atipicas['nombre_cancion'] if 'nombre_cancion' in atipicas.columns \
+        else pd.Series(None, index=atipicas.index, dtype=object)
+    return [{'indice': indice, 'nombre_cancion': nombre, 'caracteres': len(letra)}
+            for indice, nombre, letra in zip(atipicas.index, nombres, atipicas['letra_cancion'].astype(str))]
+
+
+def reincorporar(resultado, atipicas, columnas, indice):
+    """
+    Agrega a `resultado` las filas atípicas con `columnas` vacías, en el orden de `indice`
+
+    Args:
+        resultado (DataFrame): Filas aptas ya etiquetadas
+        atipicas (DataFrame): Filas que no se etiquetaron
+        columnas (list): Columnas de resultado del pipeline
+        indice (Index): Índice del lote original
+    """
+    if not len(atipicas):
+        return resultado
+    atipicas = atipicas.copy()
+    for columna in columnas:
+        atipicas[columna] = [[] for _ in range(len(atipicas))]
+    return pd.concat([resultado, atipicas]).loc[indice]
@@ -0,0 +1,73 @@
+"""
+Clase: perfiles_spacy
+
+Objetivo: Py con los perfiles de carga del modelo de spaCy, de forma que cada caso de uso
+excluya los componentes que no necesita (parser y NER no se usan en src/)
+
+Cambios:
+
+"""
+import subprocess
+
+import spacy
+
+from src.utils.eventos_progreso import bus_progreso
+
+MODELO_SPACY = "en_core_web_sm"
+
+# Componentes que se EXCLUYEN en cada perfil
+PERFILES_SPACY = {
+    # Solo nlp.tokenizer (Paso 1)
+    "tokenizador": ["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "ner", "senter"],
+    # POS y lemas: tok2vec + tagger + attribute_ruler + lemmatizer
+    "etiquetado": ["parser", "ner", "senter"],
+    # Modelo completo tal como se distribuye
+    "completo": [],
+}
+
+PERFIL_POR_DEFECTO = "etiquetado"
+
+
+def validar_perfil(perfil):
+    """Lanza ValueError si el perfil no existe."""
+    if perfil not in PERFILES_SPACY:
+        raise ValueError(
+            f"Perfil de spaCy no soportado: {perfil}. Opciones: {', '.join(PERFILES_SPACY)}"
+        )
+
+
+# Componentes sin los que el etiquetado (Paso 2-5 y motor por lotes) deja POS y lemas vacíos
+COMPONENTES_ETIQUETADO = ("tok2vec", "tagger", "attribute_ruler", "lemmatizer")
+
+
+def validar_perfil_etiquetado(perfil):
+    """Lanza ValueError si el perfil no existe o excluye algún componente de COMPONENTES_ETIQUETADO."""
+    validar_perfil(perfil)
+    faltantes = [componente for componente in COMPONENTES_ETIQUETADO if componente in PERFILES_SPACY[perfil]]
+    if faltantes:
+        raise ValueError(
+            f"El perfil '{perfil}' no sirve para etiquetar: excluye {', '.join(faltantes)}"
+        )
+
+
+def cargar_modelo_spacy(perfil=PERFIL_POR_DEFECTO, modelo=MODELO_SPACY, progreso=None):
+    """
+    Carga el modelo de spaCy excluyendo los componentes que el perfil no utiliza
+
+    Args:
+        perfil (str): "tokenizador", "etiquetado" o "completo"
+        modelo (str): Nombre del paquete del modelo de spaCy
+        progreso (bus_progreso): Destino de los mensajes (por defecto, consola)
+
+    Returns:
+        spacy.Language: Modelo cargado con los componentes del perfil
+    """
+    validar_perfil(perfil)
+    excluidos = PERFILES_SPACY[perfil]
+    try:
+        return spacy.load(modelo, exclude=excluidos)
+    except OSError:
+        (progreso or bus_progreso.consola()).mensaje(f"⚠ Modelo {modelo} no encontrado. Instalando...",
+                                                     nivel="error")
+        subprocess.run(["python", "-m", "spacy", "download", modelo], check=True)
+        return spacy.load(modelo, exclude=excluidos)
@@ -4,6 +4,29 @@ Clase: pipeline_nltk
 Objetivo: Py con funciones para ejecutar el pos tagger con nltk
 
 Cambios:
+    1. Modo de ejecución paralelo: el corpus se divide en fragmentos que se procesan en un
+    ProcessPoolExecutor (recursos de NLTK inicializados por trabajador) y se reensamblan en el
+    orden original, con el progreso de cada paso agregado entre trabajadores
+    2. Modo fusionado: un único kernel por canción ejecuta los cinco pasos y solo se conservan
+    las columnas pedidas; los intermedios quedan como salida opcional de depuración
+    3. Caché LRU de lemas por (palabra, pos de WordNet) compartida en el proceso y persistible en
+    disco; el conjunto de stopwords se construye una sola vez por proceso
+    4. Resultados en Parquet con columnas list<list<struct>> nativas (formato="parquet")
+    5. Modo incremental: solo se etiquetan las canciones cuya huella (letra + versión del
+    motor) no está en el almacén persistente
+    6. Modo streaming: el corpus se lee por lotes (CSV o Parquet), se procesa lote a lote y se
+    agrega al archivo de resultados, con memoria acotada por el tamaño del lote
+    7. Puntos de control por lote en data/checkpoints/<id_ejecucion>, reanudables por ID
+    8. Progreso y mensajes como eventos tipados en un bus_progreso (sin depender de la salida
+    de tqdm); por defecto se muestran en consola
+    9. Instrumentación por etapa (tiempo, CPU, canciones/s, tokens/s, memoria); el resumen se
+    guarda en <resultados>.metricas.json
+    10. Límite de longitud por canción (max_caracteres_letra): las letras atípicas no se
+    etiquetan, quedan con las columnas de resultado vacías y se listan en las métricas
+    11. Plazo por fragmento en el modo paralelo (tiempo_max_fragmento): un fragmento vencido se
+    reintenta canción por canción con tiempo_max_cancion cada una; las que vuelven a vencer
+    quedan vacías, se listan como las atípicas y no se guardan en el almacén incremental. El
+    límite de longitud queda como filtro previo, sin coste
 
 """
 # Configurar SSL PRIMERO (antes de importar NLTK)
@@ -16,28 +39,200 @@ else:
     ssl._create_default_https_context = _create_unverified_https_context
 
 # Ahora importar todas las librerías necesarias
+import contextlib
+import io
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from queue import Empty
+
 import nltk
-from tqdm import tqdm
 from nltk.tokenize import word_tokenize, sent_tokenize
 from nltk import pos_tag
 from nltk.stem import WordNetLemmatizer
 from nltk.corpus import stopwords
 
 import warnings
-from src.data.carga_corpus import carga_corpus
+from src.data.carga_corpus import carga_corpus, validar_formato
+from src.pos_tagging import letras_atipicas
+from src.pos_tagging.almacen_incremental import almacen_incremental
+from src.pos_tagging.puntos_control import puntos_control
+from src.pos_tagging.cache_lemas import cache_lemas, ruta_cache_por_defecto
+from src.utils.eventos_progreso import bus_progreso
+from src.utils.instrumentacion import instrumentacion_pasos, contar_tokens
 warnings.filterwarnings('ignore')
 
-class pipeline_nltk:
+# Pasos del pipeline: (descripción de la barra de progreso, columna resultante)
+_PASOS_NLTK = [
+    ("Paso 1 Tokenización", 'tokens'),
+    ("Paso 2 Etiquetado POS", 'Etiquetado_POS'),
+    ("Paso 3 Borrado de StopWords", 'StopWords'),
+    ("Paso 4 Mayúsculas / minúsculas", 'pos_tags_lower'),
+    ("Paso 5 Lematización", 'Lematizado'),
+]
+
+RUTA_ENTRADA = '\\data\\processed\\corpus_canciones.csv'
+
+# Subir cuando cambie la forma de derivar las columnas de resultado (invalida el almacén incremental)
+VERSION_SALIDA = 1
+
+# Columnas que conservan los modos fusionado y paralelo si no se indica otra cosa
+# (analisis_emocional cuenta desde los lemas con Etiquetado_POS y Lematizado)
+_COLUMNAS_POR_DEFECTO = ('tokens', 'Etiquetado_POS', 'Lematizado')
+
+# Recursos compartidos dentro de cada proceso
+_stopwords_proceso = None
+_cache_lemas_proceso = None
+
+# Estado de cada proceso trabajador del modo paralelo
+_procesador_trabajador = None
+
+
+def _obtener_stopwords():
+    """Conjunto de stopwords en inglés, construido una sola vez por proceso."""
+    global _stopwords_proceso
+    if _stopwords_proceso is None:
+        _stopwords_proceso = set(stopwords.words('english'))
+    return _stopwords_proceso
+
+
+def _obtener_cache_lemas():
+    """Caché de lemas del proceso, con un único WordNetLemmatizer."""
+    global _cache_lemas_proceso
+    if _cache_lemas_proceso is None:
+        lemmatizer = WordNetLemmatizer()
+        _cache_lemas_proceso = cache_lemas(lambda palabra, pos: lemmatizer.lemmatize(palabra, pos=pos))
+    return _cache_lemas_proceso
+
+
+def _inicializar_trabajador(ruta_cache_lemas):
+    """Carga los recursos de NLTK y la caché de lemas persistida una sola vez por proceso trabajador."""
+    global _procesador_trabajador
+    with contextlib.redirect_stdout(io.StringIO()):
+        _procesador_trabajador = pipeline_nltk._crear_procesador()
+    lemas = _obtener_cache_lemas()
+    if ruta_cache_lemas:
+        lemas.cargar(ruta_cache_lemas)
+    # Los lemas calculados se devuelven al proceso principal para persistirlos
+    lemas.registrar_nuevas()
 
-    def __init__(self):
 
+def _procesar_fragmento(clave, letras, cola_progreso, columnas):
+    """
+    Ejecuta los cinco pasos sobre un fragmento de letras dentro de un proceso trabajador.
+    Tras cada paso informa a la cola cuántas canciones completó. Solo devuelve `columnas`.
+
+    Returns:
+        tuple: (clave del fragmento o de la canción reintentada, {columna: lista de resultados},
+        (aciertos, fallos, lemas nuevos) de la caché de lemas del trabajador en este fragmento)
+    """
+    procesador = _procesador_trabajador
+    lemas = _obtener_cache_lemas()
+    aciertos, fallos = lemas.aciertos, lemas.fallos
+    funciones = [
+        procesador._realizar_token,
+        procesador._realizar_taggins,
+        procesador._borrado_stopWords,
+        procesador._convertir_minusculas,
+        procesador._lematizar,
+    ]
+    resultados = {}
+    entrada = letras
+    for (descripcion, columna), funcion in zip(_PASOS_NLTK, funciones):
+        entrada = [funcion(valor) for valor in entrada]
+        if columna in columnas:
+            resultados[columna] = entrada
+        cola_progreso.put((clave, descripcion, len(letras)))
+    return clave, resultados, (lemas.aciertos - aciertos, lemas.fallos - fallos, lemas.extraer_nuevas())
+
+
+class pipeline_nltk:
+
+    def __init__(self, n_procesos=None, tamano_fragmento=250, columnas_salida=_COLUMNAS_POR_DEFECTO,
+                 depuracion=False, persistir_cache_lemas=True, ruta_cache_lemas=None, formato="parquet",
+                 incremental=False, streaming=False, tamano_lote=5000, ruta_entrada=RUTA_ENTRADA,
+                 con_puntos_control=False, id_ejecucion=None, progreso=None, trazar_memoria=False,
+                 ruta_salida=None, max_caracteres_letra=letras_atipicas.MAX_CARACTERES_POR_DEFECTO,
+                 tiempo_max_fragmento=600, tiempo_max_cancion=60):
+        """
+        Args:
+            n_procesos (int): Procesos trabajadores del modo paralelo (por defecto, todos los núcleos)
+            tamano_fragmento (int): Canciones por fragmento en el modo paralelo
+            columnas_salida (iterable): Columnas que conservan los modos fusionado y paralelo
+            depuracion (bool): Si es True se conservan también todas las columnas intermedias
+            persistir_cache_lemas (bool): Carga la caché de lemas de disco al iniciar y la guarda al final
+            ruta_cache_lemas (str): Archivo de la caché de lemas (por defecto data/cache/lemas_nltk.parquet)
+            formato (str): "parquet" (columnas etiquetadas nativas) o "csv" (formato original)
+            incremental (bool): Reutiliza los resultados guardados de las canciones sin cambios
+            streaming (bool): Lee, procesa y escribe el corpus por lotes de `tamano_lote` canciones
+            tamano_lote (int): Canciones por lote en el modo streaming y con puntos de control
+            ruta_entrada (str): Corpus procesado de entrada (CSV o Parquet)
+            con_puntos_control (bool): Guarda cada lote completado para poder reanudar la ejecución
+            id_ejecucion (str): ID de una ejecución interrumpida a reanudar (activa los puntos de control)
+            progreso (bus_progreso): Destino de los eventos de progreso y mensajes (por defecto, consola)
+            trazar_memoria (bool): Mide con tracemalloc la memoria que retiene cada etapa (más lento)
+            ruta_salida (str): Archivo de resultados (por defecto data/results/corpus_canciones_nltk.<formato>)
+            max_caracteres_letra (int): Las letras más largas no se etiquetan (quedan vacías y se
+                registran); None desactiva el límite
+            tiempo_max_fragmento (float): Segundos que puede tardar un fragmento del modo paralelo
+                antes de reintentar sus canciones una a una; None desactiva el plazo
+            tiempo_max_cancion (float): Segundos por canción en el reintento; las que lo superan
+                quedan vacías y se registran como las letras atípicas
+        """
+        validar_formato(formato)
+        if streaming and incremental:
+            raise ValueError("El modo streaming no se puede combinar con el modo incremental")
+        self._streaming = streaming
+        self._tamano_lote = tamano_lote
+        self._ruta_entrada = ruta_entrada
+        self._ruta_salida = ruta_salida
+        self._con_puntos_control = con_puntos_control or id_ejecucion is not None
+        self._id_ejecucion = id_ejecucion
+        self._control = None
+        self._formato = formato
+        self._incremental = incremental
+        columnas_validas = [columna for _, columna in _PASOS_NLTK]
+        no_validas = set(columnas_salida) - set(columnas_validas)
+        if no_validas:
+            raise ValueError(f"Columnas de salida no soportadas: {', '.join(sorted(no_validas))}")
+        if not columnas_salida and not depuracion:
+            raise ValueError("columnas_salida debe incluir al menos una columna")
+        self._n_procesos = n_procesos or os.cpu_count() or 1
+        self._tamano_fragmento = tamano_fragmento
+        self._columnas_salida = columnas_validas if depuracion else [
+            columna for columna in columnas_validas if columna in columnas_salida
+        ]
+        self._progreso = progreso or bus_progreso.consola()
+        self._trazar_memoria = trazar_memoria
+        self._max_caracteres_letra = max_caracteres_letra
+        self._tiempo_max_fragmento = tiempo_max_fragmento
+        self._tiempo_max_cancion = tiempo_max_cancion
+        self._letras_omitidas = []
+        # Índices de las canciones que vencieron su plazo en la ejecución en curso
+        self._indices_agotados = set()
+        self._instrumentacion = instrumentacion_pasos("nltk")
+        # (Manager, cola de progreso, ProcessPoolExecutor) del modo paralelo durante una ejecución
+        self._pool = None
+        self._ruta_cache_lemas = None
+        if persistir_cache_lemas:
+            self._ruta_cache_lemas = ruta_cache_lemas or ruta_cache_por_defecto()
         self._cargar_recursos_nltk()
+        if self._ruta_cache_lemas:
+            cargadas = _obtener_cache_lemas().cargar(self._ruta_cache_lemas)
+            self._progreso.mensaje(f"✓ Caché de lemas: {cargadas} entradas cargadas", nivel="completado")
         self._cargar_corpus = carga_corpus()
-        self._df = self._cargar_corpus.cargar_corpus('\\data\\processed\\corpus_canciones.csv')
+        # En modo streaming el corpus se lee por lotes dentro de ejecutar()
+        self._df = None if streaming else self._cargar_entrada()
+
+    def _cargar_entrada(self):
+        if self._ruta_entrada.endswith('.parquet'):
+            return self._cargar_corpus.cargar_corpus_parquet(self._ruta_entrada)
+        return self._cargar_corpus.cargar_corpus(self._ruta_entrada)
 
 
     def _cargar_recursos_nltk(self):
-        print("Cargando recursos de NLTK ...\n")
+        self._progreso.mensaje("Cargando recursos de NLTK ...\n")
 
         # Intentar descargar recursos de NLTK de forma silenciosa
         try:
@@ -70,10 +265,19 @@ class pipeline_nltk:
         except LookupError:
             nltk.download('wordnet', quiet=True)
 
-        print("✓ Recursos de NLTK listos")
-        print("\n" + "=" * 60)
-        print("¡Listo para comenzar con el POS Tagging!")
-        print("=" * 60)
+        self._progreso.mensaje("✓ Recursos de NLTK listos", nivel="completado")
+        self._progreso.mensaje("\n" + "=" * 60)
+        self._progreso.mensaje("¡Listo para comenzar con el POS Tagging!")
+        self._progreso.mensaje("=" * 60)
+
+    @classmethod
+    def _crear_procesador(cls):
+        """Instancia sin corpus, solo con recursos de NLTK, para los procesos trabajadores."""
+        procesador = cls.__new__(cls)
+        # Sin suscriptores: los trabajadores no muestran mensajes
+        procesador._progreso = bus_progreso()
+        procesador._cargar_recursos_nltk()
+        return procesador
 
     # Paso 1 Tokenización
     def _realizar_token(self, letra):
@@ -85,8 +289,8 @@ class pipeline_nltk:
         return token
 
     def _paso_tokenizacion(self):
-        tqdm.pandas(desc="Paso 1 Tokenización")
-        self._df['tokens'] = self._df['letra_cancion'].progress_apply(self._realizar_token)
+        self._df['tokens'] = self._progreso.aplicar("Paso 1 Tokenización", self._df['letra_cancion'],
+                                                    self._realizar_token)
 
     # Paso 2 Etiquetado POS
     def _realizar_taggins(self, token):
@@ -98,13 +302,13 @@ class pipeline_nltk:
         return analisis
 
     def _paso_pos_tagging(self):
-        tqdm.pandas(desc="Paso 2 Etiquetado POS")
-        self._df['Etiquetado_POS'] = self._df['tokens'].progress_apply(self._realizar_taggins)
+        self._df['Etiquetado_POS'] = self._progreso.aplicar("Paso 2 Etiquetado POS", self._df['tokens'],
+                                                            self._realizar_taggins)
 
     # Paso 3 Borrado de StopWords
     def _borrado_stopWords(self, pos_tags_list):
         """Elimina stopwords comunes"""
-        stop_words = set(stopwords.words('english'))
+        stop_words = _obtener_stopwords()
         resultado = []
         for sentence_tags in pos_tags_list:
             sentence_clean = [(word, tag) for word, tag in sentence_tags
@@ -114,8 +318,8 @@ class pipeline_nltk:
         return resultado
 
     def _paso_stopwords(self):
-        tqdm.pandas(desc="Paso 3 Borrado de StopWords")
-        self._df['StopWords'] = self._df['Etiquetado_POS'].progress_apply(self._borrado_stopWords)
+        self._df['StopWords'] = self._progreso.aplicar("Paso 3 Borrado de StopWords", self._df['Etiquetado_POS'],
+                                                       self._borrado_stopWords)
 
     # Paso 4 Mayúsculas / minúsculas
     def _convertir_minusculas(self, pos_tags_list):
@@ -127,8 +331,8 @@ class pipeline_nltk:
         return resultado
 
     def _paso_minusculas(self):
-        tqdm.pandas(desc=" Paso 4 Mayúsculas / minúsculas")
-        self._df['pos_tags_lower'] = self._df['StopWords'].progress_apply(self._convertir_minusculas)
+        self._df['pos_tags_lower'] = self._progreso.aplicar("Paso 4 Mayúsculas / minúsculas", self._df['StopWords'],
+                                                            self._convertir_minusculas)
 
     # Paso 5 Lematización
     def _get_wordnet_pos(self, tag):
@@ -146,31 +350,391 @@ class pipeline_nltk:
 
     def _lematizar(self, pos_tags_list):
         """Aplica lematización usando POS tags"""
-        lemmatizer = WordNetLemmatizer()
+        lemas = _obtener_cache_lemas()
         resultado = []
         for sentence_tags in pos_tags_list:
             sentence_lemma = []
             for word, tag in sentence_tags:
                 wordnet_pos = self._get_wordnet_pos(tag)
-                lemma = lemmatizer.lemmatize(word, pos=wordnet_pos)
+                lemma = lemas.lematizar(word, wordnet_pos)
                 sentence_lemma.append((lemma, tag))
             resultado.append(sentence_lemma)
         return resultado
 
     def _paso_lematizacion(self):
-        tqdm.pandas(desc="Paso 5 Lematización")
-        self._df['Lematizado'] = self._df['pos_tags_lower'].progress_apply(self._lematizar)
+        self._df['Lematizado'] = self._progreso.aplicar("Paso 5 Lematización", self._df['pos_tags_lower'],
+                                                        self._lematizar)
+
+    # Modo fusionado: los cinco pasos en una sola llamada por canción
+    def _procesar_cancion(self, letra):
+        """Kernel fusionado: devuelve las columnas de salida de una canción sin guardar intermedios"""
+        tokens = self._realizar_token(letra)
+        etiquetado = self._realizar_taggins(tokens)
+        sin_stopwords = self._borrado_stopWords(etiquetado)
+        minusculas = self._convertir_minusculas(sin_stopwords)
+        lematizado = self._lematizar(minusculas)
+        resultado = {
+            'tokens': tokens,
+            'Etiquetado_POS': etiquetado,
+            'StopWords': sin_stopwords,
+            'pos_tags_lower': minusculas,
+            'Lematizado': lematizado,
+        }
+        return [resultado[columna] for columna in self._columnas_salida]
+
+    def _paso_fusionado(self):
+        salida = [[] for _ in self._columnas_salida]
+        for letra in self._progreso.recorrer("Paso 1-5 Kernel fusionado", self._df['letra_cancion']):
+            for lista, valor in zip(salida, self._procesar_cancion(letra)):
+                lista.append(valor)
+        for columna, lista in zip(self._columnas_salida, salida):
+            self._df[columna] = lista
+
+    # Modo paralelo: fragmentos en un ProcessPoolExecutor
+    def _obtener_pool(self):
+        """
+        Cola de progreso y pool de trabajadores de la ejecución; se crean en el primer lote y se
+        reutilizan en los siguientes (puntos de control, streaming), de modo que el arranque de
+        los procesos y la carga de NLTK y de la caché de lemas ocurren una sola vez por ejecución
+        """
+        if self._pool is None:
+            # "spawn": el dashboard ejecuta el pipeline en un hilo del gestor de trabajos y un
+            # fork copiaría los candados de los demás hilos en el estado en que estén
+            contexto = multiprocessing.get_context("spawn")
+            gestor = contexto.Manager()
+            try:
+                ejecutor = ProcessPoolExecutor(max_workers=self._n_procesos, mp_context=contexto,
+                                               initializer=_inicializar_trabajador,
+                                               initargs=(self._ruta_cache_lemas,))
+            except BaseException:
+                gestor.shutdown()
+                raise
+            self._pool = (gestor, gestor.Queue(), ejecutor)
+        return self._pool[1], self._pool[2]
+
+    def _cerrar_pool(self):
+        if self._pool is None:
+            return
+        gestor, _, ejecutor = self._pool
+        self._pool = None
+        ejecutor.shutdown(wait=True, cancel_futures=True)
+        gestor.shutdown()
+
+    def _terminar_pool(self):
+        """Detiene el pool a la fuerza: un trabajador ocupado en una letra no atiende shutdown()."""
+        if self._pool is None:
+            return
+        gestor, _, ejecutor = self._pool
+        self._pool = None
+        terminar = getattr(ejecutor, 'terminate_workers', None)
+        if terminar is not None:
+            terminar()
+        else:
+            # Antes de Python 3.14 el pool no expone sus procesos
+            for proceso in list((ejecutor._processes or {}).values()):
+                proceso.terminate()
+            ejecutor.shutdown(wait=True, cancel_futures=True)
+        gestor.shutdown()
+
+    def _paso_paralelo(self):
+        letras = self._df['letra_cancion'].tolist()
+        total = len(letras)
+        # Cada tarea es una clave y las posiciones de sus letras: un fragmento, o (fragmento,
+        # posición) para las canciones que se reintentan una a una
+        fragmentos = {indice: range(inicio, min(inicio + self._tamano_fragmento, total))
+                      for indice, inicio in enumerate(range(0, total, self._tamano_fragmento))}
+        self._progreso.mensaje(f"Modo paralelo: {len(fragmentos)} fragmentos en {self._n_procesos} procesos")
+
+        barras = {descripcion: self._progreso.etapa(descripcion, total) for descripcion, _ in _PASOS_NLTK}
+        resultados, contados = {}, set()
+        vencidos = self._ejecutar_tareas(fragmentos, letras, self._tiempo_max_fragmento, barras,
+                                         resultados, contados)
+        canciones = {(indice, posicion): range(posicion, posicion + 1)
+                     for indice in vencidos for posicion in fragmentos[indice]}
+        if canciones:
+            self._progreso.mensaje(f"⚠ {len(vencidos)} fragmentos superaron {self._tiempo_max_fragmento} s: "
+                                   f"se reintentan sus {len(canciones)} canciones una a una", nivel="error")
+            agotadas = self._ejecutar_tareas(canciones, letras, self._tiempo_max_cancion, barras,
+                                             resultados, contados)
+            self._registrar_agotadas(sorted(posicion for _, posicion in agotadas))
+            for clave in agotadas:
+                resultados[clave] = {columna: [[]] for columna in self._columnas_salida}
+        for barra in barras.values():
+            barra.close()
+
+        # Reensamblar en el orden original de las filas
+        claves = [clave for indice, posiciones in fragmentos.items()
+                  for clave in ([indice] if indice in resultados else [(indice, p) for p in posiciones])]
+        for columna in self._columnas_salida:
+            self._df[columna] = [fila for clave in claves for fila in resultados[clave][columna]]
+
+    def _ejecutar_tareas(self, tareas, letras, limite, barras, resultados, contados):
+        """
+        Reparte `tareas` ({clave: posiciones}) en el pool y deja en `resultados` las columnas
+        de cada una. Una tarea que lleva más de `limite` segundos en ejecución vence: el pool
+        se detiene (su trabajador no se puede liberar de otra forma) y las demás tareas sin
+        terminar se vuelven a enviar a un pool nuevo.
+
+        Returns:
+            list: Claves de las tareas vencidas
+        """
+        pendientes_tareas = dict(tareas)
+        vencidas = []
+        lemas = _obtener_cache_lemas()
+        while pendientes_tareas:
+            cola_progreso, ejecutor = self._obtener_pool()
+            futuros = {ejecutor.submit(_procesar_fragmento, clave, [letras[p] for p in posiciones],
+                                       cola_progreso, self._columnas_salida): clave
+                       for clave, posiciones in pendientes_tareas.items()}
+            pendientes, expiradas, inicios = set(futuros), [], {}
+            try:
+                while pendientes and not expiradas:
+                    hechos, pendientes = wait(pendientes, timeout=0.2)
+                    for futuro in hechos:
+                        clave, columnas, (aciertos, fallos, nuevas) = futuro.result()
+                        resultados[clave] = columnas
+                        del pendientes_tareas[clave]
+                        # Cada trabajador tiene su propia caché: se suman aquí sus contadores y lemas nuevos
+                        lemas.fusionar(aciertos, fallos, nuevas)
+                    self._actualizar_progreso(cola_progreso, barras, contados)
+                    self._progreso.verificar()
+                    if limite:
+                        # Una tarea cuenta desde que el pool la marca en ejecución (a lo sumo una
+                        # por trabajador espera en la cola interna con ese estado)
+                        ahora = time.monotonic()
+                        for futuro in pendientes:
+                            if futuro.running():
+                                inicios.setdefault(futuro, ahora)
+                        expiradas = [futuro for futuro in pendientes
+                                     if futuro in inicios and ahora - inicios[futuro] > limite]
+            except BaseException:
+                # Ejecución cancelada: no se esperan los fragmentos que aún no empezaron
+                for futuro in pendientes:
+                    futuro.cancel()
+                raise
+            if not expiradas:
+                break
+            for futuro in expiradas:
+                vencidas.append(futuros[futuro])
+                del pendientes_tareas[futuros[futuro]]
+            self._terminar_pool()
+        return vencidas
+
+    def _registrar_agotadas(self, posiciones):
+        """Anota las canciones que vencieron tiempo_max_cancion; no se guardan en el almacén incremental."""
+        if not posiciones:
+            return
+        agotadas = self._df.iloc[posiciones]
+        self._letras_omitidas.extend(letras_atipicas.describir(agotadas))
+        self._indices_agotados.update(agotadas.index)
+        self._progreso.mensaje(f"⚠ {len(agotadas)} letras superaron {self._tiempo_max_cancion} s "
+                               f"y no se etiquetan (quedan vacías)", nivel="error")
+
+    @staticmethod
+    def _actualizar_progreso(cola_progreso, barras, contados):
+        """
+        Vacía la cola de progreso de los trabajadores y avanza la barra de cada paso. Un paso
+        de un fragmento que se vuelve a ejecutar, o de sus canciones, solo se cuenta una vez.
+        """
+        while True:
+            try:
+                clave, descripcion, cantidad = cola_progreso.get_nowait()
+            except Empty:
+                return
+            fragmento = clave[0] if isinstance(clave, tuple) else clave
+            if (clave, descripcion) in contados or (fragmento, descripcion) in contados:
+                continue
+            contados.add((clave, descripcion))
+            barras[descripcion].update(cantidad)
+
+    def _reportar_cache_lemas(self):
+        """Imprime los contadores de la caché de lemas y la persiste si hubo lemas nuevos."""
+        lemas = _obtener_cache_lemas()
+        estadisticas = lemas.estadisticas()
+        if estadisticas['aciertos'] + estadisticas['fallos'] == 0:
+            return
+        self._progreso.mensaje(f"Caché de lemas: {estadisticas['aciertos']} aciertos, "
+                               f"{estadisticas['fallos']} fallos ({estadisticas['tasa_aciertos']:.1%}), "
+                               f"{estadisticas['entradas']} entradas")
+        if self._ruta_cache_lemas and estadisticas['fallos']:
+            lemas.guardar(self._ruta_cache_lemas)
+
+    def _version_motor(self, modo):
+        """
+        Identifica la versión de NLTK, de la salida y las columnas que se conservan. Todos los
+        modos calculan cada columna igual, pero el secuencial guarda las cinco y los demás solo
+        columnas_salida: un mismo resultado no sirve para todos los modos.
+        """
+        columnas = '+'.join(self._columnas_resultado(modo))
+        return f"nltk|{nltk.__version__}|max{self._max_caracteres_letra}|{columnas}|v{VERSION_SALIDA}"
+
+    def _nombre_almacen(self, modo):
+        """Un almacén incremental por conjunto de columnas, para que cambiar de modo no lo reemplace."""
+        return "etiquetado_nltk_" + "_".join(self._columnas_resultado(modo)).lower()
+
+    def obtener_metricas(self):
+        """Resumen de la instrumentación por etapa de la última ejecución."""
+        return self._instrumentacion.resumen()
+
+    def _medir(self, etapa, paso, columna):
+        """Ejecuta un paso midiendo tiempo, CPU y memoria; los tokens se cuentan en `columna`."""
+        self._instrumentacion.medir(etapa, paso, len(self._df), lambda: contar_tokens(self._df[columna]))
+
+    def _columnas_resultado(self, modo):
+        if modo == "secuencial":
+            return [columna for _, columna in _PASOS_NLTK]
+        return list(self._columnas_salida)
+
+    def _ejecutar_pasos(self, df, modo):
+        aptas, atipicas = letras_atipicas.separar(df, self._max_caracteres_letra)
+        self._registrar_omitidas(atipicas)
+        self._df = aptas
+        if modo == "secuencial":
+            for (etapa, columna), paso in zip(_PASOS_NLTK, [self._paso_tokenizacion, self._paso_pos_tagging,
+                                                            self._paso_stopwords, self._paso_minusculas,
+                                                            self._paso_lematizacion]):
+                self._medir(etapa, paso, columna)
+        elif modo == "fusionado":
+            self._medir("Paso 1-5 Kernel fusionado", self._paso_fusionado, self._columnas_salida[0])
+        elif modo == "paralelo":
+            # El tiempo de CPU es el del proceso principal; los trabajadores no se incluyen
+            self._medir("Paso 1-5 Paralelo", self._paso_paralelo, self._columnas_salida[0])
+        else:
+            raise ValueError(f"Modo de ejecución no soportado: {modo}")
+        self._df = letras_atipicas.reincorporar(self._df, atipicas, self._columnas_resultado(modo), df.index)
+        return self._df
+
+    def _registrar_omitidas(self, atipicas):
+        """Anota las letras que superan max_caracteres_letra y avisa en el bus de progreso."""
+        if not len(atipicas):
+            return
+        self._letras_omitidas.extend(letras_atipicas.describir(atipicas))
+        self._progreso.mensaje(f"⚠ {len(atipicas)} letras de más de {self._max_caracteres_letra} caracteres "
+                               f"no se etiquetan (quedan vacías)", nivel="error")
+
+    def obtener_letras_omitidas(self):
+        """Letras no etiquetadas por su longitud en la última ejecución (índice, nombre, caracteres)."""
+        return list(self._letras_omitidas)
 
     # Guardar Corpus
+    def _ruta_resultados(self):
+        if self._ruta_salida:
+            return self._ruta_salida
+        return f'\\data\\results\\corpus_canciones_nltk.{self._formato}'
+
     def _guardar(self):
-       self._cargar_corpus.guardar_corpus('\\data\\results\\corpus_canciones_nltk.csv',self._df)
+        if self._formato == "parquet":
+            self._cargar_corpus.guardar_corpus_parquet(self._ruta_resultados(), self._df)
+        else:
+            self._cargar_corpus.guardar_corpus(self._ruta_resultados(), self._df)
+
+    def _guardar_metricas(self):
+        """Escribe el resumen de la instrumentación junto al archivo de resultados y lo muestra."""
+        self._instrumentacion.finalizar()
+        ruta = self._cargar_corpus.ruta_completa(self._ruta_resultados().rsplit('.', 1)[0] + '.metricas.json')
+        self._instrumentacion.guardar(ruta)
+        self._progreso.mensaje("Métricas por etapa:")
+        for linea in self._instrumentacion.lineas_resumen():
+            self._progreso.mensaje(linea)
+        self._progreso.mensaje(f"✓ Métricas guardadas en {ruta}", nivel="completado")
+
+    @property
+    def id_ejecucion(self):
+        """ID de la ejecución con puntos de control (None si no están activados)."""
+        return self._control.id_ejecucion if self._control else self._id_ejecucion
+
+    def _crear_puntos_control(self, modo):
+        configuracion = {
+            'modo': modo,
+            'tamano_lote': self._tamano_lote,
+            'ruta_entrada': self._ruta_entrada,
+            'streaming': self._streaming,
+            'incremental': self._incremental,
+            'version': self._version_motor(modo),
+        }
+        self._control = puntos_control("nltk", configuracion, self._id_ejecucion, self._progreso)
+        self._progreso.mensaje(f"Ejecución con puntos de control: {self._control.id_ejecucion}")
+        return self._control
+
+    def _procesar(self, df, modo):
+        """Ejecuta los pasos sobre `df`, por lotes con puntos de control si están activados."""
+        if not self._con_puntos_control:
+            return self._ejecutar_pasos(df, modo)
+        control = self._crear_puntos_control(modo)
+        lotes = (df.iloc[inicio:inicio + self._tamano_lote].copy()
+                 for inicio in range(0, len(df), self._tamano_lote))
+        control.procesar(lotes, lambda lote: self._ejecutar_pasos(lote, modo))
+        self._df = control.cargar_resultados()
+        self._df.index = df.index
+        return self._df
+
+    def _ejecutar_streaming(self, modo):
+        """Procesa el corpus lote a lote y agrega cada lote al archivo de resultados."""
+        ruta_salida = self._ruta_resultados()
+        lotes = self._cargar_corpus.iterar_corpus(self._ruta_entrada, self._tamano_lote)
+        if self._con_puntos_control:
+            # Cada lote se guarda como punto de control y al final se consolidan en la salida
+            control = self._crear_puntos_control(modo)
+            control.procesar(lotes, lambda lote: self._ejecutar_pasos(lote, modo))
+            lotes = control.iterar_resultados()
+        with self._cargar_corpus.abrir_escritor(ruta_salida) as escritor:
+            for numero, lote in enumerate(lotes, 1):
+                if not self._con_puntos_control:
+                    self._progreso.mensaje(f"Lote {numero}: {len(lote)} canciones")
+                    lote = self._ejecutar_pasos(lote, modo)
+                escritor.escribir(lote)
+                self._df = None
+        self._progreso.mensaje(f"✓ {escritor.filas} canciones escritas en {ruta_salida}",
+                               nivel="completado")
+        if self._control:
+            self._control.finalizar()
 
     # Ejecutar pipeline completo
-    def ejecutar(self):
-        self._paso_tokenizacion()
-        self._paso_pos_tagging()
-        self._paso_stopwords()
-        self._paso_minusculas()
-        self._paso_lematizacion()
-        self._guardar()
-        return self._cargar_corpus.cargar_corpus('\\data\\results\\corpus_canciones_nltk.csv')
\ No newline at end of file
+    def ejecutar(self, modo="secuencial"):
+        """
+        Args:
+            modo (str): "secuencial" ejecuta los cinco pasos en un solo núcleo y conserva
+                todas las columnas; "fusionado" ejecuta los cinco pasos por canción en una sola
+                pasada; "paralelo" reparte el corpus en fragmentos entre varios procesos.
+                Los dos últimos solo conservan las columnas de salida configuradas.
+
+        Returns:
+            DataFrame con los resultados, o None en modo streaming (quedan solo en disco).
+        """
+        if modo not in ("secuencial", "fusionado", "paralelo"):
+            raise ValueError(f"Modo de ejecución no soportado: {modo}")
+        self._letras_omitidas = []
+        self._indices_agotados = set()
+        self._instrumentacion = instrumentacion_pasos(
+            "nltk", trazar_memoria=self._trazar_memoria, modo=modo, version=self._version_motor(modo),
+            incremental=self._incremental, streaming=self._streaming, letras_omitidas=self._letras_omitidas,
+        )
+        try:
+            return self._ejecutar(modo)
+        finally:
+            self._cerrar_pool()
+            self._instrumentacion.finalizar()
+
+    def _ejecutar(self, modo):
+        if self._streaming:
+            self._ejecutar_streaming(modo)
+            self._reportar_cache_lemas()
+            self._guardar_metricas()
+            return None
+        if self._incremental:
+            almacen = almacen_incremental("nltk", self._version_motor(modo), nombre=self._nombre_almacen(modo),
+                                          progreso=self._progreso)
+            self._df = almacen.procesar(self._df, lambda pendientes: self._procesar(pendientes, modo),
+                                        self._columnas_resultado(modo),
+                                        descartar=lambda procesadas: procesadas.index.isin(self._indices_agotados))
+        else:
+            self._df = self._procesar(self._df, modo)
+        self._reportar_cache_lemas()
+        self._instrumentacion.medir("Guardar resultados", self._guardar, len(self._df))
+        self._guardar_metricas()
+        if self._control:
+            self._control.finalizar()
+        if self._formato == "parquet":
+            # Las columnas ya están en memoria como listas de tuplas: no hace falta releer
+            return self._df
+        return self._cargar_corpus.cargar_corpus(self._ruta_resultados())
\ No newline at end of file
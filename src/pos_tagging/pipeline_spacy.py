@@ -4,49 +4,128 @@ Clase: pipeline_spacy
 Objetivo: Py con funciones para ejecutar el pos tagger con spacy
 
 Cambios:
+    1. Motor por lotes: una sola pasada de nlp.pipe por canción de la que se derivan
+    tokens, POS, stopwords, minúsculas y lemas, con rendimiento (canciones/s) del análisis y
+    de la derivación de columnas. Cambia la salida respecto al modo secuencial (el original):
+    Lematizado toma el lema y el POS de cada token en el contexto de la letra completa, con
+    el lema en minúsculas, en lugar de volver a analizar el texto en minúsculas y sin
+    stopwords; sus tags coinciden así con los de Etiquetado_POS
+    2. Perfiles de carga del modelo (tokenizador, etiquetado, completo); el Paso 1 usa
+    solo nlp.tokenizer
+    3. Resultados en Parquet con columnas list<struct> nativas (formato="parquet")
+    4. Modo incremental: solo se etiquetan las canciones cuya huella (letra + versión del
+    motor/modelo) no está en el almacén persistente
+    5. Modo streaming: el corpus se lee por lotes (CSV o Parquet), se procesa lote a lote y se
+    agrega al archivo de resultados, con memoria acotada por el tamaño del lote
+    6. Puntos de control por lote en data/checkpoints/<id_ejecucion>, reanudables por ID
+    7. El modelo se obtiene del registro de modelos del proceso (una carga por perfil)
+    8. Progreso y mensajes como eventos tipados en un bus_progreso (sin depender de la salida
+    de tqdm); por defecto se muestran en consola
+    9. Instrumentación por etapa (tiempo, CPU, canciones/s, tokens/s, memoria); el resumen se
+    guarda en <resultados>.metricas.json
+    10. Límite de longitud por canción (max_caracteres_letra): las letras atípicas no se
+    etiquetan, quedan con las columnas de resultado vacías y se listan en las métricas
 
 """
 
-from src.data.carga_corpus import carga_corpus
+from src.data.carga_corpus import carga_corpus, validar_formato
+from src.pos_tagging import letras_atipicas
+from src.pos_tagging.almacen_incremental import almacen_incremental
+from src.pos_tagging.puntos_control import puntos_control
+from src.pos_tagging.perfiles_spacy import validar_perfil_etiquetado, PERFIL_POR_DEFECTO
+from src.pos_tagging.registro_modelos import obtener_modelo
+from src.utils.eventos_progreso import bus_progreso
+from src.utils.instrumentacion import instrumentacion_pasos, contar_tokens
 # Importar todas las librerías necesarias
-import spacy
-from tqdm import tqdm
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
 print("✓ Librerías importadas correctamente")
 
+# Subir cuando cambie la forma de derivar las columnas de resultado (invalida el almacén incremental)
+VERSION_SALIDA = 1
+
+_COLUMNAS_RESULTADO = ['tokens', 'Etiquetado_POS', 'StopWords', 'Minusculas', 'Lematizado']
+
+RUTA_ENTRADA = '\\data\\processed\\corpus_canciones.csv'
+
 class pipeline_spacy:
-    def __init__(self):
+    def __init__(self, perfil=PERFIL_POR_DEFECTO, batch_size=256, n_process=1, formato="parquet",
+                 incremental=False, streaming=False, tamano_lote=5000, ruta_entrada=RUTA_ENTRADA,
+                 con_puntos_control=False, id_ejecucion=None, progreso=None, trazar_memoria=False,
+                 ruta_salida=None, max_caracteres_letra=letras_atipicas.MAX_CARACTERES_POR_DEFECTO):
+        """
+        Args:
+            perfil (str): Perfil de carga del modelo ("etiquetado" o "completo"; "tokenizador"
+                no incluye tagger ni lemmatizer y se rechaza)
+            batch_size (int): Número de letras que nlp.pipe procesa por lote (modo "lotes")
+            n_process (int): Número de procesos que usa nlp.pipe (modo "lotes")
+            formato (str): "parquet" (columnas etiquetadas nativas) o "csv" (formato original)
+            incremental (bool): Reutiliza los resultados guardados de las canciones sin cambios
+            streaming (bool): Lee, procesa y escribe el corpus por lotes de `tamano_lote` canciones
+            tamano_lote (int): Canciones por lote en el modo streaming y con puntos de control
+            ruta_entrada (str): Corpus procesado de entrada (CSV o Parquet)
+            con_puntos_control (bool): Guarda cada lote completado para poder reanudar la ejecución
+            id_ejecucion (str): ID de una ejecución interrumpida a reanudar (activa los puntos de control)
+            progreso (bus_progreso): Destino de los eventos de progreso y mensajes (por defecto, consola)
+            trazar_memoria (bool): Mide con tracemalloc la memoria que retiene cada etapa (más lento)
+            ruta_salida (str): Archivo de resultados (por defecto data/results/corpus_canciones_spacy.<formato>)
+            max_caracteres_letra (int): Las letras más largas no se etiquetan (quedan vacías y se
+                registran); None desactiva el límite
+        """
+        validar_perfil_etiquetado(perfil)
+        validar_formato(formato)
+        if streaming and incremental:
+            raise ValueError("El modo streaming no se puede combinar con el modo incremental")
+        self._streaming = streaming
+        self._tamano_lote = tamano_lote
+        self._ruta_entrada = ruta_entrada
+        self._ruta_salida = ruta_salida
+        self._con_puntos_control = con_puntos_control or id_ejecucion is not None
+        self._id_ejecucion = id_ejecucion
+        self._control = None
+        self._formato = formato
+        self._incremental = incremental
+        self._perfil = perfil
+        self._batch_size = batch_size
+        self._n_process = n_process
+        self._rendimiento = {}
+        self._trazar_memoria = trazar_memoria
+        self._max_caracteres_letra = max_caracteres_letra
+        self._letras_omitidas = []
+        self._instrumentacion = instrumentacion_pasos("spacy")
+        self._progreso = progreso or bus_progreso.consola()
         self._cargar_recursos_spacy()
         self._cargar_corpus = carga_corpus()
-        self._df = self._cargar_corpus.cargar_corpus('\\data\\processed\\corpus_canciones.csv')
+        # En modo streaming el corpus se lee por lotes dentro de ejecutar()
+        self._df = None if streaming else self._cargar_entrada()
+
+    def _cargar_entrada(self):
+        if self._ruta_entrada.endswith('.parquet'):
+            return self._cargar_corpus.cargar_corpus_parquet(self._ruta_entrada)
+        return self._cargar_corpus.cargar_corpus(self._ruta_entrada)
 
 
     def _cargar_recursos_spacy(self):
         # Descargar recursos necesarios de Spacy (si no están ya instalados)
 
-        print("Cargando recursos de Spacy...\n")
+        self._progreso.mensaje("Cargando recursos de Spacy...\n")
 
-        # Cargar modelo de Spacy en inglés
-        print("Cargando modelo de Spacy...")
-        try:
-            self._nlp = spacy.load("en_core_web_sm")
-            print("✓ Modelo de Spacy cargado correctamente")
-        except OSError:
-            print("⚠ Modelo no encontrado. Instalando...")
-            import subprocess
-            subprocess.run(["python", "-m", "spacy", "download", "en_core_web_sm"], check=True)
-            self._nlp = spacy.load("en_core_web_sm")
-            print("✓ Modelo de Spacy instalado y cargado")
-
-        print("\n" + "=" * 60)
-        print("¡Listo para comenzar con el POS Tagging!")
-        print("=" * 60)
+        # Modelo de Spacy en inglés con los componentes del perfil (compartido en el proceso)
+        self._progreso.mensaje(f"Cargando modelo de Spacy (perfil: {self._perfil})...")
+        self._nlp = obtener_modelo(self._perfil, progreso=self._progreso)
+        self._progreso.mensaje(f"✓ Modelo de Spacy cargado correctamente: "
+                               f"{', '.join(self._nlp.pipe_names) or 'solo tokenizer'}", nivel="completado")
+
+        self._progreso.mensaje("\n" + "=" * 60)
+        self._progreso.mensaje("¡Listo para comenzar con el POS Tagging!")
+        self._progreso.mensaje("=" * 60)
         # Tokenización
 
     def _realizar_token(self, letra):
-        doc = self._nlp(letra)
+        # La tokenización no depende de ningún componente del pipeline
+        doc = self._nlp.tokenizer(letra)
         token = []
         for tok in doc:
             tokens = tok.text
@@ -54,8 +133,8 @@ class pipeline_spacy:
         return token
 
     def _paso_tokenizacion(self):
-        tqdm.pandas(desc="Paso 1 Tokenización")
-        self._df['tokens'] = self._df['letra_cancion'].progress_apply(self._realizar_token)
+        self._df['tokens'] = self._progreso.aplicar("Paso 1 Tokenización", self._df['letra_cancion'],
+                                                   self._realizar_token)
 
         # Etiquetado POS
 
@@ -70,8 +149,8 @@ class pipeline_spacy:
         return etiquetas
 
     def _paso_pos_tagging(self):
-        tqdm.pandas(desc="Paso 2: Etiquetado POS")
-        self._df['Etiquetado_POS'] = self._df['tokens'].progress_apply(self._realizar_etiquetado)
+        self._df['Etiquetado_POS'] = self._progreso.aplicar("Paso 2: Etiquetado POS", self._df['tokens'],
+                                                           self._realizar_etiquetado)
 
         # Borrado de StopWords y NER
 
@@ -84,8 +163,8 @@ class pipeline_spacy:
         return sin_stopwords
 
     def _paso_stopwords(self):
-        tqdm.pandas(desc="Paso 3: Eliminar Stopwords")
-        self._df['StopWords'] = self._df['Etiquetado_POS'].progress_apply(self._eliminar_stopwords)
+        self._df['StopWords'] = self._progreso.aplicar("Paso 3: Eliminar Stopwords",
+                                                      self._df['Etiquetado_POS'], self._eliminar_stopwords)
 
         # Mayúsculas y minúsculas
 
@@ -97,8 +176,8 @@ class pipeline_spacy:
         return minusculas
 
     def _paso_minusculas(self):
-        tqdm.pandas(desc="Paso 4: Aplicar Minúsculas")
-        self._df['Minusculas'] = self._df['StopWords'].progress_apply(self._aplicar_minusculas)
+        self._df['Minusculas'] = self._progreso.aplicar("Paso 4: Aplicar Minúsculas", self._df['StopWords'],
+                                                       self._aplicar_minusculas)
 
         # Lematización
 
@@ -115,22 +194,225 @@ class pipeline_spacy:
         return lemas
 
     def _paso_lematizacion(self):
-        tqdm.pandas(desc="Paso 5: Lematización")
-        self._df['Lematizado'] = self._df['Minusculas'].progress_apply(self._aplicar_lematizacion)
+        self._df['Lematizado'] = self._progreso.aplicar("Paso 5: Lematización", self._df['Minusculas'],
+                                                       self._aplicar_lematizacion)
+
+    # Motor por lotes (una sola pasada de nlp.pipe)
+
+    def _paso_lotes(self):
+        """
+        Analiza cada letra una única vez con nlp.pipe y deriva del mismo Doc las
+        columnas de los cinco pasos. El etiquetado y la lematización ocurren dentro de
+        nlp.pipe, por lo que se reportan dos etapas: el análisis (tokenizer y componentes
+        del perfil) y la derivación de las columnas a partir de cada Doc.
+        """
+        stop_words = self._nlp.Defaults.stop_words
+        letras = self._df['letra_cancion'].fillna('').astype(str)
+        total = len(letras)
+
+        etapa_analisis = f"Análisis nlp.pipe ({', '.join(['tokenizer', *self._nlp.pipe_names])})"
+        etapa_columnas = "Derivar columnas (Paso 1-5)"
+        tiempos = {etapa_analisis: 0.0, etapa_columnas: 0.0}
+        tokens, etiquetado, sin_stopwords, minusculas, lematizado = [], [], [], [], []
+
+        docs = self._nlp.pipe(letras, batch_size=self._batch_size, n_process=self._n_process)
+        barra = self._progreso.etapa("Paso 1-5 Motor por lotes (nlp.pipe)", total)
+        inicio = time.perf_counter()
+        for doc in docs:
+            t0 = time.perf_counter()
+            tiempos[etapa_analisis] += t0 - inicio
+
+            tokens.append([tok.text for tok in doc])
+            etiquetado.append([(tok.text, tok.pos_) for tok in doc])
+            filtrados = [tok for tok in doc if tok.lower_ not in stop_words]
+            sin_stopwords.append([(tok.text, tok.pos_) for tok in filtrados])
+            minusculas.append([(tok.lower_, tok.pos_) for tok in filtrados])
+            lematizado.append([(tok.lemma_.lower(), tok.pos_) for tok in filtrados])
+
+            tiempos[etapa_columnas] += time.perf_counter() - t0
+            barra.update(1)
+            inicio = time.perf_counter()
+        barra.close()
+
+        self._df['tokens'] = tokens
+        self._df['Etiquetado_POS'] = etiquetado
+        self._df['StopWords'] = sin_stopwords
+        self._df['Minusculas'] = minusculas
+        self._df['Lematizado'] = lematizado
+
+        self._rendimiento = {
+            etapa: (total / segundos if segundos > 0 else float('inf'))
+            for etapa, segundos in tiempos.items()
+        }
+        n_tokens = contar_tokens(self._df['tokens'])
+        for etapa, segundos in tiempos.items():
+            self._instrumentacion.agregar(etapa, segundos, total, n_tokens, padre="Paso 1-5 Motor por lotes")
+        self._progreso.mensaje("Rendimiento por etapa (canciones/s):")
+        for etapa, segundos in tiempos.items():
+            self._progreso.mensaje(f"  {etapa}: {self._rendimiento[etapa]:.1f} canciones/s "
+                                   f"({segundos:.2f} s)")
+
+    def obtener_rendimiento(self):
+        """Retorna el diccionario etapa -> canciones/s de la última ejecución por lotes."""
+        return dict(self._rendimiento)
+
+    def obtener_metricas(self):
+        """Resumen de la instrumentación por etapa de la última ejecución."""
+        return self._instrumentacion.resumen()
+
+    def _medir(self, etapa, paso, columna):
+        """Ejecuta un paso midiendo tiempo, CPU y memoria; los tokens se cuentan en `columna`."""
+        self._instrumentacion.medir(etapa, paso, len(self._df), lambda: contar_tokens(self._df[columna]))
+
+    def _version_motor(self, modo):
+        """Identifica motor, modelo, perfil y modo; forma parte de la huella incremental."""
+        meta = self._nlp.meta
+        return (f"spacy|{meta.get('name')}-{meta.get('version')}|{self._perfil}|{modo}"
+                f"|max{self._max_caracteres_letra}|v{VERSION_SALIDA}")
+
+    def _ejecutar_pasos(self, df, modo):
+        aptas, atipicas = letras_atipicas.separar(df, self._max_caracteres_letra)
+        self._registrar_omitidas(atipicas)
+        self._df = aptas
+        if modo == "lotes":
+            self._medir("Paso 1-5 Motor por lotes", self._paso_lotes, 'tokens')
+        elif modo == "secuencial":
+            self._medir("Paso 1 Tokenización", self._paso_tokenizacion, 'tokens')
+            self._medir("Paso 2 Etiquetado POS", self._paso_pos_tagging, 'Etiquetado_POS')
+            self._medir("Paso 3 Eliminar Stopwords", self._paso_stopwords, 'StopWords')
+            self._medir("Paso 4 Aplicar Minúsculas", self._paso_minusculas, 'Minusculas')
+            self._medir("Paso 5 Lematización", self._paso_lematizacion, 'Lematizado')
+        else:
+            raise ValueError(f"Modo de ejecución no soportado: {modo}")
+        self._df = letras_atipicas.reincorporar(self._df, atipicas, _COLUMNAS_RESULTADO, df.index)
+        return self._df
+
+    def _registrar_omitidas(self, atipicas):
+        """Anota las letras que superan max_caracteres_letra y avisa en el bus de progreso."""
+        if not len(atipicas):
+            return
+        self._letras_omitidas.extend(letras_atipicas.describir(atipicas))
+        self._progreso.mensaje(f"⚠ {len(atipicas)} letras de más de {self._max_caracteres_letra} caracteres "
+                               f"no se etiquetan (quedan vacías)", nivel="error")
+
+    def obtener_letras_omitidas(self):
+        """Letras no etiquetadas por su longitud en la última ejecución (índice, nombre, caracteres)."""
+        return list(self._letras_omitidas)
+
+    def _ruta_resultados(self):
+        if self._ruta_salida:
+            return self._ruta_salida
+        return f'\\data\\results\\corpus_canciones_spacy.{self._formato}'
 
     def _guardar(self):
-        self._cargar_corpus.guardar_corpus('\\data\\results\\corpus_canciones_spacy.csv',self._df)
+        if self._formato == "parquet":
+            self._cargar_corpus.guardar_corpus_parquet(self._ruta_resultados(), self._df)
+        else:
+            self._cargar_corpus.guardar_corpus(self._ruta_resultados(), self._df)
+
+    def _guardar_metricas(self):
+        """Escribe el resumen de la instrumentación junto al archivo de resultados y lo muestra."""
+        self._instrumentacion.finalizar()
+        ruta = self._cargar_corpus.ruta_completa(self._ruta_resultados().rsplit('.', 1)[0] + '.metricas.json')
+        self._instrumentacion.guardar(ruta)
+        self._progreso.mensaje("Métricas por etapa:")
+        for linea in self._instrumentacion.lineas_resumen():
+            self._progreso.mensaje(linea)
+        self._progreso.mensaje(f"✓ Métricas guardadas en {ruta}", nivel="completado")
+
+    @property
+    def id_ejecucion(self):
+        """ID de la ejecución con puntos de control (None si no están activados)."""
+        return self._control.id_ejecucion if self._control else self._id_ejecucion
+
+    def _crear_puntos_control(self, modo):
+        configuracion = {
+            'modo': modo,
+            'tamano_lote': self._tamano_lote,
+            'ruta_entrada': self._ruta_entrada,
+            'streaming': self._streaming,
+            'incremental': self._incremental,
+            'version': self._version_motor(modo),
+        }
+        self._control = puntos_control("spacy", configuracion, self._id_ejecucion, self._progreso)
+        self._progreso.mensaje(f"Ejecución con puntos de control: {self._control.id_ejecucion}")
+        return self._control
+
+    def _procesar(self, df, modo):
+        """Ejecuta los pasos sobre `df`, por lotes con puntos de control si están activados."""
+        if not self._con_puntos_control:
+            return self._ejecutar_pasos(df, modo)
+        control = self._crear_puntos_control(modo)
+        lotes = (df.iloc[inicio:inicio + self._tamano_lote].copy()
+                 for inicio in range(0, len(df), self._tamano_lote))
+        control.procesar(lotes, lambda lote: self._ejecutar_pasos(lote, modo))
+        self._df = control.cargar_resultados()
+        self._df.index = df.index
+        return self._df
+
+    def _ejecutar_streaming(self, modo):
+        """Procesa el corpus lote a lote y agrega cada lote al archivo de resultados."""
+        ruta_salida = self._ruta_resultados()
+        lotes = self._cargar_corpus.iterar_corpus(self._ruta_entrada, self._tamano_lote)
+        if self._con_puntos_control:
+            # Cada lote se guarda como punto de control y al final se consolidan en la salida
+            control = self._crear_puntos_control(modo)
+            control.procesar(lotes, lambda lote: self._ejecutar_pasos(lote, modo))
+            lotes = control.iterar_resultados()
+        with self._cargar_corpus.abrir_escritor(ruta_salida) as escritor:
+            for numero, lote in enumerate(lotes, 1):
+                if not self._con_puntos_control:
+                    self._progreso.mensaje(f"Lote {numero}: {len(lote)} canciones")
+                    lote = self._ejecutar_pasos(lote, modo)
+                escritor.escribir(lote)
+                self._df = None
+        self._progreso.mensaje(f"✓ {escritor.filas} canciones escritas en {ruta_salida}",
+                               nivel="completado")
+        if self._control:
+            self._control.finalizar()
 
 
 
     # Ejecutar pipeline completo
 
-    def ejecutar(self):
+    def ejecutar(self, modo="lotes"):
+        """
+        Args:
+            modo (str): "lotes" analiza cada letra una sola vez con nlp.pipe;
+                "secuencial" ejecuta los cinco pasos originales uno por uno.
 
-        self._paso_tokenizacion()
-        self._paso_pos_tagging()
-        self._paso_stopwords()
-        self._paso_minusculas()
-        self._paso_lematizacion()
-        self._guardar()
-        return self._cargar_corpus.cargar_corpus('\\data\\results\\corpus_canciones_spacy.csv')
\ No newline at end of file
+        Returns:
+            DataFrame con los resultados, o None en modo streaming (quedan solo en disco).
+        """
+        if modo not in ("lotes", "secuencial"):
+            raise ValueError(f"Modo de ejecución no soportado: {modo}")
+        self._letras_omitidas = []
+        self._instrumentacion = instrumentacion_pasos(
+            "spacy", trazar_memoria=self._trazar_memoria, modo=modo, perfil=self._perfil,
+            version=self._version_motor(modo), incremental=self._incremental, streaming=self._streaming,
+            letras_omitidas=self._letras_omitidas,
+        )
+        try:
+            return self._ejecutar(modo)
+        finally:
+            self._instrumentacion.finalizar()
+
+    def _ejecutar(self, modo):
+        if self._streaming:
+            self._ejecutar_streaming(modo)
+            self._guardar_metricas()
+            return None
+        if self._incremental:
+            almacen = almacen_incremental("spacy", self._version_motor(modo), progreso=self._progreso)
+            self._df = almacen.procesar(self._df, lambda pendientes: self._procesar(pendientes, modo),
+                                        _COLUMNAS_RESULTADO)
+        else:
+            self._df = self._procesar(self._df, modo)
+        self._instrumentacion.medir("Guardar resultados", self._guardar, len(self._df))
+        self._guardar_metricas()
+        if self._control:
+            self._control.finalizar()
+        if self._formato == "parquet":
+            # Las columnas ya están en memoria como listas de tuplas: no hace falta releer
+            return self._df
+        return self._cargar_corpus.cargar_corpus(self._ruta_resultados())
\ No newline at end of file
@@ -0,0 +1,164 @@
+"""
+Clase: puntos_control
+
+Objetivo: Py con los puntos de control de las ejecuciones largas de los pipelines: cada lote
+completado se guarda en data/checkpoints/<id_ejecucion>/ junto con un estado.json, de forma que
+una ejecución interrumpida se pueda reanudar por su ID omitiendo los lotes ya terminados
+
+Cambios:
+
+"""
+import glob
+import json
+import os
+import shutil
+import time
+import uuid
+from datetime import datetime
+
+import pandas as pd
+
+from src.data.carga_corpus import guardar_parquet, cargar_parquet
+from src.utils import path
+from src.utils.eventos_progreso import bus_progreso
+
+
+def ruta_puntos_control():
+    """Directorio base de los puntos de control (data/checkpoints del proyecto)."""
+    return os.path.join(path.obtener_ruta_local() or os.getcwd(), 'data', 'checkpoints')
+
+
+def _ahora():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+def listar_ejecuciones():
+    """Retorna el estado de todas las ejecuciones con puntos de control, la más reciente primero."""
+    ejecuciones = []
+    for ruta_estado in glob.glob(os.path.join(ruta_puntos_control(), '*', 'estado.json')):
+        try:
+            with open(ruta_estado, encoding='utf-8') as archivo:
+                ejecuciones.append(json.load(archivo))
+        except (OSError, ValueError):
+            continue
+    return sorted(ejecuciones, key=lambda estado: estado.get('actualizado', ''), reverse=True)
+
+
+class puntos_control:
+    def __init__(self, motor, configuracion, id_ejecucion=None, progreso=None):
+        """
+        Args:
+            motor (str): "spacy" o "nltk"
+            configuracion (dict): Parámetros que definen los lotes (modo, tamaño, entrada, versión);
+                al reanudar deben coincidir con los de la ejecución original
+            id_ejecucion (str): ID de una ejecución interrumpida o fallida a reanudar; si es None se
+                crea una nueva. Las ejecuciones completadas no se pueden reanudar
+            progreso (bus_progreso): Destino de los mensajes de cada lote (por defecto, consola)
+        """
+        self._progreso = progreso or bus_progreso.consola()
+        if id_ejecucion is None:
+            id_ejecucion = f"{motor}-{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+            self._directorio = os.path.join(ruta_puntos_control(), id_ejecucion)
+            self._estado = {
+                'id_ejecucion': id_ejecucion,
+                'motor': motor,
+                'configuracion': configuracion,
+                'estado': 'en_curso',
+                'creado': _ahora(),
+                'actualizado': _ahora(),
+                'lotes': {},
+                'error': None,
+            }
+            self._escribir_estado()
+        else:
+            self._directorio = os.path.join(ruta_puntos_control(), id_ejecucion)
+            ruta_estado = os.path.join(self._directorio, 'estado.json')
+            if not os.path.exists(ruta_estado):
+                raise FileNotFoundError(f"No existe la ejecución con puntos de control: {id_ejecucion}")
+            with open(ruta_estado, encoding='utf-8') as archivo:
+                self._estado = json.load(archivo)
+            if self._estado['estado'] == 'completado':
+                # finalizar() ya borró sus lotes: no queda nada que reanudar
+                raise ValueError(f"La ejecución {id_ejecucion} ya está completada; lanza una nueva ejecución")
+            if self._estado['motor'] != motor or self._estado['configuracion'] != configuracion:
+                raise ValueError(
+                    f"La ejecución {id_ejecucion} se creó con otra configuración: "
+                    f"{self._estado['motor']} {self._estado['configuracion']}"
+                )
+            self._estado['estado'] = 'en_curso'
+            self._estado['error'] = None
+            self._escribir_estado()
+        self.id_ejecucion = id_ejecucion
+
+    def _escribir_estado(self):
+        """Escribe estado.json de forma atómica (archivo temporal + os.replace)."""
+        os.makedirs(self._directorio, exist_ok=True)
+        self._estado['actualizado'] = _ahora()
+        ruta_estado = os.path.join(self._directorio, 'estado.json')
+        ruta_temporal = ruta_estado + '.tmp'
+        with open(ruta_temporal, 'w', encoding='utf-8') as archivo:
+            json.dump(self._estado, archivo, ensure_ascii=False, indent=2)
+        os.replace(ruta_temporal, ruta_estado)
+
+    def _ruta_lote(self, numero):
+        return os.path.join(self._directorio, f'lote_{numero:05d}.parquet')
+
+    def procesar(self, lotes, funcion):
+        """
+        Aplica `funcion` a cada lote no completado y guarda su resultado como punto de control.
+
+        Args:
+            lotes (iterable): DataFrames en orden; el mismo orden en cada reanudación
+            funcion (callable): Recibe un lote y lo devuelve con las columnas de resultado
+        """
+        fila_inicio = 0
+        try:
+            for numero, lote in enumerate(lotes, 1):
+                fila_fin = fila_inicio + len(lote)
+                if str(numero) in self._estado['lotes']:
+                    self._progreso.mensaje(f"Lote {numero} (filas {fila_inicio}-{fila_fin}) "
+                                           f"ya completado: se omite")
+                else:
+                    self._progreso.mensaje(f"Lote {numero}: filas {fila_inicio}-{fila_fin}")
+                    inicio = time.perf_counter()
+                    resultado = funcion(lote)
+                    guardar_parquet(self._ruta_lote(numero), resultado.reset_index(drop=True))
+                    self._estado['lotes'][str(numero)] = {
+                        'fila_inicio': fila_inicio,
+                        'fila_fin': fila_fin,
+                        'segundos': round(time.perf_counter() - inicio, 3),
+                        'completado': _ahora(),
+                    }
+                    self._escribir_estado()
+                fila_inicio = fila_fin
+        except BaseException as error:
+            self._estado['estado'] = 'fallido'
+            self._estado['error'] = repr(error)
+            self._escribir_estado()
+            raise
+
+    def iterar_resultados(self):
+        """Genera los resultados de cada lote en orden, leídos de los puntos de control."""
+        for numero in sorted(int(clave) for clave in self._estado['lotes']):
+            yield cargar_parquet(self._ruta_lote(numero))
+
+    def cargar_resultados(self):
+        """Concatena todos los lotes completados en un único DataFrame."""
+        resultados = list(self.iterar_resultados())
+        if not resultados:
+            return pd.DataFrame()
+        return pd.concat(resultados, ignore_index=True)
+
+    def finalizar(self, conservar_lotes=False):
+        """Marca la ejecución como completada; por defecto borra los lotes y conserva estado.json."""
+        if not conservar_lotes:
+            for numero in self._estado['lotes']:
+                ruta_lote = self._ruta_lote(int(numero))
+                if os.path.exists(ruta_lote):
+                    os.remove(ruta_lote)
+        self._estado['estado'] = 'completado'
+        self._escribir_estado()
+
+    def eliminar(self):
+        """Borra por completo el directorio de la ejecución."""
+        shutil.rmtree(self._directorio, ignore_errors=True)
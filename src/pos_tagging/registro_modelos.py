@@ -0,0 +1,120 @@
+"""
+Clase: registro_modelos
+
+Objetivo: Py con el registro de modelos de spaCy compartido por todo el proceso. Cada par
+(modelo, perfil) se carga una sola vez, en el primer uso y con acceso seguro entre hilos, y
+queda disponible para pipeline_spacy, analisis_emocional y los callbacks del dashboard.
+Permite precalentar los modelos en segundo plano y expone el tiempo de carga y la memoria
+residente que añadió cada uno
+
+Cambios:
+
+"""
+import threading
+import time
+
+from src.pos_tagging.perfiles_spacy import (
+    cargar_modelo_spacy, validar_perfil, MODELO_SPACY, PERFIL_POR_DEFECTO
+)
+from src.utils.eventos_progreso import bus_progreso
+from src.utils.instrumentacion import memoria_residente
+
+_TEXTO_PRECALENTAMIENTO = "I love the way you sing this song tonight."
+
+_modelos = {}
+_estadisticas = {}
+_candados_carga = {}
+_candado = threading.Lock()
+
+
+def obtener_modelo(perfil=PERFIL_POR_DEFECTO, modelo=MODELO_SPACY, progreso=None):
+    """
+    Modelo de spaCy del perfil, cargado una sola vez por proceso
+
+    Args:
+        perfil (str): "tokenizador", "etiquetado" o "completo"
+        modelo (str): Nombre del paquete del modelo de spaCy
+        progreso (bus_progreso): Destino de los mensajes de la carga (por defecto, consola)
+
+    Returns:
+        spacy.Language: Instancia compartida; no se debe modificar su pipeline
+    """
+    validar_perfil(perfil)
+    clave = (modelo, perfil)
+    nlp = _modelos.get(clave)
+    if nlp is not None:
+        return nlp
+
+    # Un candado por clave: cargar un perfil no bloquea a quien usa otro ya cargado
+    with _candado:
+        candado_carga = _candados_carga.setdefault(clave, threading.Lock())
+    with candado_carga:
+        nlp = _modelos.get(clave)
+        if nlp is None:
+            memoria_antes = memoria_residente()
+            inicio = time.perf_counter()
+            nlp = cargar_modelo_spacy(perfil, modelo, progreso)
+            segundos = time.perf_counter() - inicio
+            memoria_despues = memoria_residente()
+            with _candado:
+                _estadisticas[clave] = {
+                    'modelo': modelo,
+                    'perfil': perfil,
+                    'componentes': list(nlp.pipe_names),
+                    'segundos_carga': segundos,
+                    # Aproximado si otro hilo reserva memoria durante la carga
+                    'memoria_mb': None if memoria_antes is None or memoria_despues is None
+                    else (memoria_despues - memoria_antes) / 2 ** 20,
+                    'precalentado': False,
+                }
+                _modelos[clave] = nlp
+    return nlp
+
+
+def _precalentar_perfiles(perfiles, modelo, progreso):
+    for perfil in perfiles:
+        try:
+            nlp = obtener_modelo(perfil, modelo, progreso)
+            # La primera llamada inicializa tablas perezosas (lemas, vectores del tok2vec)
+            nlp(_TEXTO_PRECALENTAMIENTO)
+            with _candado:
+                _estadisticas[(modelo, perfil)]['precalentado'] = True
+        except Exception as excepcion:
+            progreso.mensaje(f"⚠ No se pudo precalentar el perfil {perfil} de {modelo}: {excepcion}",
+                             nivel="error")
+
+
+def precalentar(perfiles=(PERFIL_POR_DEFECTO,), modelo=MODELO_SPACY, en_segundo_plano=True, progreso=None):
+    """
+    Carga y ejecuta una vez cada perfil para que el primer uso real no pague la carga
+
+    Args:
+        perfiles (tuple): Perfiles a cargar
+        modelo (str): Nombre del paquete del modelo de spaCy
+        en_segundo_plano (bool): Carga en un hilo daemon y retorna de inmediato
+        progreso (bus_progreso): Destino de los avisos de error (por defecto, consola)
+
+    Returns:
+        threading.Thread: El hilo de precalentamiento, o None si se ejecutó en el hilo actual
+    """
+    for perfil in perfiles:
+        validar_perfil(perfil)
+    progreso = progreso or bus_progreso.consola()
+    if not en_segundo_plano:
+        _precalentar_perfiles(perfiles, modelo, progreso)
+        return None
+    hilo = threading.Thread(target=_precalentar_perfiles, args=(tuple(perfiles), modelo, progreso),
+                            name="precalentar-modelos", daemon=True)
+    hilo.start()
+    return hilo
+
+
+def modelo_cargado(perfil=PERFIL_POR_DEFECTO, modelo=MODELO_SPACY):
+    """True si el perfil ya está en memoria (no dispara la carga)."""
+    return (modelo, perfil) in _modelos
+
+
+def estadisticas_modelos():
+    """Tiempo de carga, memoria residente añadida y componentes de cada modelo cargado."""
+    with _candado:
+        return [dict(estadistica) for estadistica in _estadisticas.values()]
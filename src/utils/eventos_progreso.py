@@ -0,0 +1,229 @@
+"""
+Clase: eventos_progreso
+
+Objetivo: Py con el bus de eventos de progreso de los pipelines. Cada etapa publica eventos
+tipados (etapa, hechos, total, tasa, ETA) y mensajes con nivel a los suscriptores, de forma
+segura entre hilos; el dashboard y la consola (CLI) los consumen directamente, sin redirigir
+sys.stdout ni interpretar el texto de tqdm. Dentro del bucle de etiquetado, contar un avance
+es una suma y una lectura del reloj: los eventos se publican como mucho cada `intervalo` s.
+El bus también transporta la cancelación de la ejecución: tras cancelar(), el siguiente avance
+publicado lanza ejecucion_cancelada dentro del hilo del pipeline
+
+Cambios:
+
+"""
+import queue
+import threading
+import time
+from collections import namedtuple
+
+# tipo: "inicio", "avance" o "fin" para las etapas; "mensaje" para los textos
+# tasa en elementos/s y eta en segundos (None mientras no se pueden estimar)
+evento_progreso = namedtuple(
+    'evento_progreso',
+    ['tipo', 'etapa', 'hechos', 'total', 'tasa', 'eta', 'mensaje', 'nivel', 'marca_tiempo'],
+)
+
+NIVELES = ("info", "completado", "finalizado", "error")
+
+
+class ejecucion_cancelada(Exception):
+    """La ejecución se detuvo porque alguien llamó a bus_progreso.cancelar()."""
+
+
+class barra_progreso:
+    """Contador de una etapa; publica inicio, avances (limitados por tiempo) y fin."""
+
+    __slots__ = ('_bus', 'etapa', 'total', 'hechos', 'ultimo_avance', 'ultimo_incremento', '_inicio',
+                 '_intervalo', '_siguiente', '_cerrada')
+
+    def __init__(self, bus, etapa, total, intervalo):
+        self._bus = bus
+        self.etapa = etapa
+        self.total = total
+        self.hechos = 0
+        self._intervalo = intervalo
+        self._inicio = time.perf_counter()
+        self._siguiente = self._inicio + intervalo
+        self._cerrada = False
+        # Momento y tamaño del último avance, para detectar etapas detenidas
+        self.ultimo_avance = self._inicio
+        self.ultimo_incremento = 1
+        bus._abrir(self)
+        self._publicar("inicio", self._inicio)
+
+    def update(self, n=1):
+        """Suma `n` elementos hechos (mismo nombre que tqdm.update)."""
+        self.hechos += n
+        ahora = time.perf_counter()
+        self.ultimo_avance = ahora
+        self.ultimo_incremento = n
+        if ahora >= self._siguiente:
+            self._siguiente = ahora + self._intervalo
+            self._bus.verificar()
+            self._publicar("avance", ahora)
+
+    def close(self):
+        if not self._cerrada:
+            self._cerrada = True
+            self._bus._cerrar(self)
+            self._publicar("fin", time.perf_counter())
+
+    def _publicar(self, tipo, ahora):
+        transcurrido = ahora - self._inicio
+        tasa = self.hechos / transcurrido if transcurrido > 0 and self.hechos else None
+        eta = None
+        if tasa and self.total is not None:
+            eta = max(self.total - self.hechos, 0) / tasa
+        self._bus.publicar(evento_progreso(tipo, self.etapa, self.hechos, self.total, tasa, eta,
+                                           None, None, time.time()))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.close()
+
+
+class bus_progreso:
+    """Distribuye los eventos de progreso a los suscriptores registrados."""
+
+    def __init__(self, intervalo=0.2):
+        """
+        Args:
+            intervalo (float): Segundos mínimos entre dos eventos de avance de una misma etapa
+        """
+        self._intervalo = intervalo
+        self._suscriptores = []
+        self._candado = threading.Lock()
+        self._abiertas = []
+        self._motivo_cancelacion = None
+
+    @classmethod
+    def consola(cls, intervalo=0.2):
+        """Bus con el renderizador de consola suscrito (comportamiento por defecto de la CLI)."""
+        bus = cls(intervalo)
+        bus.suscribir(consola_progreso())
+        return bus
+
+    def suscribir(self, funcion):
+        """Registra `funcion(evento)`; se llama desde el hilo que publica."""
+        with self._candado:
+            self._suscriptores = self._suscriptores + [funcion]
+        return funcion
+
+    def desuscribir(self, funcion):
+        with self._candado:
+            self._suscriptores = [suscriptor for suscriptor in self._suscriptores
+                                  if suscriptor is not funcion]
+
+    def publicar(self, evento):
+        for suscriptor in self._suscriptores:
+            suscriptor(evento)
+
+    def etapa(self, nombre, total=None):
+        """Abre una etapa; usar como contexto o cerrar con close()."""
+        self.verificar()
+        return barra_progreso(self, nombre, total, self._intervalo)
+
+    def _abrir(self, barra):
+        with self._candado:
+            self._abiertas = self._abiertas + [barra]
+
+    def _cerrar(self, barra):
+        with self._candado:
+            self._abiertas = [abierta for abierta in self._abiertas if abierta is not barra]
+
+    def etapas_abiertas(self):
+        """Etapas en curso (barra_progreso), en el orden en que empezaron."""
+        return list(self._abiertas)
+
+    def cancelar(self, motivo="cancelado"):
+        """Pide detener la ejecución; surte efecto en el siguiente avance o etapa publicados."""
+        if self._motivo_cancelacion is None:
+            self._motivo_cancelacion = motivo
+
+    @property
+    def motivo_cancelacion(self):
+        """Motivo pasado a cancelar(), o None si la ejecución no se canceló."""
+        return self._motivo_cancelacion
+
+    def verificar(self):
+        """Lanza ejecucion_cancelada si se pidió cancelar la ejecución."""
+        if self._motivo_cancelacion is not None:
+            raise ejecucion_cancelada(self._motivo_cancelacion)
+
+    def mensaje(self, texto, nivel="info"):
+        """Publica un mensaje de texto con su nivel (info, completado, finalizado o error)."""
+        self.publicar(evento_progreso("mensaje", None, None, None, None, None, texto, nivel,
+                                      time.time()))
+
+    def aplicar(self, etapa, serie, funcion):
+        """Equivalente a progress_apply: aplica `funcion` a cada valor contando el avance."""
+        with self.etapa(etapa, len(serie)) as barra:
+            def contar(valor):
+                resultado = funcion(valor)
+                barra.update()
+                return resultado
+            return serie.apply(contar)
+
+    def recorrer(self, etapa, iterable, total=None):
+        """Generador que recorre `iterable` contando el avance de la etapa."""
+        if total is None and hasattr(iterable, '__len__'):
+            total = len(iterable)
+        with self.etapa(etapa, total) as barra:
+            for elemento in iterable:
+                yield elemento
+                barra.update()
+
+
+class cola_progreso:
+    """Suscriptor que deja los eventos en una cola segura entre hilos para otro consumidor."""
+
+    def __init__(self, capacidad=0):
+        self._cola = queue.Queue(capacidad)
+
+    def __call__(self, evento):
+        try:
+            self._cola.put_nowait(evento)
+        except queue.Full:
+            pass
+
+    def vaciar(self):
+        """Retorna (sin bloquear) los eventos pendientes en orden de llegada."""
+        eventos = []
+        while True:
+            try:
+                eventos.append(self._cola.get_nowait())
+            except queue.Empty:
+                return eventos
+
+
+class consola_progreso:
+    """Suscriptor que muestra las etapas como barras de tqdm y los mensajes con print."""
+
+    def __init__(self):
+        self._barras = {}
+
+    def __call__(self, evento):
+        if evento.tipo == "mensaje":
+            print(evento.mensaje)
+            return
+        from tqdm import tqdm
+
+        barra = self._barras.get(evento.etapa)
+        if evento.tipo == "inicio" or barra is None:
+            barra = self._barras[evento.etapa] = tqdm(total=evento.total, desc=evento.etapa)
+        barra.update(evento.hechos - barra.n)
+        if evento.tipo == "fin":
+            barra.close()
+            del self._barras[evento.etapa]
+
+
+def formatear_duracion(segundos):
+    """mm:ss (o h:mm:ss) para mostrar ETA y tiempos; '?' si no se conoce."""
+    if segundos is None:
+        return "?"
+    minutos, segundos = divmod(int(segundos), 60)
+    horas, minutos = divmod(minutos, 60)
+    return f"{horas}:{minutos:02d}:{segundos:02d}" if horas else f"{minutos:02d}:{segundos:02d}"
@@ -0,0 +1,213 @@
+"""
+Clase: gestor_trabajos
+
+Objetivo: Py con el gestor de trabajos en segundo plano (ejecuciones del pipeline lanzadas desde
+el dashboard). Cada trabajo tiene un ID, la sesión que lo lanzó, su propio bus_progreso y su
+resultado; espera en cola mientras todos los trabajadores están ocupados, se puede cancelar y
+se detiene si una canción tarda más que `tiempo_max_cancion`. La detención es cooperativa (el
+pipeline la atiende en su siguiente avance): mientras tanto el trabajo queda "deteniendo" y
+solo pasa a cancelado o tiempo_agotado cuando su función termina y libera al trabajador. Los
+trabajos terminados quedan en un historial acotado con su duración y rendimiento (canciones/s)
+
+Cambios:
+
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from src.utils.eventos_progreso import bus_progreso, ejecucion_cancelada
+
+# en_cola -> ejecutando [-> deteniendo] -> completado | cancelado | tiempo_agotado | error
+ESTADOS_ACTIVOS = ("en_cola", "ejecutando", "deteniendo")
+
+
+class trabajo:
+    """Una ejecución en segundo plano: parámetros, progreso, estado y resultado."""
+
+    def __init__(self, funcion, descripcion, sesion=None, parametros=None, suscriptores=()):
+        self.id_trabajo = f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+        self.descripcion = descripcion
+        self.sesion = sesion
+        self.parametros = dict(parametros or {})
+        self.estado = "en_cola"
+        self.creado = time.time()
+        self.iniciado = None
+        self.terminado = None
+        # La función del trabajo puede informar cuántas canciones procesó
+        self.filas = None
+        # ... y adjuntar el resumen de instrumentación por etapa de la ejecución
+        self.metricas = None
+        self.resultado = None
+        self.error = None
+        self.progreso = bus_progreso()
+        self.suscriptores = tuple(suscriptores)
+        for suscriptor in self.suscriptores:
+            self.progreso.suscribir(suscriptor)
+        self._funcion = funcion
+        self._futuro = None
+
+    @property
+    def activo(self):
+        return self.estado in ESTADOS_ACTIVOS
+
+    def duracion(self):
+        """Segundos en ejecución (hasta ahora si sigue activo), o None si no ha empezado."""
+        if self.iniciado is None:
+            return None
+        return (self.terminado or time.time()) - self.iniciado
+
+    def rendimiento(self):
+        """Canciones/s del trabajo, o None si no informó filas."""
+        duracion = self.duracion()
+        if not self.filas or not duracion:
+            return None
+        return self.filas / duracion
+
+    def resumen(self):
+        """Diccionario con el estado del trabajo para mostrarlo en tablas."""
+        return {
+            'id_trabajo': self.id_trabajo,
+            'descripcion': self.descripcion,
+            'sesion': self.sesion,
+            'parametros': dict(self.parametros),
+            'estado': self.estado,
+            'creado': datetime.fromtimestamp(self.creado).isoformat(timespec='seconds'),
+            'duracion': self.duracion(),
+            'filas': self.filas,
+            'rendimiento': self.rendimiento(),
+            'error': self.error,
+        }
+
+
+class gestor_trabajos:
+    def __init__(self, max_simultaneos=1, max_historial=50, tiempo_max_cancion=None, intervalo_vigilancia=1.0):
+        """
+        Args:
+            max_simultaneos (int): Trabajos que se ejecutan a la vez; el resto espera en cola
+            max_historial (int): Trabajos terminados que se conservan en el historial
+            tiempo_max_cancion (float): Segundos sin avance (por canción del último incremento) tras
+                los que se detiene el trabajo; None desactiva el límite
+            intervalo_vigilancia (float): Segundos entre dos revisiones del límite por canción
+        """
+        if max_simultaneos < 1:
+            raise ValueError("max_simultaneos debe ser al menos 1")
+        self._ejecutor = ThreadPoolExecutor(max_workers=max_simultaneos, thread_name_prefix="trabajo")
+        self._max_historial = max_historial
+        self._tiempo_max_cancion = tiempo_max_cancion
+        self._intervalo_vigilancia = intervalo_vigilancia
+        self._trabajos = OrderedDict()
+        self._candado = threading.Lock()
+        if tiempo_max_cancion:
+            threading.Thread(target=self._vigilar, name="vigilante-trabajos", daemon=True).start()
+
+    def enviar(self, funcion, descripcion, sesion=None, parametros=None, suscriptores=()):
+        """
+        Encola un trabajo
+
+        Args:
+            funcion (callable): Recibe el trabajo y `parametros` como argumentos con nombre; debe
+                publicar su progreso en trabajo.progreso. Su valor de retorno es trabajo.resultado
+            descripcion (str): Nombre corto del trabajo (p. ej. el motor del pipeline)
+            sesion (str): Sesión (usuario) que lanza el trabajo
+            parametros (dict): Argumentos de `funcion`, guardados también en el historial
+            suscriptores (iterable): Funciones suscritas al bus de progreso del trabajo
+
+        Returns:
+            trabajo: El trabajo creado, en estado "en_cola"
+        """
+        nuevo = trabajo(funcion, descripcion, sesion, parametros, suscriptores)
+        with self._candado:
+            self._trabajos[nuevo.id_trabajo] = nuevo
+            self._recortar_historial()
+        nuevo._futuro = self._ejecutor.submit(self._ejecutar, nuevo)
+        return nuevo
+
+    def _ejecutar(self, actual):
+        if actual.progreso.motivo_cancelacion is not None:
+            # Cancelado mientras el trabajador ya lo estaba tomando de la cola
+            actual.estado = actual.progreso.motivo_cancelacion
+            actual.terminado = time.time()
+            return
+        actual.estado = "ejecutando"
+        actual.iniciado = time.time()
+        try:
+            actual.resultado = actual._funcion(actual, **actual.parametros)
+            actual.estado = "completado"
+        except ejecucion_cancelada as cancelacion:
+            actual.estado = str(cancelacion)
+            actual.progreso.mensaje(f"Trabajo {actual.id_trabajo} detenido ({actual.estado})", nivel="error")
+        except Exception as error:
+            actual.estado = "error"
+            actual.error = str(error)
+            actual.progreso.mensaje(f"Error en el trabajo {actual.id_trabajo}: {error}", nivel="error")
+        finally:
+            actual.terminado = time.time()
+
+    def cancelar(self, id_trabajo, motivo="cancelado"):
+        """
+        Cancela un trabajo: si está en cola no llega a ejecutarse; si se está ejecutando pasa a
+        "deteniendo" y se detiene en el siguiente avance publicado en su bus de progreso
+
+        Returns:
+            bool: True si el trabajo seguía activo
+        """
+        actual = self.obtener(id_trabajo)
+        if actual is None or not actual.activo:
+            return False
+        actual.progreso.cancelar(motivo)
+        if actual._futuro is not None and actual._futuro.cancel():
+            actual.estado = motivo
+            actual.terminado = time.time()
+        elif actual.estado == "ejecutando":
+            actual.estado = "deteniendo"
+        return True
+
+    def obtener(self, id_trabajo):
+        """Trabajo con ese ID, o None si no existe o ya salió del historial."""
+        with self._candado:
+            return self._trabajos.get(id_trabajo)
+
+    def trabajos(self, sesion=None):
+        """Trabajos (activos e historial) de `sesion` o de todas, el más reciente primero."""
+        with self._candado:
+            todos = list(self._trabajos.values())
+        return [actual for actual in reversed(todos) if sesion is None or actual.sesion == sesion]
+
+    def ultimo_completado(self, sesion):
+        """Último trabajo completado de la sesión, o None."""
+        for actual in self.trabajos(sesion):
+            if actual.estado == "completado":
+                return actual
+        return None
+
+    def posicion_en_cola(self, id_trabajo):
+        """Trabajos en cola por delante de este (0 si es el siguiente), o None si no está en cola."""
+        en_cola = [actual.id_trabajo for actual in reversed(self.trabajos()) if actual.estado == "en_cola"]
+        return en_cola.index(id_trabajo) if id_trabajo in en_cola else None
+
+    def _recortar_historial(self):
+        terminados = [clave for clave, actual in self._trabajos.items() if not actual.activo]
+        for clave in terminados[:max(len(terminados) - self._max_historial, 0)]:
+            del self._trabajos[clave]
+
+    def _vigilar(self):
+        """Detiene los trabajos cuya etapa en curso lleva demasiado tiempo sin avanzar."""
+        while True:
+            time.sleep(self._intervalo_vigilancia)
+            ahora = time.perf_counter()
+            for actual in self.trabajos():
+                if actual.estado != "ejecutando" or actual.progreso.motivo_cancelacion is not None:
+                    continue
+                for barra in actual.progreso.etapas_abiertas():
+                    limite = self._tiempo_max_cancion * max(barra.ultimo_incremento, 1)
+                    if ahora - barra.ultimo_avance > limite:
+                        # El estado final se asigna en _ejecutar, cuando la función ya terminó
+                        actual.progreso.mensaje(
+                            f"⚠ {barra.etapa}: sin avance en {limite:.0f} s tras {barra.hechos} canciones; "
+                            f"el trabajo se detendrá en el siguiente avance", nivel="error")
+                        self.cancelar(actual.id_trabajo, "tiempo_agotado")
+                        break
@@ -0,0 +1,83 @@
+"""
+Clase: importacion_diferida
+
+Objetivo: Py con la importación bajo demanda de las pilas pesadas (spaCy, NLTK, TextBlob, scipy,
+scikit-learn) para que el dashboard arranque sin cargarlas. disponible() comprueba si un paquete
+está instalado sin importarlo (importlib.util.find_spec), importar() lo carga en el primer uso y
+registra cuánto tardó, y reporte_arranque() resume el coste de importación del arranque
+
+Cambios:
+
+"""
+import importlib
+import importlib.util
+import sys
+import threading
+import time
+
+# Paquetes que no deben cargarse al iniciar el dashboard (solo al ejecutar un pipeline o análisis)
+MODULOS_PESADOS = ("spacy", "nltk", "textblob", "sklearn", "scipy", "tqdm")
+
+_tiempos_importacion = {}
+_candado = threading.Lock()
+
+
+def disponible(*paquetes):
+    """
+    Comprueba sin importarlos que los paquetes están instalados
+
+    Args:
+        *paquetes (str): Nombres de nivel superior ("spacy", "en_core_web_sm"); con un nombre
+            con puntos find_spec importaría los paquetes padre
+
+    Returns:
+        tuple: (True, None) si todos se encuentran, o (False, motivo) con el primero que falta
+    """
+    for paquete in paquetes:
+        try:
+            especificacion = importlib.util.find_spec(paquete)
+        except (ImportError, ValueError) as error:
+            return False, f"{paquete}: {error}"
+        if especificacion is None:
+            return False, f"No module named '{paquete}'"
+    return True, None
+
+
+def importar(modulo):
+    """
+    Importa `modulo` (p. ej. "src.pos_tagging.pipeline_spacy") y, si es la primera vez, guarda
+    cuánto tardó incluidas sus dependencias. El candado de importación de Python garantiza que
+    dos hilos no lo inicialicen a la vez
+    """
+    ya_cargado = modulo in sys.modules
+    inicio = time.perf_counter()
+    resultado = importlib.import_module(modulo)
+    if not ya_cargado:
+        with _candado:
+            _tiempos_importacion.setdefault(modulo, time.perf_counter() - inicio)
+    return resultado
+
+
+def tiempo_importacion(modulo):
+    """Segundos que tardó la primera importación de `modulo` con importar(), o None."""
+    with _candado:
+        return _tiempos_importacion.get(modulo)
+
+
+def modulos_pesados_cargados():
+    """Paquetes de MODULOS_PESADOS que ya están en sys.modules."""
+    return [paquete for paquete in MODULOS_PESADOS if paquete in sys.modules]
+
+
+def reporte_arranque(fases):
+    """
+    Líneas de texto con el coste del arranque
+
+    Args:
+        fases (dict): Nombre de la fase -> segundos (p. ej. importar Dash, cargar las páginas)
+    """
+    lineas = [f"Arranque del dashboard: {sum(fases.values()):.2f} s"]
+    lineas += [f"  {fase}: {segundos:.2f} s" for fase, segundos in fases.items()]
+    cargados = modulos_pesados_cargados()
+    lineas.append("  Pilas de PLN cargadas al iniciar: " + (", ".join(cargados) if cargados else "ninguna"))
+    return lineas
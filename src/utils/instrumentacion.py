@@ -0,0 +1,215 @@
+"""
+Clase: instrumentacion
+
+Objetivo: Py con la instrumentación por etapa de los pipelines: tiempo de reloj, tiempo de CPU,
+canciones/s, tokens/s y memoria (RSS del proceso y, si se activa, tracemalloc) de cada paso. Las
+mediciones de una misma etapa se acumulan entre lotes y el resumen de la ejecución se guarda en
+JSON junto al archivo de resultados, para comparar etapas y versiones entre ejecuciones
+
+Cambios:
+
+"""
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:
+    # Windows: sin getrusage, el pico de RSS no se reporta
+    resource = None
+
+_MB = 1024 * 1024
+
+
+def memoria_residente():
+    """Memoria residente del proceso en bytes, o None si no se puede medir."""
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as archivo:
+            return int(archivo.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def pico_memoria_residente():
+    """Pico de memoria residente del proceso en bytes desde su inicio, o None si no se puede medir."""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KiB y macOS bytes
+    return pico if sys.platform == 'darwin' else pico * 1024
+
+
+def contar_tokens(valores):
+    """Tokens de una columna de resultados: listas de tokens o tuplas, o de oraciones (NLTK)."""
+    total = 0
+    for valor in valores:
+        if valor is None or not len(valor):
+            continue
+        if isinstance(valor[0], list):
+            total += sum(len(oracion) for oracion in valor)
+        else:
+            total += len(valor)
+    return total
+
+
+def _en_mb(valor):
+    return None if valor is None else round(valor / _MB, 2)
+
+
+def _por_segundo(cantidad, segundos):
+    if not cantidad or not segundos:
+        return None
+    return round(cantidad / segundos, 1)
+
+
+class instrumentacion_pasos:
+    def __init__(self, motor, trazar_memoria=False, **metadatos):
+        """
+        Args:
+            motor (str): "spacy" o "nltk"
+            trazar_memoria (bool): Activa tracemalloc para medir la memoria de Python que retiene
+                cada etapa (sus columnas intermedias) y su pico; ralentiza la ejecución
+            **metadatos: Datos de la ejecución que se copian al resumen (modo, versión, ...)
+        """
+        self._motor = motor
+        self._metadatos = metadatos
+        self._etapas = {}
+        self._inicio_fecha = datetime.now().isoformat(timespec='seconds')
+        self._inicio = time.perf_counter()
+        self._fin = None
+        self._detener_trazado = False
+        self._trazar_memoria = trazar_memoria
+        if trazar_memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._detener_trazado = True
+
+    def _etapa(self, etapa, padre=None):
+        if etapa not in self._etapas:
+            self._etapas[etapa] = {
+                'etapa': etapa, 'padre': padre, 'llamadas': 0, 'segundos': 0.0, 'cpu_segundos': None,
+                'canciones': 0, 'tokens': None, 'rss_delta': None, 'rss_pico': None,
+                'memoria_retenida': None, 'memoria_pico': None,
+            }
+        return self._etapas[etapa]
+
+    def medir(self, etapa, paso, canciones, contar=None):
+        """
+        Ejecuta `paso()` midiendo tiempo de reloj y de CPU, RSS y (si está activo) tracemalloc.
+        El tiempo de CPU es el de todo el proceso: incluye otros hilos, no los procesos hijos
+
+        Args:
+            etapa (str): Nombre de la etapa (Paso 1 ... Paso 5, o el motor completo)
+            paso (callable): Sin argumentos
+            canciones (int): Canciones que procesa la etapa
+            contar (callable): Sin argumentos; tras el paso retorna los tokens procesados
+                (no cuenta en el tiempo de la etapa)
+
+        Returns:
+            El valor de retorno de `paso()`
+        """
+        rss_antes = memoria_residente()
+        trazando = tracemalloc.is_tracing()
+        if trazando:
+            tracemalloc.reset_peak()
+            traza_antes, _ = tracemalloc.get_traced_memory()
+        cpu_antes = time.process_time()
+        inicio = time.perf_counter()
+
+        resultado = paso()
+
+        segundos = time.perf_counter() - inicio
+        cpu_segundos = time.process_time() - cpu_antes
+        rss_despues = memoria_residente()
+        medicion = self._etapa(etapa)
+        medicion['llamadas'] += 1
+        medicion['segundos'] += segundos
+        medicion['cpu_segundos'] = (medicion['cpu_segundos'] or 0.0) + cpu_segundos
+        medicion['canciones'] += canciones
+        if rss_antes is not None and rss_despues is not None:
+            medicion['rss_delta'] = (medicion['rss_delta'] or 0) + rss_despues - rss_antes
+        pico_rss = pico_memoria_residente()
+        if pico_rss is not None:
+            medicion['rss_pico'] = max(medicion['rss_pico'] or 0, pico_rss)
+        if trazando:
+            traza_despues, traza_pico = tracemalloc.get_traced_memory()
+            medicion['memoria_retenida'] = (medicion['memoria_retenida'] or 0) + traza_despues - traza_antes
+            medicion['memoria_pico'] = max(medicion['memoria_pico'] or 0, traza_pico - traza_antes)
+        if contar is not None:
+            medicion['tokens'] = (medicion['tokens'] or 0) + contar()
+        return resultado
+
+    def agregar(self, etapa, segundos, canciones, tokens=None, padre=None):
+        """Suma el tiempo de una subetapa medida dentro de otra (p. ej. cada paso del motor por lotes)."""
+        medicion = self._etapa(etapa, padre)
+        medicion['llamadas'] += 1
+        medicion['segundos'] += segundos
+        medicion['canciones'] += canciones
+        if tokens is not None:
+            medicion['tokens'] = (medicion['tokens'] or 0) + tokens
+
+    def finalizar(self):
+        """Cierra la medición total y detiene tracemalloc si lo inició esta instancia."""
+        if self._fin is None:
+            self._fin = time.perf_counter()
+        if self._detener_trazado:
+            tracemalloc.stop()
+            self._detener_trazado = False
+
+    def resumen(self):
+        """Diccionario serializable con la ejecución y una entrada por etapa, en orden de ejecución."""
+        etapas = []
+        for medicion in self._etapas.values():
+            etapas.append({
+                'etapa': medicion['etapa'],
+                'padre': medicion['padre'],
+                'llamadas': medicion['llamadas'],
+                'segundos': round(medicion['segundos'], 3),
+                'cpu_segundos': None if medicion['cpu_segundos'] is None else round(medicion['cpu_segundos'], 3),
+                'canciones': medicion['canciones'],
+                'tokens': medicion['tokens'],
+                'canciones_s': _por_segundo(medicion['canciones'], medicion['segundos']),
+                'tokens_s': _por_segundo(medicion['tokens'], medicion['segundos']),
+                'rss_delta_mb': _en_mb(medicion['rss_delta']),
+                'rss_pico_mb': _en_mb(medicion['rss_pico']),
+                'memoria_retenida_mb': _en_mb(medicion['memoria_retenida']),
+                'memoria_pico_mb': _en_mb(medicion['memoria_pico']),
+            })
+        return {
+            'motor': self._motor,
+            **self._metadatos,
+            'inicio': self._inicio_fecha,
+            'segundos_total': round((self._fin or time.perf_counter()) - self._inicio, 3),
+            'trazar_memoria': self._trazar_memoria,
+            'etapas': etapas,
+        }
+
+    def lineas_resumen(self):
+        """Resumen en texto, una línea por etapa, para mostrarlo en consola."""
+        lineas = []
+        for etapa in self.resumen()['etapas']:
+            sangria = "    " if etapa['padre'] else "  "
+            lineas.append(
+                f"{sangria}{etapa['etapa']}: {etapa['segundos']:.2f} s"
+                f" | {etapa['canciones_s'] or 0:.1f} canciones/s"
+                + (f" | {etapa['tokens_s']:.0f} tokens/s" if etapa['tokens_s'] else "")
+                + (f" | RSS {etapa['rss_delta_mb']:+.1f} MB" if etapa['rss_delta_mb'] is not None else "")
+            )
+        return lineas
+
+    def guardar(self, ruta_completa):
+        """Escribe el resumen en JSON (archivo temporal + os.replace)."""
+        os.makedirs(os.path.dirname(ruta_completa) or '.', exist_ok=True)
+        ruta_temporal = ruta_completa + '.tmp'
+        with open(ruta_temporal, 'w', encoding='utf-8') as archivo:
+            json.dump(self.resumen(), archivo, ensure_ascii=False, indent=2)
+        os.replace(ruta_temporal, ruta_completa)
@@ -0,0 +1,82 @@
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from src.pos_tagging.almacen_incremental import almacen_incremental
+
+COLUMNAS = ['tokens', 'Lematizado']
+
+
+def _almacen(tmp_path, version='v1'):
+    almacen = almacen_incremental("spacy", version)
+    almacen._cargar_corpus._directorio_proyecto = str(tmp_path)
+    return almacen
+
+
+def _etiquetador(procesadas):
+    def etiquetar(pendientes):
+        procesadas.extend(pendientes['letra_cancion'])
+        pendientes = pendientes.copy()
+        pendientes['tokens'] = pendientes['letra_cancion'].str.split()
+        pendientes['Lematizado'] = [[(palabra, 'NOUN') for palabra in letra.split()]
+                                    for letra in pendientes['letra_cancion']]
+        return pendientes
+    return etiquetar
+
+
+def test_reutiliza_las_canciones_sin_cambios(tmp_path):
+    corpus = pd.DataFrame({'letra_cancion': ['love me', 'night sky', 'rain']}, index=[5, 6, 7])
+    procesadas = []
+    _almacen(tmp_path).procesar(corpus, _etiquetador(procesadas), COLUMNAS)
+    assert procesadas == ['love me', 'night sky', 'rain']
+
+    # Una letra modificada y otra nueva; el resto se lee del almacén
+    modificado = pd.DataFrame({'letra_cancion': ['love me', 'night skies', 'rain', 'sun']},
+                              index=[5, 6, 7, 8])
+    procesadas.clear()
+    almacen = _almacen(tmp_path)
+    resultado = almacen.procesar(modificado, _etiquetador(procesadas), COLUMNAS)
+    assert procesadas == ['night skies', 'sun']
+    assert (almacen.reutilizadas, almacen.procesadas) == (2, 2)
+    assert list(resultado.index) == [5, 6, 7, 8]
+    assert resultado['Lematizado'].tolist() == [
+        [('love', 'NOUN'), ('me', 'NOUN')], [('night', 'NOUN'), ('skies', 'NOUN')],
+        [('rain', 'NOUN')], [('sun', 'NOUN')],
+    ]
+
+
+def test_otra_version_no_reutiliza(tmp_path):
+    corpus = pd.DataFrame({'letra_cancion': ['love me']})
+    _almacen(tmp_path).procesar(corpus, _etiquetador([]), COLUMNAS)
+    procesadas = []
+    almacen = _almacen(tmp_path, 'v2')
+    almacen.procesar(corpus, _etiquetador(procesadas), COLUMNAS)
+    assert procesadas == ['love me'] and almacen.reutilizadas == 0
+
+
+def test_hilos_concurrentes_no_pierden_canciones(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    letras = [f'song {numero}' for numero in range(8)]
+    with ThreadPoolExecutor(max_workers=4) as ejecutor:
+        list(ejecutor.map(lambda letra: _almacen(tmp_path).procesar(
+            pd.DataFrame({'letra_cancion': [letra]}), _etiquetador([]), COLUMNAS), letras))
+
+    procesadas = []
+    almacen = _almacen(tmp_path)
+    almacen.procesar(pd.DataFrame({'letra_cancion': letras}), _etiquetador(procesadas), COLUMNAS)
+    assert procesadas == [] and almacen.reutilizadas == len(letras)
+    ruta = almacen._cargar_corpus.ruta_completa(almacen._ruta)
+    assert os.path.exists(ruta) and not os.path.exists(ruta + '.tmp')
+
+
+def test_filas_descartadas_no_se_guardan(tmp_path):
+    corpus = pd.DataFrame({'letra_cancion': ['love me', 'rain']})
+    _almacen(tmp_path).procesar(corpus, _etiquetador([]), COLUMNAS,
+                                descartar=lambda procesadas: (procesadas['letra_cancion'] == 'rain').to_numpy())
+    procesadas = []
+    _almacen(tmp_path).procesar(corpus, _etiquetador(procesadas), COLUMNAS)
+    assert procesadas == ['rain']
@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("spacy")
+pytest.importorskip("textblob")
+
+import spacy
+
+from src.analysis import matriz_tags
+from src.analysis.analisis_emocional import analisis_emocional
+from src.analysis.puntuacion_sentimiento import puntuacion_sentimiento
+
+_COLUMNAS = ["ratio_verbos_accion_estado", "pct_palabras_positivas", "pct_palabras_negativas"]
+
+# Columnas como las deja el motor por lotes de pipeline_spacy
+CORPUS = pd.DataFrame({
+    "letra_cancion": ["She is never alone, I dance", "I'd love you"],
+    "Genero": ["pop", "pop"],
+    "Etiquetado_POS": [
+        [("She", "PRON"), ("is", "AUX"), ("never", "ADV"), ("alone", "ADJ"), (",", "PUNCT"),
+         ("I", "PRON"), ("dance", "VERB")],
+        [("I", "PRON"), ("'d", "AUX"), ("love", "VERB"), ("you", "PRON")],
+    ],
+    "Lematizado": [[(",", "PUNCT"), ("dance", "VERB")], [("love", "VERB")]],
+})
+
+
+@pytest.fixture(autouse=True)
+def cache_vacia():
+    matriz_tags.limpiar_cache()
+    yield
+    matriz_tags.limpiar_cache()
+
+
+def _analisis(df, modo):
+    return analisis_emocional(df, modo=modo, puntuador=puntuacion_sentimiento(n_procesos=1, persistente=False))
+
+
+def test_lemas_cuenta_las_stopwords():
+    df = _analisis(CORPUS, "lemas")._df
+    # "is" es verbo de estado y "never"/"alone" palabras negativas, aunque sean stopwords
+    assert df["ratio_verbos_accion_estado"].tolist() == [1.0, 1.0]
+    assert df["pct_palabras_negativas"].tolist() == [100.0, 0.0]
+    assert df["pct_palabras_positivas"].tolist() == [0.0, 100.0]
+
+
+def test_auto_analiza_con_spacy_solo_lo_que_los_lemas_no_resuelven(monkeypatch):
+    analizadas = []
+
+    def contar_con_spacy(self, textos):
+        analizadas.extend(textos)
+        return pd.DataFrame({"accion": [0] * len(textos), "estado": [2] * len(textos),
+                             "positivas": [1] * len(textos), "negativas": [0] * len(textos)})
+
+    monkeypatch.setattr(analisis_emocional, "_contar_con_spacy", contar_con_spacy)
+    desalineado = CORPUS.copy()
+    desalineado["Lematizado"] = [[("dance", "VERB")], [("love", "VERB")]]
+
+    df = _analisis(desalineado, "auto")._df
+    assert analizadas == ["She is never alone, I dance", "I'd love you"]
+    assert df["ratio_verbos_accion_estado"].tolist() == [0.0, 0.0]
+
+    with pytest.raises(ValueError, match="no se corresponden"):
+        _analisis(desalineado, "lemas")
+
+
+def test_lemas_necesita_etiquetado_pos():
+    with pytest.raises(ValueError, match="Etiquetado_POS"):
+        _analisis(CORPUS.drop(columns="Etiquetado_POS"), "lemas")
+
+
+@pytest.mark.skipif(not spacy.util.is_package("en_core_web_sm"), reason="Requiere en_core_web_sm")
+def test_lemas_igual_a_spacy():
+    from src.pos_tagging.registro_modelos import obtener_modelo
+
+    letras = [
+        "I've been waiting, she seems happy and we're never alone",
+        "They became free together; he has lost everything but hope",
+        "It's a beautiful day, don't cry, I'd rather be with you",
+        "",
+        "Broken dreams, empty streets. Nobody knows how I feel",
+    ]
+    nlp = obtener_modelo("etiquetado")
+    etiquetado, lematizado = [], []
+    for doc in nlp.pipe(letras):
+        etiquetado.append([(tok.text, tok.pos_) for tok in doc])
+        lematizado.append([(tok.lemma_.lower(), tok.pos_) for tok in doc
+                           if tok.lower_ not in nlp.Defaults.stop_words])
+    corpus = pd.DataFrame({"letra_cancion": letras, "Genero": "pop",
+                           "Etiquetado_POS": etiquetado, "Lematizado": lematizado})
+
+    con_spacy = _analisis(corpus, "spacy")._df
+    for modo in ("auto", "lemas"):
+        sin_d = corpus.drop(index=2) if modo == "lemas" else corpus
+        desde_lemas = _analisis(sin_d, modo)._df
+        for columna in _COLUMNAS:
+            assert np.array_equal(desde_lemas[columna].to_numpy(),
+                                  con_spacy.loc[sin_d.index, columna].to_numpy()), (modo, columna)
+
+
+def _recursos_nltk(*recursos):
+    nltk = pytest.importorskip("nltk")
+    for recurso in recursos:
+        try:
+            nltk.data.find(recurso)
+        except LookupError:
+            return False
+    return True
+
+
+def _sin_respaldo_spacy(monkeypatch):
+    def contar_con_spacy(self, textos):
+        raise AssertionError("El corpus de NLTK no debería volver a analizarse con spaCy")
+
+    monkeypatch.setattr(analisis_emocional, "_contar_con_spacy", contar_con_spacy)
+
+
+@pytest.mark.skipif(not _recursos_nltk("corpora/stopwords"), reason="Requiere las stopwords de NLTK")
+def test_lemas_desde_columnas_de_nltk(monkeypatch):
+    _sin_respaldo_spacy(monkeypatch)
+    # Frases anidadas y tags Penn Treebank; NLTK solo quita las stopwords en minúsculas ("is")
+    corpus = pd.DataFrame({
+        "letra_cancion": ["She is never alone, I dance"],
+        "Genero": ["pop"],
+        "Etiquetado_POS": [[[("She", "PRP"), ("is", "VBZ"), ("never", "RB"), ("alone", "RB"),
+                             (",", ","), ("I", "PRP"), ("dance", "VBP")]]],
+        "Lematizado": [[[("she", "PRP"), ("never", "RB"), ("alone", "RB"), (",", ","),
+                         ("i", "PRP"), ("dance", "VBP")]]],
+    })
+    df = _analisis(corpus, "auto")._df
+    assert df["ratio_verbos_accion_estado"].tolist() == [1.0]
+    assert df["pct_palabras_negativas"].tolist() == [pytest.approx(200 / 6)]
+
+
+@pytest.mark.skipif(not _recursos_nltk("corpora/stopwords", "corpora/wordnet", "tokenizers/punkt_tab",
+                                       "taggers/averaged_perceptron_tagger_eng"),
+                    reason="Requiere los recursos de NLTK")
+def test_corpus_del_dashboard_nltk_usa_los_lemas(tmp_path, monkeypatch):
+    from src.pos_tagging.pipeline_nltk import pipeline_nltk
+    from src.utils import path
+
+    monkeypatch.setattr(path, "obtener_ruta_local", lambda: str(tmp_path))
+    pd.DataFrame({"nombre_cancion": ["a", "b"], "Genero": ["pop", "rock"],
+                  "letra_cancion": ["She is never alone, I dance", "Broken dreams and empty streets"]}
+                 ).to_csv(tmp_path / "corpus.csv", index=False)
+
+    # Misma configuración que ejecutar_pipeline_nltk en dashboard/pages/inicio.py
+    procesador = pipeline_nltk(n_procesos=1, incremental=True, con_puntos_control=True,
+                               persistir_cache_lemas=False, ruta_entrada="/corpus.csv",
+                               ruta_salida="/corpus_nltk.parquet")
+    corpus = procesador.ejecutar(modo="paralelo")
+    assert {"Etiquetado_POS", "Lematizado"} <= set(corpus.columns)
+
+    _sin_respaldo_spacy(monkeypatch)
+    analisis = _analisis(corpus, "auto")
+    assert analisis._modo == "lemas"
+    assert analisis._df["pct_palabras_negativas"].gt(0).all()
@@ -0,0 +1,38 @@
+import pytest
+
+from src.pos_tagging.cache_lemas import cache_lemas
+
+
+def test_aciertos_y_fallos():
+    lemas = cache_lemas(lambda palabra, pos: palabra.rstrip('s'))
+    assert lemas.lematizar('songs', 'n') == 'song'
+    assert lemas.lematizar('songs', 'n') == 'song'
+    assert (lemas.aciertos, lemas.fallos) == (1, 1)
+
+
+def test_fusionar_lemas_de_un_trabajador(tmp_path):
+    pytest.importorskip("pyarrow")
+    trabajador = cache_lemas(lambda palabra, pos: palabra.rstrip('s'))
+    trabajador.registrar_nuevas()
+    for palabra in ['songs', 'nights', 'songs']:
+        trabajador.lematizar(palabra, 'n')
+    nuevas = trabajador.extraer_nuevas()
+    assert nuevas == [(('songs', 'n'), 'song'), (('nights', 'n'), 'night')]
+    assert trabajador.extraer_nuevas() == []
+
+    principal = cache_lemas(lambda palabra, pos: None)
+    principal.fusionar(trabajador.aciertos, trabajador.fallos, nuevas)
+    estadisticas = principal.estadisticas()
+    assert (estadisticas['aciertos'], estadisticas['fallos'], estadisticas['entradas']) == (1, 2, 2)
+
+    ruta = str(tmp_path / 'cache' / 'lemas.parquet')
+    principal.guardar(ruta)
+    recargada = cache_lemas(lambda palabra, pos: None)
+    assert recargada.cargar(ruta) == 2
+    assert recargada.lematizar('nights', 'n') == 'night'
+
+
+def test_fusionar_respeta_la_capacidad():
+    lemas = cache_lemas(lambda palabra, pos: palabra, capacidad=2)
+    lemas.fusionar(0, 3, [(('a', 'n'), 'a'), (('b', 'n'), 'b'), (('c', 'n'), 'c')])
+    assert lemas.estadisticas()['entradas'] == 2
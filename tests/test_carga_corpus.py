@@ -0,0 +1,67 @@
+import pandas as pd
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from src.data import carga_corpus as modulo
+
+CORPUS = pd.DataFrame({
+    'nombre_cancion': ['uno', 'dos', 'tres'],
+    'Periodo': [1995.0, None, 2012.0],
+    'Etiquetado_POS': [[('Love', 'NOUN'), ("don't", 'AUX')], [], None],
+    'Lematizado': [[('love', 'NOUN')], [], [('night', 'NOUN'), ('shine', 'VERB')]],
+    # Oraciones de NLTK: listas de listas de tuplas
+    'Oraciones': [[[('love', 'NN')], [('me', 'PRP'), ('now', 'RB')]], [], [[]]],
+})
+
+
+def test_ida_y_vuelta_list_struct(tmp_path):
+    ruta = str(tmp_path / 'corpus.parquet')
+    modulo.guardar_parquet(ruta, CORPUS)
+
+    esquema = pq.read_schema(ruta)
+    assert esquema.field('Lematizado').type == pa.list_(pa.struct([('lemma', pa.string()), ('tag', pa.string())]))
+    assert esquema.field('Etiquetado_POS').type.value_type.names == ['token', 'tag']
+    assert pa.types.is_list(esquema.field('Oraciones').type.value_type)
+
+    leido = modulo.cargar_parquet(ruta)
+    assert leido['Lematizado'].tolist() == CORPUS['Lematizado'].tolist()
+    assert leido['Etiquetado_POS'].tolist() == [[('Love', 'NOUN'), ("don't", 'AUX')], [], []]
+    assert leido['Oraciones'].tolist() == CORPUS['Oraciones'].tolist()
+    pd.testing.assert_series_equal(leido['Periodo'], CORPUS['Periodo'])
+
+
+def test_proyeccion_y_lectura_por_lotes(tmp_path, monkeypatch):
+    monkeypatch.setattr(modulo.path, "obtener_ruta_local", lambda: str(tmp_path))
+    cargador = modulo.carga_corpus()
+    with cargador.abrir_escritor('/corpus.parquet') as escritor:
+        escritor.escribir(CORPUS.iloc[:2])
+        escritor.escribir(CORPUS.iloc[2:])
+    assert escritor.filas == 3
+
+    proyectado = cargador.cargar_corpus_parquet('/corpus.parquet', ['Lematizado'])
+    assert list(proyectado.columns) == ['Lematizado']
+    assert proyectado['Lematizado'].tolist() == CORPUS['Lematizado'].tolist()
+
+    lotes = list(cargador.iterar_corpus('/corpus.parquet', 2, ['nombre_cancion', 'Lematizado']))
+    assert [len(lote) for lote in lotes] == [2, 1]
+    assert lotes[1]['Lematizado'].tolist() == [[('night', 'NOUN'), ('shine', 'VERB')]]
+
+
+def test_escritor_completa_tipos_que_el_primer_lote_no_fija(tmp_path):
+    ruta = str(tmp_path / 'corpus.parquet')
+    lotes = [
+        pd.DataFrame({'Genero': [None], 'Periodo': [float('nan')], 'Lematizado': [[]]}),
+        pd.DataFrame({'Genero': ['pop'], 'Periodo': [2001.0], 'Lematizado': [[('x', 'NOUN')]]}),
+        pd.DataFrame({'Genero': [None], 'Periodo': [float('nan')], 'Lematizado': [[]]}),
+    ]
+    with modulo.escritor_corpus(ruta) as escritor:
+        for lote in lotes:
+            escritor.escribir(lote)
+
+    leido = modulo.cargar_parquet(ruta)
+    assert leido['Lematizado'].tolist() == [[], [('x', 'NOUN')], []]
+    assert leido['Genero'].tolist() == [None, 'pop', None]
+    assert leido['Periodo'].tolist()[1] == 2001.0
+    assert not (tmp_path / 'corpus.parquet.tmp').exists()
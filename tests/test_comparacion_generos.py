@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis import matriz_tags
+from src.analysis.comparacion_generos import comparacion_generos
+from src.benchmark.benchmark_comparacion_generos import metricas_fila_a_fila
+from src.benchmark.corpus_sintetico import corpus_sintetico
+
+# Perfil pequeño (sin data/raw), con letras vacías y cortas para cubrir los casos límite
+PERFIL = {
+    'longitudes': [0, 1, 3, 20, 60, 200],
+    'vocabulario': [f'palabra{i}' for i in range(400)],
+    'frecuencias': list(range(400, 0, -1)),
+    'anios': [1985, 2005],
+    'frecuencias_anios': [1, 1],
+    'artistas': ['Drake', 'BTS'],
+    'frecuencias_artistas': [1, 1],
+    'generos': {'Drake': 'hip hop', 'BTS': 'K-pop'},
+}
+
+
+@pytest.fixture(autouse=True)
+def cache_vacia():
+    matriz_tags.limpiar_cache()
+    yield
+    matriz_tags.limpiar_cache()
+
+
+def _comparar(df):
+    referencia = metricas_fila_a_fila(df)
+    vectorizado = comparacion_generos.calcular_metricas(matriz_tags.matriz_tags(df['Lematizado']))
+    for columna in referencia.columns:
+        assert np.array_equal(referencia[columna].to_numpy(np.float64), vectorizado[columna].to_numpy()), columna
+
+
+def test_casos_limite_igual_a_fila_a_fila():
+    # Sin tokens, sin verbos y sin sustantivos
+    _comparar(pd.DataFrame({'Lematizado': [
+        [],
+        [('love', 'NOUN'), ('night', 'NOUN')],
+        [('sing', 'VERB'), ('loud', 'ADV')],
+        [('i', 'PRON'), ('love', 'VERB'), ('you', 'PRON'), ('bright', 'ADJ'), ('night', 'NOUN')],
+        [('oh', 'INTJ')],
+    ]}))
+
+
+def test_corpus_sintetico_igual_a_fila_a_fila():
+    _comparar(corpus_sintetico(PERFIL, semilla=3).generar(500, etiquetado=True))
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis import matriz_tags
+from src.analysis.corpus_compacto import corpus_compacto
+
+CANCIONES = [
+    [('love', 'NOUN'), ('shine', 'VERB'), ('bright', 'ADJ')],
+    [],
+    [('night', 'NOUN'), ('love', 'VERB')],
+]
+
+
+def test_ida_y_vuelta():
+    corpus = corpus_compacto.desde_tuplas(CANCIONES)
+    assert corpus.a_tuplas() == CANCIONES
+    assert corpus.cancion(2) == CANCIONES[2]
+    assert len(corpus) == 3 and corpus.n_tokens == 5
+    assert corpus.ids_token.dtype == np.int32 and corpus.ids_tag.dtype == np.uint8
+    assert corpus.longitudes().tolist() == [3, 0, 2]
+
+
+def test_oraciones_de_nltk_y_repr_de_csv():
+    oraciones = [[[('love', 'NN'), ('me', 'PRP')], [('now', 'RB')]]]
+    assert corpus_compacto.desde_tuplas(oraciones).a_tuplas() == [[('love', 'NN'), ('me', 'PRP'), ('now', 'RB')]]
+    repr_csv = ["[('wishin\\'', 'VERB'), (\"don't\", 'AUX')]"]
+    assert corpus_compacto.desde_tuplas(repr_csv).a_tuplas() == [[("wishin'", 'VERB'), ("don't", 'AUX')]]
+
+
+def test_tablas_compartidas_conservan_los_ids():
+    primero = corpus_compacto.desde_tuplas(CANCIONES)
+    segundo = corpus_compacto.desde_tuplas([[('love', 'NOUN'), ('rain', 'NOUN')]],
+                                           primero.vocabulario, primero.tags)
+    assert segundo.vocabulario is primero.vocabulario
+    assert segundo.ids_token[0] == primero.ids_token[0]
+    assert primero.a_tuplas() == CANCIONES
+
+
+def test_demasiados_tags_no_modifica_la_tabla():
+    tags = ['NOUN']
+    vocabulario = []
+    demasiados = [[(f'palabra{i}', f'TAG{i}') for i in range(300)]]
+    with pytest.raises(ValueError, match="Demasiados"):
+        corpus_compacto.desde_tuplas(demasiados, vocabulario, tags)
+    assert tags == ['NOUN'] and vocabulario == []
+    assert corpus_compacto.desde_tuplas(CANCIONES, vocabulario, tags).a_tuplas() == CANCIONES
+
+
+def test_matriz_desde_corpus_compacto_igual_a_la_directa():
+    matriz_tags.limpiar_cache()
+    serie = pd.Series(CANCIONES, index=[10, 11, 12])
+    directa = matriz_tags.construir_matriz_tags(CANCIONES)
+    conteos = matriz_tags.matriz_tags(serie)
+    assert list(conteos.index) == [10, 11, 12]
+    pd.testing.assert_frame_equal(conteos.reset_index(drop=True), directa)
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis.evolucion_temporal import evolucion_temporal
+
+
+def _categorizar_fila(year):
+    """Versión original por fila, como referencia."""
+    if pd.isna(year): return 'Desconocido'
+    year = int(year)
+    if year < 1990:
+        return 'Pre-90s'
+    elif 1990 <= year < 2000:
+        return '90s'
+    elif 2000 <= year < 2010:
+        return '2000s'
+    elif 2010 <= year < 2020:
+        return '2010s'
+    return '2020s'
+
+
+@pytest.fixture
+def evolucion():
+    return evolucion_temporal(pd.DataFrame({'Periodo': []}))
+
+
+def test_limites_de_periodo(evolucion):
+    anios = [1989.0, 1989.9, 1990.0, 1999.99, 2000.0, 2009.0, 2010.0, 2019.5, 2020.0, 2031.0, np.nan]
+    assert list(evolucion.categorizar_periodo(pd.Series(anios))) == [_categorizar_fila(a) for a in anios]
+    assert list(evolucion.categorizar_periodo(pd.Series(anios[:4]))) == ['Pre-90s', 'Pre-90s', '90s', '90s']
+
+
+def test_anios_no_numericos_son_desconocidos(evolucion):
+    assert list(evolucion.categorizar_periodo(pd.Series(['1995', 'sin fecha', None]))) == \
+        ['90s', 'Desconocido', 'Desconocido']
+
+
+def test_limites_personalizados():
+    evolucion = evolucion_temporal(pd.DataFrame({'Periodo': []}), (2000,), ('Antes', 'Después'))
+    assert list(evolucion.categorizar_periodo(pd.Series([1999.0, 2000.0]))) == ['Antes', 'Después']
+    with pytest.raises(ValueError, match="etiqueta"):
+        evolucion_temporal(pd.DataFrame({'Periodo': []}), (2000,), ('Antes',))
@@ -0,0 +1,56 @@
+import threading
+import time
+
+from src.utils.gestor_trabajos import gestor_trabajos
+
+
+def _esperar(condicion, segundos=5.0):
+    limite = time.time() + segundos
+    while not condicion():
+        if time.time() > limite:
+            raise AssertionError("La condición no se cumplió a tiempo")
+        time.sleep(0.01)
+
+
+def test_tiempo_agotado_solo_cuando_el_trabajo_se_detuvo():
+    gestor = gestor_trabajos(tiempo_max_cancion=0.05, intervalo_vigilancia=0.02)
+    liberar = threading.Event()
+
+    def atascado(trabajo):
+        with trabajo.progreso.etapa("Paso 2 Etiquetado POS", 3) as barra:
+            barra.update()
+            # Una canción que no publica avances durante mucho más que el límite
+            liberar.wait(5)
+            barra.update()
+            barra.update()
+
+    actual = gestor.enviar(atascado, "prueba")
+    _esperar(lambda: actual.estado == "deteniendo")
+    assert actual.activo and actual.terminado is None
+
+    # El bus revisa la cancelación como mucho cada 0.2 s de avance
+    time.sleep(0.25)
+    liberar.set()
+    _esperar(lambda: not actual.activo)
+    assert actual.estado == "tiempo_agotado"
+    assert actual.terminado is not None
+
+
+def test_cancelar_un_trabajo_en_ejecucion():
+    gestor = gestor_trabajos()
+    empezado, liberar = threading.Event(), threading.Event()
+
+    def trabajo_largo(trabajo):
+        with trabajo.progreso.etapa("Paso 1", None) as barra:
+            empezado.set()
+            liberar.wait(5)
+            barra.update()
+
+    actual = gestor.enviar(trabajo_largo, "prueba")
+    empezado.wait(5)
+    assert gestor.cancelar(actual.id_trabajo)
+    assert actual.estado == "deteniendo"
+    time.sleep(0.25)
+    liberar.set()
+    _esperar(lambda: not actual.activo)
+    assert actual.estado == "cancelado"
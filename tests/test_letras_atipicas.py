@@ -0,0 +1,24 @@
+import pandas as pd
+
+from src.pos_tagging import letras_atipicas
+
+CORPUS = pd.DataFrame({'nombre_cancion': ['corta', 'larga', 'nula'],
+                       'letra_cancion': ['love me', 'la ' * 20, None]}, index=[3, 4, 5])
+
+
+def test_separar_y_reincorporar():
+    aptas, atipicas = letras_atipicas.separar(CORPUS, 30)
+    assert list(aptas.index) == [3, 5] and list(atipicas.index) == [4]
+    assert letras_atipicas.describir(atipicas) == [{'indice': 4, 'nombre_cancion': 'larga', 'caracteres': 60}]
+
+    aptas = aptas.assign(tokens=[['love', 'me'], []])
+    resultado = letras_atipicas.reincorporar(aptas, atipicas, ['tokens'], CORPUS.index)
+    assert list(resultado.index) == [3, 4, 5]
+    assert resultado['tokens'].tolist() == [['love', 'me'], [], []]
+
+
+def test_sin_limite_no_separa():
+    aptas, atipicas = letras_atipicas.separar(CORPUS, None)
+    assert aptas is CORPUS and atipicas.empty
+    aptas, _ = letras_atipicas.separar(CORPUS, 1_000)
+    assert aptas is CORPUS
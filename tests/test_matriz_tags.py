@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+
+from src.analysis import matriz_tags
+from src.data import registro_datasets
+
+CANCIONES = [
+    [('love', 'NOUN'), ('shine', 'VERB')],
+    [('night', 'NOUN')],
+    [('sing', 'VERB'), ('loud', 'ADV'), ('bright', 'ADJ')],
+]
+
+
+@pytest.fixture(autouse=True)
+def cache_vacia():
+    matriz_tags.limpiar_cache()
+    yield
+    matriz_tags.limpiar_cache()
+
+
+def test_segunda_llamada_es_un_acierto(monkeypatch):
+    construcciones = []
+    construir = matriz_tags.matriz_desde_corpus_compacto
+    monkeypatch.setattr(matriz_tags, "matriz_desde_corpus_compacto",
+                        lambda corpus: construcciones.append(1) or construir(corpus))
+    serie = pd.Series(CANCIONES, name='Lematizado')
+
+    primera = matriz_tags.matriz_tags(serie)
+    segunda = matriz_tags.matriz_tags(serie)
+
+    pd.testing.assert_frame_equal(primera, segunda)
+    assert len(construcciones) == 1
+    assert matriz_tags.estadisticas_cache()['aciertos'] == 1
+
+
+def test_proyecciones_del_mismo_dataset_comparten_la_matriz():
+    df = pd.DataFrame({'Lematizado': CANCIONES, 'Periodo': [1975.0, 1990.0, 2005.0]})
+    id_dataset = registro_datasets.registrar(df, persistir=False)
+
+    # Cada página pide su propia proyección y la copia
+    matriz_tags.matriz_tags(registro_datasets.obtener(id_dataset, ['Lematizado']).copy()['Lematizado'])
+    conteos = matriz_tags.matriz_tags(registro_datasets.obtener(id_dataset)['Lematizado'])
+    assert matriz_tags.estadisticas_cache()['aciertos'] == 1
+    assert conteos['NOUN'].tolist() == [1, 1, 0]
+
+    # Un filtro de filas es otra clave
+    filtrado = registro_datasets.obtener(id_dataset)
+    filtrado = filtrado[filtrado['Periodo'] >= 1980.0]
+    conteos = matriz_tags.matriz_tags(filtrado['Lematizado'])
+    assert list(conteos.index) == [1, 2]
+    assert conteos['VERB'].tolist() == [0, 1]
+
+
+def test_otra_serie_con_otro_contenido_no_reutiliza():
+    matriz_tags.matriz_tags(pd.Series(CANCIONES))
+    otra = matriz_tags.matriz_tags(pd.Series([[('rain', 'NOUN')]] * 3))
+    assert otra['NOUN'].tolist() == [1, 1, 1]
+    assert matriz_tags.estadisticas_cache()['aciertos'] == 0
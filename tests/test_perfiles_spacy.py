@@ -0,0 +1,21 @@
+import pytest
+
+pytest.importorskip("spacy")
+
+from src.pos_tagging.perfiles_spacy import validar_perfil, validar_perfil_etiquetado
+
+
+def test_perfiles_de_etiquetado_validos():
+    validar_perfil_etiquetado("etiquetado")
+    validar_perfil_etiquetado("completo")
+
+
+def test_tokenizador_no_sirve_para_etiquetar():
+    validar_perfil("tokenizador")
+    with pytest.raises(ValueError, match="tagger"):
+        validar_perfil_etiquetado("tokenizador")
+
+
+def test_perfil_desconocido():
+    with pytest.raises(ValueError, match="no soportado"):
+        validar_perfil_etiquetado("inexistente")
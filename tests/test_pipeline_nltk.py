@@ -0,0 +1,84 @@
+import pytest
+
+pytest.importorskip("nltk")
+
+from src.pos_tagging.pipeline_nltk import pipeline_nltk
+
+
+def test_columnas_salida_vacias():
+    with pytest.raises(ValueError, match="columnas_salida"):
+        pipeline_nltk(columnas_salida=())
+
+
+def test_pool_se_reutiliza_entre_lotes():
+    procesador = pipeline_nltk.__new__(pipeline_nltk)
+    procesador._pool = None
+    procesador._n_procesos = 1
+    procesador._ruta_cache_lemas = None
+
+    cola, ejecutor = procesador._obtener_pool()
+    assert procesador._obtener_pool() == (cola, ejecutor)
+
+    procesador._cerrar_pool()
+    assert procesador._pool is None
+
+
+def test_cada_conjunto_de_columnas_tiene_su_version_y_su_almacen():
+    procesador = pipeline_nltk.__new__(pipeline_nltk)
+    procesador._max_caracteres_letra = 50_000
+    procesador._columnas_salida = ['tokens', 'Etiquetado_POS', 'Lematizado']
+
+    assert procesador._version_motor("fusionado") == procesador._version_motor("paralelo")
+    assert procesador._version_motor("secuencial") != procesador._version_motor("paralelo")
+    assert procesador._nombre_almacen("paralelo") == "etiquetado_nltk_tokens_etiquetado_pos_lematizado"
+    assert procesador._nombre_almacen("secuencial") != procesador._nombre_almacen("paralelo")
+
+
+def test_fragmento_vencido_se_reintenta_por_cancion(monkeypatch):
+    import queue
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    import pandas as pd
+
+    from src.pos_tagging import pipeline_nltk as modulo
+    from src.utils.eventos_progreso import bus_progreso
+
+    liberar = threading.Event()
+
+    def procesar_fragmento(clave, letras, cola_progreso, columnas):
+        if 'cuelga' in letras:
+            liberar.wait(10)
+        for descripcion, _ in modulo._PASOS_NLTK:
+            cola_progreso.put((clave, descripcion, len(letras)))
+        return clave, {'tokens': [letra.split() for letra in letras]}, (0, 0, [])
+
+    # Hilos en lugar de procesos, para que el trabajador use la función de la prueba
+    def obtener_pool():
+        if procesador._pool is None:
+            procesador._pool = (None, queue.Queue(), ThreadPoolExecutor(max_workers=2))
+        return procesador._pool[1], procesador._pool[2]
+
+    def terminar_pool():
+        procesador._pool[2].shutdown(wait=False, cancel_futures=True)
+        procesador._pool = None
+
+    monkeypatch.setattr(modulo, "_procesar_fragmento", procesar_fragmento)
+    procesador = pipeline_nltk.__new__(pipeline_nltk)
+    procesador.__dict__.update(
+        _df=pd.DataFrame({'nombre_cancion': ['w', 'x', 'y', 'z'],
+                          'letra_cancion': ['a b', 'cuelga', 'c', 'd e']}, index=[10, 11, 12, 13]),
+        _pool=None, _n_procesos=2, _tamano_fragmento=2, _columnas_salida=['tokens'],
+        _progreso=bus_progreso(), _tiempo_max_fragmento=0.3, _tiempo_max_cancion=0.3,
+        _letras_omitidas=[], _indices_agotados=set(),
+    )
+    monkeypatch.setattr(procesador, "_obtener_pool", obtener_pool)
+    monkeypatch.setattr(procesador, "_terminar_pool", terminar_pool)
+    try:
+        procesador._paso_paralelo()
+    finally:
+        liberar.set()
+
+    assert procesador._df['tokens'].tolist() == [['a', 'b'], [], ['c'], ['d', 'e']]
+    assert procesador.obtener_letras_omitidas() == [{'indice': 11, 'nombre_cancion': 'x', 'caracteres': 6}]
+    assert procesador._indices_agotados == {11}
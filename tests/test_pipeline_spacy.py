@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+spacy = pytest.importorskip("spacy")
+pytest.importorskip("pyarrow")
+
+pytestmark = pytest.mark.skipif(not spacy.util.is_package("en_core_web_sm"), reason="Requiere en_core_web_sm")
+
+LETRAS = ["The Stars are shining bright, I never felt so alive", "Dancing all night with you"]
+
+
+@pytest.fixture
+def ejecutar(tmp_path, monkeypatch):
+    from src.pos_tagging import pipeline_spacy as modulo
+    from src.utils import path
+
+    monkeypatch.setattr(path, "obtener_ruta_local", lambda: str(tmp_path))
+    pd.DataFrame({'nombre_cancion': ['a', 'b'], 'letra_cancion': LETRAS}).to_csv(tmp_path / 'corpus.csv', index=False)
+
+    def _ejecutar(modo):
+        procesador = modulo.pipeline_spacy(ruta_entrada='/corpus.csv', ruta_salida=f'/salida_{modo}.parquet')
+        return procesador.ejecutar(modo), procesador._nlp
+    return _ejecutar
+
+
+def test_lotes_frente_a_secuencial(ejecutar):
+    lotes, nlp = ejecutar("lotes")
+    secuencial, _ = ejecutar("secuencial")
+    stop_words = nlp.Defaults.stop_words
+
+    # Mismos tokens y mismo etiquetado del texto original en ambos modos
+    assert lotes['tokens'].map(list).tolist() == secuencial['tokens'].map(list).tolist()
+    assert lotes['Etiquetado_POS'].tolist() == secuencial['Etiquetado_POS'].tolist()
+
+    for letra, lematizado_lotes, lematizado_secuencial, etiquetado in zip(
+            LETRAS, lotes['Lematizado'], secuencial['Lematizado'], lotes['Etiquetado_POS']):
+        # Lotes: lema en minúsculas y POS del token en el contexto original
+        doc = nlp(letra)
+        assert lematizado_lotes == [(tok.lemma_.lower(), tok.pos_) for tok in doc if tok.lower_ not in stop_words]
+        assert [tag for _, tag in lematizado_lotes] == \
+            [tag for token, tag in etiquetado if token.lower() not in stop_words]
+        # Secuencial: se vuelve a analizar el texto en minúsculas y sin stopwords
+        minusculas = " ".join(token.lower() for token, _ in etiquetado if token.lower() not in stop_words)
+        assert lematizado_secuencial == [(tok.lemma_, tok.pos_) for tok in nlp(minusculas)]
@@ -0,0 +1,77 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from src.pos_tagging import puntos_control as modulo
+from src.pos_tagging.puntos_control import puntos_control
+from src.utils.eventos_progreso import bus_progreso
+
+CONFIGURACION = {'modo': 'lotes', 'tamano_lote': 2, 'version': 'v1'}
+
+
+@pytest.fixture(autouse=True)
+def directorio_temporal(tmp_path, monkeypatch):
+    monkeypatch.setattr(modulo, "ruta_puntos_control", lambda: str(tmp_path))
+
+
+def _lotes():
+    corpus = pd.DataFrame({'letra_cancion': ['a', 'b', 'c', 'd', 'e']})
+    return [corpus.iloc[inicio:inicio + 2] for inicio in range(0, len(corpus), 2)]
+
+
+def _etiquetar(lote):
+    lote = lote.copy()
+    lote['tokens'] = [[letra] for letra in lote['letra_cancion']]
+    return lote
+
+
+def test_reanudar_omite_los_lotes_completados():
+    llamadas = []
+
+    def fallar_en_el_segundo(lote):
+        if len(llamadas) == 1:
+            raise RuntimeError("interrumpida")
+        llamadas.append(lote)
+        return _etiquetar(lote)
+
+    control = puntos_control("spacy", CONFIGURACION)
+    with pytest.raises(RuntimeError):
+        control.procesar(_lotes(), fallar_en_el_segundo)
+    assert modulo.listar_ejecuciones()[0]['estado'] == 'fallido'
+
+    reanudada = puntos_control("spacy", CONFIGURACION, control.id_ejecucion)
+    procesados = []
+    reanudada.procesar(_lotes(), lambda lote: procesados.append(lote) or _etiquetar(lote))
+    assert [lote['letra_cancion'].tolist() for lote in procesados] == [['c', 'd'], ['e']]
+
+    resultados = reanudada.cargar_resultados()
+    assert resultados['letra_cancion'].tolist() == ['a', 'b', 'c', 'd', 'e']
+    assert resultados['tokens'].map(list).tolist() == [['a'], ['b'], ['c'], ['d'], ['e']]
+
+
+def test_reanudar_con_otra_configuracion():
+    control = puntos_control("spacy", CONFIGURACION)
+    with pytest.raises(ValueError, match="otra configuración"):
+        puntos_control("spacy", {**CONFIGURACION, 'tamano_lote': 3}, control.id_ejecucion)
+
+
+def test_no_se_reanuda_una_ejecucion_completada():
+    control = puntos_control("nltk", CONFIGURACION)
+    control.procesar(_lotes(), _etiquetar)
+    control.finalizar()
+    with pytest.raises(ValueError, match="completada"):
+        puntos_control("nltk", CONFIGURACION, control.id_ejecucion)
+
+
+def test_mensajes_de_lote_en_el_bus():
+    progreso = bus_progreso()
+    mensajes = []
+    progreso.suscribir(lambda evento: mensajes.append(evento.mensaje))
+
+    control = puntos_control("spacy", CONFIGURACION, progreso=progreso)
+    control.procesar(_lotes()[:1], _etiquetar)
+    reanudada = puntos_control("spacy", CONFIGURACION, control.id_ejecucion, progreso)
+    reanudada.procesar(_lotes()[:2], _etiquetar)
+    assert mensajes == ["Lote 1: filas 0-2", "Lote 1 (filas 0-2) ya completado: se omite",
+                        "Lote 2: filas 2-4"]
@@ -0,0 +1,20 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("textblob")
+
+from src.analysis import puntuacion_sentimiento as modulo
+
+
+def test_pool_compartido_con_spawn():
+    letras = pd.Series(["I love this beautiful day", "I hate the rain", None, "Happy song"])
+    esperado = [modulo.puntuar_letra(letra) for letra in letras]
+
+    for _ in range(2):
+        puntuador = modulo.puntuacion_sentimiento(n_procesos=2, tamano_fragmento=1, persistente=False)
+        resultado = puntuador.puntuar(letras)
+        assert list(zip(resultado['polaridad'], resultado['subjetividad'])) == esperado
+        ejecutor = modulo._pool
+        assert ejecutor is not None and ejecutor._mp_context.get_start_method() == "spawn"
+
+    assert modulo._obtener_pool(2) is ejecutor
@@ -0,0 +1,20 @@
+import pandas as pd
+
+from src.data import registro_datasets
+from src.utils.eventos_progreso import bus_progreso, cola_progreso
+
+
+def test_error_al_persistir_se_publica_en_el_bus(monkeypatch, capsys):
+    def fallar(ruta, df):
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(registro_datasets, "guardar_parquet", fallar)
+    progreso = bus_progreso()
+    eventos = progreso.suscribir(cola_progreso())
+
+    id_dataset = registro_datasets.registrar(pd.DataFrame({'Lematizado': [[]]}), progreso=progreso)
+
+    assert registro_datasets.obtener(id_dataset) is not None
+    mensajes = [(evento.mensaje, evento.nivel) for evento in eventos.vaciar()]
+    assert mensajes == [(f"⚠ No se pudo persistir el dataset {id_dataset}: disco lleno", "error")]
+    assert capsys.readouterr().out == ""